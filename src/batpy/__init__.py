@@ -1,10 +1,48 @@
 # -*- coding: UTF-8 -*-
 """Package to interact with BatPaC
 """
+import functools
 import logging
-from importlib.metadata import version
 from logging import NullHandler
 
-__version__ = version("batpy")
-
 logging.getLogger(__name__).addHandler(NullHandler())
+
+
+@functools.cache
+def _get_version() -> str:
+    """Get the version of the installed batpy package
+
+    The package metadata is only read on first access of __version__.
+
+    Returns
+    -------
+    str
+        Version of batpy
+    """
+    # pylint: disable=C0415
+    from importlib.metadata import version
+
+    return version("batpy")
+
+
+def __getattr__(name: str) -> str:
+    """Get lazy module attributes
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute
+
+    Returns
+    -------
+    str
+        Version of batpy for __version__
+
+    Raises
+    ------
+    AttributeError
+        Raises AttributeError for other attributes.
+    """
+    if name == "__version__":
+        return _get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
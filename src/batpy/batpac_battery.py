@@ -7,7 +7,11 @@ from pathlib import Path
 import semantic_version
 
 import batpy
-from batpy.utility_functions import is_version_compatible, load_configuration
+from batpy.utility_functions import (
+    FrozenConfiguration,
+    is_version_compatible,
+    load_cached_configuration,
+)
 
 
 class BatpacBattery:
@@ -49,7 +53,9 @@ class BatpacBattery:
         )
 
     def load_battery_file(
-        self, path_to_battery_file: Path | str, battery_name: str = "Battery"
+        self,
+        path_to_battery_file: Path | str | FrozenConfiguration,
+        battery_name: str = "Battery",
     ) -> bool:
         """Load a battery configuration file
 
@@ -58,9 +64,10 @@ class BatpacBattery:
 
         Parameters
         ----------
-        path_to_battery_file : Path | str
+        path_to_battery_file : Path | str | FrozenConfiguration
             Path to the TOML battery configuration file. It is also possible to
-            load the included batpy datasets.
+            load the included batpy datasets, also as parsed batpy dataset
+            (see datasets.get_parsed_batpy_dataset).
         battery_name : str, optional
             Name of the table in the TOML file from which to load the battery
             properties. Thereby, the battery_name, by default "Battery", does
@@ -92,8 +99,9 @@ class BatpacBattery:
             battery_name,
             path_to_battery_file,
         )
-        config = load_configuration(path_to_battery_file)
-        config_metadata = config.pop("batpy")
+        config_metadata, config = load_cached_configuration(
+            path_to_battery_file
+        )
         if is_version_compatible(
             self.version,
             semantic_version.Version(config_metadata["BatPaC SemVer"]),
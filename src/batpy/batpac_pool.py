@@ -0,0 +1,305 @@
+# -*- coding: UTF-8 -*-
+"""Module, which calculates batteries in parallel with a pool of BatPaC
+workbooks
+
+Each worker process of the pool opens its own BatPaC workbook (by default a
+copy of the BatPaC Excel tool in a temporary directory) and calculates groups
+of up to max_batteries batteries.
+"""
+import copy
+import logging
+import shutil
+import tempfile
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util
+from pathlib import Path
+
+import xlwings as xw
+from tqdm import tqdm
+
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_sharding import calculate_battery_group, partition_batteries
+from batpy.batpac_tool import BatpacTool
+from batpy.result_cache import ResultCache, get_workbook_identity
+from batpy.utility_functions import load_cached_configuration
+from batpy.workbook_backends import WorkbookBackend, XlwingsBackend
+
+DEFAULT_WORKERS = 2
+
+_worker_state = {}
+
+
+def _copy_workbook(batpac_workbook_path: Path | None) -> Path | None:
+    """Copy BatPaC workbook into a temporary directory
+
+    Parameters
+    ----------
+    batpac_workbook_path : Path | None
+        Path to the BatPaC Excel tool (*.xlsm).
+
+    Returns
+    -------
+    Path | None
+        Path to the copy of the BatPaC Excel tool, or batpac_workbook_path if
+        it is not a file.
+    """
+    if (
+        batpac_workbook_path is None
+        or not Path(batpac_workbook_path).is_file()
+    ):
+        return batpac_workbook_path
+    directory = tempfile.mkdtemp(prefix="batpy_")
+    _worker_state["directory"] = directory
+    return Path(
+        shutil.copy(
+            batpac_workbook_path,
+            Path(directory, Path(batpac_workbook_path).name),
+        )
+    )
+
+
+def _close_worker() -> None:
+    """Close the BatPaC workbook of a worker process"""
+    batpac = _worker_state.pop("batpac", None)
+    if batpac is not None:
+        try:
+            batpac.close()
+        except BaseException as error:  # pylint: disable=W0718
+            logging.error("An exception occurred: %s", error)
+    app = _worker_state.pop("app", None)
+    if app is not None:
+        try:
+            app.quit()
+        except BaseException as error:  # pylint: disable=W0718
+            logging.error("An exception occurred: %s", error)
+    directory = _worker_state.pop("directory", None)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _initialize_worker(
+    batpac_workbook_path: Path | None,
+    cell_definition_user_input_toml_path: Path | str,
+    batpac_config: Path | str | dict | None,
+    backend: str | WorkbookBackend,
+    copy_workbook: bool,
+) -> None:
+    """Open the BatPaC workbook of a worker process
+
+    With the xlwings backend, each worker process opens its workbook in its
+    own Excel instance, so that the workers neither share the calculation
+    mode nor close each other's Excel instance.
+
+    Parameters
+    ----------
+    batpac_workbook_path : Path | None
+        Path to the BatPaC Excel tool (*.xlsm).
+    cell_definition_user_input_toml_path : Path | str
+        Path to the TOML file or string (default dataset), which contains
+        the configuration for the standard user input cells.
+    batpac_config : Path | str | dict | None
+        Path to the TOML file or string (default dataset) or dictionary, which
+        contains the properties of the BatPaC tool.
+    backend : str | WorkbookBackend
+        Name of the workbook backend or workbook backend object.
+    copy_workbook : bool
+        True, if the worker process should open a copy of the BatPaC
+        workbook.
+    """
+    if copy_workbook:
+        batpac_workbook_path = _copy_workbook(batpac_workbook_path)
+    if backend == "xlwings":
+        _worker_state["app"] = xw.App(visible=False, add_book=False)
+        backend = XlwingsBackend(_worker_state["app"])
+    batpac = BatpacTool(
+        batpac_workbook_path,
+        cell_definition_user_input_toml_path,
+        backend=backend,
+    )
+    if isinstance(batpac_config, dict):
+        batpac.properties = copy.deepcopy(batpac_config)
+    elif batpac_config is not None:
+        batpac.load_batpac_file(batpac_config)
+    _worker_state["batpac"] = batpac
+    util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _calculate_battery_group(
+    batteries: list[BatpacBattery], result_cell_config: Path | str | dict
+) -> list[dict]:
+    """Calculate battery group in a worker process
+
+    Parameters
+    ----------
+    batteries : list[BatpacBattery]
+        BatPaC_battery objects to calculate.
+    result_cell_config : Path | str | dict
+        Path to the TOML file or string (default dataset) or dictionary
+        containing the battery specific cell ranges of the results.
+
+    Returns
+    -------
+    list[dict]
+        Results of the batteries in the order of batteries
+    """
+    results = calculate_battery_group(
+        _worker_state["batpac"], batteries, result_cell_config
+    )
+    return [results[battery] for battery in batteries]
+
+
+class BatpacPool:
+    """Pool of BatPaC workbooks, which calculates batteries in parallel
+
+    Each worker process opens its own BatPaC workbook with the same user
+    input cells and BatPaC tool properties. Batteries are partitioned into
+    groups of up to max_batteries, which are scheduled on the worker
+    processes.
+    """
+
+    def __init__(
+        self,
+        batpac_workbook_path: Path | None,
+        cell_definition_user_input_toml_path: Path | str,
+        batpac_config: Path | str | dict = None,
+        workers: int = DEFAULT_WORKERS,
+        backend: str | WorkbookBackend = "xlwings",
+        copy_workbook: bool = True,
+    ) -> None:
+        """Initialize BatPaC pool
+
+        Parameters
+        ----------
+        batpac_workbook_path : Path | None
+            Path to the BatPaC Excel tool (*.xlsm).
+        cell_definition_user_input_toml_path : Path | str
+            Path to the TOML file or string (default dataset), which contains
+            the configuration for the standard user input cells (defined by
+            Argonne National Laboratory) in the BatPaC Excel tool.
+        batpac_config : Path | str | dict, optional
+            Path to the TOML file or string (default dataset) or dictionary,
+            which contains the properties of the BatPaC tool, by default None.
+        workers : int, optional
+            Number of worker processes, each with its own BatPaC workbook (and
+            Excel instance with the xlwings backend), by default 2.
+        backend : str | WorkbookBackend, optional
+            Name of the workbook backend ("xlwings", "memory" or "openpyxl")
+            or workbook backend object, which is copied to each worker
+            process, by default "xlwings".
+        copy_workbook : bool, optional
+            True, if each worker process should open a copy of the BatPaC
+            workbook in a temporary directory, by default True.
+        """
+        self.workers = workers
+        self.max_batteries = 7
+        if batpac_config is None:
+            self.properties = {}
+        elif isinstance(batpac_config, dict):
+            self.properties = batpac_config
+        else:
+            _, self.properties = load_cached_configuration(batpac_config)
+        self._batpac_workbook_path = batpac_workbook_path
+        self._cell_definition_user_input_toml_path = (
+            cell_definition_user_input_toml_path
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_initialize_worker,
+            initargs=(
+                batpac_workbook_path,
+                cell_definition_user_input_toml_path,
+                batpac_config,
+                backend,
+                copy_workbook,
+            ),
+        )
+        logging.info("[+] Created BatPaC pool with %s workers", self.workers)
+
+    def __enter__(self) -> "BatpacPool":
+        """Enter context
+
+        Returns
+        -------
+        BatpacPool
+            BatPaC pool
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Exit context and close the worker processes"""
+        self.close()
+
+    def calculate_batteries(
+        self,
+        batteries: Iterable[BatpacBattery],
+        result_cell_config: Path | str | dict,
+        result_cache: ResultCache = None,
+    ) -> dict[BatpacBattery, dict]:
+        """Calculate batteries in parallel
+
+        Partition the batteries into groups of max_batteries, calculate the
+        groups in the worker processes and merge the results by battery.
+
+        Parameters
+        ----------
+        batteries : Iterable[BatpacBattery]
+            BatPaC_battery objects to calculate.
+        result_cell_config : Path | str | dict
+            Path to the TOML file or string (default dataset) or dictionary
+            containing the battery specific cell ranges of the results.
+        result_cache : ResultCache, optional
+            Result cache, which returns the results of already calculated
+            batteries without calculating them, by default None.
+
+        Returns
+        -------
+        dict[BatpacBattery, dict]
+            Dictionary in the format
+            {battery : {"sheet" : {"name" : value} } } in the order of
+            batteries
+        """
+
+        def calculate(
+            batteries: list[BatpacBattery],
+        ) -> dict[BatpacBattery, dict]:
+            """Calculate batteries in the worker processes"""
+            groups = partition_batteries(batteries, self.max_batteries)
+            futures = {
+                self._executor.submit(
+                    _calculate_battery_group, group, result_cell_config
+                ): index
+                for index, group in enumerate(groups)
+            }
+            group_results = [None] * len(groups)
+            for future in tqdm(
+                as_completed(futures),
+                "Calculating battery groups",
+                total=len(futures),
+            ):
+                group_results[futures[future]] = future.result()
+
+            results = {}
+            for group, battery_results in zip(groups, group_results):
+                results.update(zip(group, battery_results))
+            return results
+
+        if result_cache is None:
+            return calculate(list(batteries))
+        _, cell_definitions = load_cached_configuration(
+            self._cell_definition_user_input_toml_path
+        )
+        return result_cache.calculate_battery_results(
+            get_workbook_identity(
+                self._batpac_workbook_path, cell_definitions
+            ),
+            self.properties,
+            batteries,
+            result_cell_config,
+            calculate,
+        )
+
+    def close(self) -> None:
+        """Close the worker processes and their BatPaC workbooks"""
+        self._executor.shutdown()
+        logging.info("[+] BatPaC pool closed")
@@ -0,0 +1,184 @@
+# -*- coding: UTF-8 -*-
+"""Module, which calculates any number of batteries with BatPaC workbooks
+
+A BatPaC workbook calculates up to max_batteries (7) batteries at once. The
+batteries are partitioned into groups, which are calculated one after another
+in one or more BatPaC workbooks, and the results are merged by battery.
+"""
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+from tqdm import tqdm
+
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_tool import BatpacTool
+from batpy.result_cache import ResultCache, get_workbook_identity
+
+
+def partition_batteries(
+    batteries: Iterable[BatpacBattery], group_size: int = 7
+) -> list[list[BatpacBattery]]:
+    """Partition batteries
+
+    Partition batteries into groups, which fit into a single BatPaC workbook.
+
+    Parameters
+    ----------
+    batteries : Iterable[BatpacBattery]
+        BatPaC_battery objects
+    group_size : int, optional
+        Maximum number of batteries per group, by default 7.
+
+    Returns
+    -------
+    list[list[BatpacBattery]]
+        Groups of BatPaC_battery objects in the order of batteries
+
+    Raises
+    ------
+    ValueError
+        Raises ValueError, if group_size is smaller than 1.
+    """
+    if group_size < 1:
+        raise ValueError(f"Group size {group_size} must be at least 1")
+    batteries = list(batteries)
+    return [
+        batteries[index : index + group_size]  # noqa: E203
+        for index in range(0, len(batteries), group_size)
+    ]
+
+
+def calculate_battery_group(
+    batpac: BatpacTool,
+    batteries: list[BatpacBattery],
+    result_cell_config: Path | str | dict,
+) -> dict[BatpacBattery, dict]:
+    """Calculate battery group
+
+    Replace the batteries of the BatPaC object by a group of up to
+    max_batteries batteries, calculate them and read their results.
+
+    Parameters
+    ----------
+    batpac : BatpacTool
+        BatPaC object, which calculates the batteries.
+    batteries : list[BatpacBattery]
+        BatPaC_battery objects to calculate.
+    result_cell_config : Path | str | dict
+        Path to the TOML file or string (default dataset) or dictionary
+        containing the battery specific cell ranges of the results.
+
+    Returns
+    -------
+    dict[BatpacBattery, dict]
+        Dictionary in the format {battery : {"sheet" : {"name" : value} } }
+
+    Raises
+    ------
+    ValueError
+        Raises ValueError, if the group exceeds max_batteries.
+    """
+    if len(batteries) > batpac.max_batteries:
+        raise ValueError(
+            f"{len(batteries)} batteries exceed the limit of "
+            f"{batpac.max_batteries} batteries for a single workbook"
+        )
+    batpac.batteries.clear()
+    batpac.add_battery(batteries)
+    batpac.calculate()
+    return batpac.read_battery_results(result_cell_config)
+
+
+def calculate_batteries(
+    batpac: BatpacTool | list[BatpacTool],
+    batteries: Iterable[BatpacBattery],
+    result_cell_config: Path | str | dict,
+    result_cache: ResultCache = None,
+) -> dict[BatpacBattery, dict]:
+    """Calculate batteries
+
+    Calculate any number of batteries by partitioning them into groups of
+    max_batteries, which are calculated one after another. If multiple BatPaC
+    objects are specified, the groups are distributed round-robin over the
+    BatPaC objects. The batteries of the BatPaC objects are replaced by the
+    last calculated group.
+
+    Parameters
+    ----------
+    batpac : BatpacTool | list[BatpacTool]
+        BatPaC object or list of BatPaC objects with the same properties,
+        which calculate the batteries.
+    batteries : Iterable[BatpacBattery]
+        BatPaC_battery objects to calculate.
+    result_cell_config : Path | str | dict
+        Path to the TOML file or string (default dataset) or dictionary
+        containing the battery specific cell ranges of the results.
+    result_cache : ResultCache, optional
+        Result cache, which returns the results of already calculated
+        batteries without calculating them, by default None.
+
+    Returns
+    -------
+    dict[BatpacBattery, dict]
+        Dictionary in the format {battery : {"sheet" : {"name" : value} } }
+        in the order of batteries
+
+    Raises
+    ------
+    ValueError
+        Raises ValueError, if no BatPaC object is specified or the BatPaC
+        objects have different workbooks or properties while using a result
+        cache.
+    """
+    batpac_tools = [batpac] if isinstance(batpac, BatpacTool) else list(batpac)
+    if not batpac_tools:
+        raise ValueError("No BatPaC object to calculate the batteries")
+
+    def calculate(
+        batteries: list[BatpacBattery],
+    ) -> dict[BatpacBattery, dict]:
+        """Calculate batteries group by group in the BatPaC objects"""
+        groups = partition_batteries(
+            batteries, min(tool.max_batteries for tool in batpac_tools)
+        )
+        logging.info(
+            "[ ] Calculate %s battery groups in %s workbooks",
+            len(groups),
+            len(batpac_tools),
+        )
+        results = {}
+        for index, group in enumerate(
+            tqdm(groups, "Calculating battery groups")
+        ):
+            results.update(
+                calculate_battery_group(
+                    batpac_tools[index % len(batpac_tools)],
+                    group,
+                    result_cell_config,
+                )
+            )
+        logging.info("[+] Calculated %s batteries", len(results))
+        return results
+
+    if result_cache is None:
+        return calculate(list(batteries))
+    workbook_identities = {
+        get_workbook_identity(tool.path, tool.excel_cells)
+        for tool in batpac_tools
+    }
+    if len(workbook_identities) > 1 or any(
+        tool.properties != batpac_tools[0].properties
+        for tool in batpac_tools[1:]
+    ):
+        raise ValueError(
+            "BatPaC objects with different workbooks or properties can not "
+            "share a result cache"
+        )
+    return result_cache.calculate_battery_results(
+        workbook_identities.pop(),
+        batpac_tools[0].properties,
+        batteries,
+        result_cell_config,
+        calculate,
+    )
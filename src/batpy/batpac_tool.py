@@ -1,14 +1,47 @@
 # -*- coding: UTF-8 -*-
 """Module, which includes the class BatpacTool
 """
+import copy
 import logging
+from collections.abc import Iterable
 from pathlib import Path
 
 from prettytable import PrettyTable
-from tqdm import tqdm
 
 from batpy.batpac_battery import BatpacBattery
 from batpy.batpy_workbook import BatpyWorkbook
+from batpy.result_cache import (
+    ResultCache,
+    get_result_key,
+    get_workbook_identity,
+)
+from batpy.utility_functions import (
+    dump_configuration,
+    join_cell_address,
+    split_cell_address,
+)
+from batpy.workbook_backends import WorkbookBackend
+
+
+def format_results_table(results: dict) -> PrettyTable:
+    """Format results table
+
+    Parameters
+    ----------
+    results : dict
+        Results in the format {"Parameter" : [battery names],
+        "name" : [values] } (see read_calculation_and_validation_results).
+
+    Returns
+    -------
+    PrettyTable
+        Table with a row for each result and a column for each battery
+    """
+    results = dict(results)
+    tab = PrettyTable(["Parameter"] + results.pop("Parameter"))
+    tab.align["Parameter"] = "l"
+    tab.add_rows([[name] + values for name, values in results.items()])
+    return tab
 
 
 class BatpacTool(BatpyWorkbook):
@@ -27,6 +60,8 @@ class BatpacTool(BatpyWorkbook):
         # cell_definition_additional_user_input_toml_path: Path = None,
         # cell_definition_additional_user_results_toml_path: Path = None,
         workbook_visible: bool = False,
+        backend: str | WorkbookBackend = "xlwings",
+        result_cache: ResultCache = None,
     ) -> None:
         """Initialize BatPaC
 
@@ -55,13 +90,21 @@ class BatpacTool(BatpyWorkbook):
         workbook_visible : bool, optional
             True, if workbook should be visible during operation, by default
             False.
+        backend : str | WorkbookBackend, optional
+            Name of the workbook backend ("xlwings", "memory" or "openpyxl")
+            or workbook backend object, by default "xlwings".
+        result_cache : ResultCache, optional
+            Result cache, which answers the reads of calculated batteries
+            without calculating them in the BatPaC Excel tool (see
+            calculate), by default None.
         """
 
-        super().__init__(batpac_workbook_path, workbook_visible)
+        super().__init__(batpac_workbook_path, workbook_visible, backend)
 
         self.excel_cells = self._load_user_configuration(
             cell_definition_user_input_toml_path
         )
+        self.toml_calculation_validation_results = None
         if cell_definition_calculation_validation_results:
             self.toml_calculation_validation_results = (
                 self._load_user_configuration(
@@ -70,6 +113,12 @@ class BatpacTool(BatpyWorkbook):
             )
         self.batteries = []
         self.max_batteries = 7
+        self._battery_slots = {}
+        self._cell_index = {}
+        self._cell_index_source = None
+        self.result_cache = result_cache
+        self._pending_calculation = None
+        self._calculated_inputs = None
 
     def load_batpac_file(self, path_to_batpac_file: Path | str) -> None:
         """Load BatPaC configuration
@@ -100,10 +149,6 @@ class BatpacTool(BatpyWorkbook):
             if len(self.batteries) + 1 <= self.max_batteries:
                 self.batteries.append(battery)
             else:
-                print(
-                    f"Battery {battery.name} ({battery}) exceeds the limit of \
-                        batteries for a single workbook"
-                )
                 logging.warning(
                     "[!] Battery %s (%s) exceeds the limit of batteries for a \
                         single workbook",
@@ -163,6 +208,84 @@ class BatpacTool(BatpyWorkbook):
             "[+] Batteries from file %s loaded", path_to_batteries_file
         )
 
+    def _get_battery_slot(self, battery: BatpacBattery) -> int:
+        """Get battery slot
+
+        Get the position (starting at 0) of a battery object in batteries,
+        which is the column of the battery in the BatPaC Excel tool. Battery
+        objects are identified by identity.
+
+        Parameters
+        ----------
+        battery : BatpacBattery
+            BatPaC_battery object.
+
+        Returns
+        -------
+        int
+            Battery slot
+
+        Raises
+        ------
+        KeyError
+            Raises KeyError, if the battery is not included in batteries.
+        """
+        slot = self._battery_slots.get(id(battery), None)
+        if (
+            slot is None
+            or slot >= len(self.batteries)
+            or self.batteries[slot] is not battery
+        ):
+            self._battery_slots = {
+                id(slot_battery): slot
+                for slot, slot_battery in enumerate(self.batteries)
+            }
+            slot = self._battery_slots.get(id(battery), None)
+            if slot is None:
+                raise KeyError(f"Battery {battery} not included in batteries")
+        return slot
+
+    def _get_cell_index(
+        self,
+    ) -> dict[tuple[str, str, int | None], tuple[str, tuple[int, int]]]:
+        """Get cell index
+
+        Get the flattened index of excel_cells. The index is rebuilt, if
+        the content of excel_cells differs from the snapshot the index was
+        built from, so replaced and modified cell configurations are both
+        detected.
+
+        Returns
+        -------
+        dict[tuple[str, str, int | None], tuple[str, tuple[int, int]]]
+            Cell ranges and parsed cell addresses (None, if the cell range is
+            not a single cell) in the format
+            {("sheet", "name", battery slot | None) : ("cell range", address)}
+        """
+        if self._cell_index_source != self.excel_cells:
+            self._cell_index = {}
+            for sheet, sheet_cells in self.excel_cells.items():
+                for name, cell_range in sheet_cells.items():
+                    if not isinstance(cell_range, dict):
+                        self._cell_index[(sheet, name, None)] = (
+                            cell_range,
+                            split_cell_address(cell_range),
+                        )
+                        continue
+                    if not name.startswith("Battery "):
+                        continue
+                    try:
+                        slot = int(name.removeprefix("Battery ")) - 1
+                    except ValueError:
+                        continue
+                    for battery_name, battery_range in cell_range.items():
+                        self._cell_index[(sheet, battery_name, slot)] = (
+                            battery_range,
+                            split_cell_address(battery_range),
+                        )
+            self._cell_index_source = copy.deepcopy(self.excel_cells)
+        return self._cell_index
+
     def _wb_helper_range(
         self,
         worksheet: str,
@@ -199,22 +322,34 @@ class BatpacTool(BatpyWorkbook):
             Raises KeyError, if worksheet name or cell description could not be
             found.
         """
-        try:
-            if additional_cell_config is not None:
-                if isinstance(additional_cell_config, dict):
-                    range_dict = additional_cell_config
-                else:
-                    range_dict = self._load_user_configuration(
-                        additional_cell_config
+        if additional_cell_config is None:
+            try:
+                return self._get_cell_index()[
+                    (
+                        worksheet,
+                        name,
+                        None
+                        if battery is None
+                        else self._get_battery_slot(battery),
                     )
+                ][0]
+            except KeyError as error:
+                logging.error("An exception occurred: %s", error)
+                logging.warning("[!] Key %s , %s not found", worksheet, name)
+                raise KeyError from error
+        try:
+            if isinstance(additional_cell_config, dict):
+                range_dict = additional_cell_config
             else:
-                range_dict = self.excel_cells
+                range_dict = self._load_user_configuration(
+                    additional_cell_config, read_only=True
+                )
 
             if battery is None:
                 cell_range = range_dict[worksheet][name]
             else:
                 cell_range = range_dict[worksheet][
-                    "Battery " + str(self.batteries.index(battery) + 1)
+                    "Battery " + str(self._get_battery_slot(battery) + 1)
                 ][name]
             return cell_range
         except BaseException as error:
@@ -284,14 +419,13 @@ class BatpacTool(BatpyWorkbook):
             BatPaC_battery object, if the returned cell is battery specific,
             by default None.
         """
-        self._write_value_direct(
-            worksheet, self._wb_helper_range(worksheet, name, battery), value
-        )
+        cell_range = self._wb_helper_range(worksheet, name, battery)
+        self._write_value_direct(worksheet, cell_range, value)
         logging.debug(
             "[ ] Write for %s in %s %s (%s) = %s",
             battery.name if battery else "BatPaC tool",
             worksheet,
-            self._wb_helper_range(worksheet, name, battery),
+            cell_range,
             name,
             value,
         )
@@ -307,15 +441,16 @@ class BatpacTool(BatpyWorkbook):
         """Start automatic Excel calculation
         Start the automatic Excel and BatPaC calculation.
         """
-        reset_macro = self.workbook.macro("Module1.Reset")
-        reset_macro()
+        self.backend.run_macro("Module1.Reset")
         super().start_automatic_calculation()
 
     def read_from_user_input(self, user_read_file: Path | str) -> dict:
         """Read user specified input from BatPaC Excel tool
 
         Read additional cell values from BatPaC Excel tool specified by user
-        input.
+        input. The cells are read in bulk with one range read per block of
+        nearby cells on each sheet, and the loaded configuration is not
+        modified.
 
         Parameters
         ----------
@@ -326,36 +461,54 @@ class BatpacTool(BatpyWorkbook):
         Returns
         -------
         dict
-            Dictionary in the format {"sheet" : {"name" : value} }
+            Dictionary in the format {"sheet" : {"name" : value} } or
+            {"sheet" : {"name" : {"battery name" : value} } }
         """
 
-        additional_cells = self._load_user_configuration(user_read_file)
-        values_dict = additional_cells
+        additional_cells = self._load_user_configuration(
+            user_read_file, read_only=True
+        )
+        cells = set()
+        for sheet_name, sheet_key in additional_cells.items():
+            for batpac_cell_range in sheet_key.values():
+                if isinstance(batpac_cell_range, dict):
+                    cells.update(
+                        (sheet_name, battery_cell_range)
+                        for battery_cell_range in batpac_cell_range.values()
+                    )
+                else:
+                    cells.add((sheet_name, batpac_cell_range))
+        values = self._read_values_bulk(cells)
+
+        values_dict = {}
         for sheet_name, sheet_key in additional_cells.items():
+            sheet_values = values_dict[sheet_name] = {}
             for batpac_key, batpac_cell_range in sheet_key.items():
                 if isinstance(batpac_cell_range, dict):
-                    for (
-                        battery_key,
-                        battery_cell_range,
-                    ) in batpac_cell_range.items():
-                        values_dict[sheet_name][batpac_key][
-                            battery_key
-                        ] = self._read_value_direct(
-                            sheet_name, battery_cell_range
-                        )
+                    sheet_values[batpac_key] = {
+                        battery_key: values[(sheet_name, battery_cell_range)]
+                        for (
+                            battery_key,
+                            battery_cell_range,
+                        ) in batpac_cell_range.items()
+                    }
                 else:
-                    values_dict[sheet_name][
-                        batpac_key
-                    ] = self._read_value_direct(sheet_name, batpac_cell_range)
+                    sheet_values[batpac_key] = values[
+                        (sheet_name, batpac_cell_range)
+                    ]
 
         return values_dict
 
     def read_calculation_and_validation_results(
-        self, toml_file_calculation_validation_results: Path | str = None
+        self,
+        toml_file_calculation_validation_results: Path | str = None,
+        print_table: bool = True,
     ) -> dict:
         """Read calculation and validation results
 
-        Read the calculation and validation results from the BatPaC Excel tool.
+        Read the calculation and validation results of all batteries from the
+        BatPaC Excel tool with bulk reads (a single range read for the
+        default configuration).
 
         Parameters
         ----------
@@ -363,11 +516,15 @@ class BatpacTool(BatpyWorkbook):
             Path to the TOML file or string (default dataset), containing the
             specified cell ranges of the calculation and validation results,
             by default None.
+        print_table : bool, optional
+            True, if the results should be printed as a table, by default
+            True.
 
         Returns
         -------
         dict
-            Returns a dictionary of the calculation and validation results.
+            Returns a dictionary of the calculation and validation results in
+            the format {"Parameter" : [battery names], "name" : [values] }
 
         Raises
         ------
@@ -390,132 +547,301 @@ class BatpacTool(BatpyWorkbook):
                 )
             )
 
-        config_errors = ["Configuration Errors (see table to right)"]
-        config_warnings = ["Configuration Warnings (see table  to right)"]
-        plant_size = ["Plant Size, GWh"]
-        power_to_energy = ["Power-to-energy ratio"]
-        adequacy_cooling = ["Adequacy of cooling"]
-        cathode_thickness = ["Cathode thickness limited by"]
-        table_columns = ["Parameter"]
-        for battery in self.batteries:
-            config_errors.append(
-                self.read_value(
-                    "Dashboard",
-                    "Configuration Errors (see table to right)",
-                    battery,
-                    self.toml_calculation_validation_results,
-                )
-            )
-            config_warnings.append(
-                self.read_value(
-                    "Dashboard",
-                    "Configuration Warnings (see table  to right)",
-                    battery,
-                    self.toml_calculation_validation_results,
-                )
-            )
-            plant_size.append(
-                self.read_value(
-                    "Dashboard",
-                    "Plant Size, GWh",
-                    battery,
-                    self.toml_calculation_validation_results,
-                )
-            )
-            power_to_energy.append(
-                self.read_value(
-                    "Dashboard",
-                    "Power-to-energy ratio",
-                    battery,
-                    self.toml_calculation_validation_results,
-                )
-            )
-            adequacy_cooling.append(
-                self.read_value(
-                    "Dashboard",
-                    "Adequacy of cooling",
-                    battery,
-                    self.toml_calculation_validation_results,
-                )
-            )
-            cathode_thickness.append(
-                self.read_value(
-                    "Dashboard",
-                    "Cathode thickness limited by",
-                    battery,
-                    self.toml_calculation_validation_results,
-                )
-            )
-            table_columns.append(battery.name)
-
-        table = [
-            table_columns,
-            config_errors,
-            config_warnings,
-            plant_size,
-            power_to_energy,
-            adequacy_cooling,
-            cathode_thickness,
-        ]
-        tab = PrettyTable(table[0])
-        tab.align["Parameter"] = "l"
-        tab.add_rows(table[1:])
-        print(tab)
+        battery_results = self.read_battery_results(
+            self.toml_calculation_validation_results
+        )
         dict_table = {
-            table_columns[0]: table_columns[1:],
-            config_errors[0]: config_errors[1:],
-            config_warnings[0]: config_warnings[1:],
-            plant_size[0]: plant_size[1:],
-            power_to_energy[0]: power_to_energy[1:],
-            adequacy_cooling[0]: adequacy_cooling[1:],
-            cathode_thickness[0]: cathode_thickness[1:],
+            "Parameter": [battery.name for battery in self.batteries]
         }
+        for (
+            sheet,
+            sheet_cells,
+        ) in self.toml_calculation_validation_results.items():
+            if not isinstance(sheet_cells.get("Battery 1", None), dict):
+                continue
+            for name in sheet_cells["Battery 1"]:
+                dict_table[name] = [
+                    battery_results[battery][sheet][name]
+                    for battery in self.batteries
+                ]
+
+        if print_table:
+            print(format_results_table(dict_table))
 
         return dict_table
 
-    def calculate(self) -> None:
+    def read_battery_results(
+        self, result_cell_config: Path | str | dict
+    ) -> dict[BatpacBattery, dict]:
+        """Read battery specific results from BatPaC Excel tool
+
+        Read the battery specific cells (["sheet"."Battery N"]) of a cell
+        configuration for all batteries of the BatPaC object with bulk reads.
+
+        Parameters
+        ----------
+        result_cell_config : Path | str | dict
+            Path to the TOML file or string (default dataset) or dictionary
+            containing the battery specific cell ranges to read.
+
+        Returns
+        -------
+        dict[BatpacBattery, dict]
+            Dictionary in the format {battery : {"sheet" : {"name" : value} } }
+
+        Raises
+        ------
+        KeyError
+            Raises KeyError, if the cell ranges of a battery could not be
+            found.
+        """
+        if not isinstance(result_cell_config, dict):
+            result_cell_config = self._load_user_configuration(
+                result_cell_config, read_only=True
+            )
+        battery_cells = {}
+        for sheet, sheet_cells in result_cell_config.items():
+            if not isinstance(sheet_cells.get("Battery 1", None), dict):
+                continue
+            for slot in range(len(self.batteries)):
+                try:
+                    slot_cells = sheet_cells[f"Battery {slot + 1}"]
+                except KeyError as error:
+                    logging.error("An exception occurred: %s", error)
+                    logging.warning(
+                        "[!] Key %s , Battery %s not found", sheet, slot + 1
+                    )
+                    raise KeyError from error
+                for name, cell_range in slot_cells.items():
+                    battery_cells[(slot, sheet, name)] = (sheet, cell_range)
+
+        values = self._read_values_bulk(set(battery_cells.values()))
+        results = {battery: {} for battery in self.batteries}
+        for (slot, sheet, name), cell in battery_cells.items():
+            results[self.batteries[slot]].setdefault(sheet, {})[name] = values[
+                cell
+            ]
+        return results
+
+    def calculate(self, incremental: bool = False) -> None:
         """Calculate the batteries in the BatPaC Excel tool
 
         Read all BatPaC_tool properties and its included [BatPaC_battery]
         properties, write these properties in the BatPaC Excel tool,
         and calculate the batteries in the BatPaC Excel tool.
-        """
-        logging.info("[ ] Start calculation")
-        self.stop_automatic_calculation()
-        for sheet in tqdm(
-            self.properties, "Processing BatPaC configuration in each sheet"
-        ):
-            for key, value in self.properties[sheet].items():
-                if value is not None:
-                    self.write_value(sheet, key, value)
 
-        sheets = set()
-        for battery in self.batteries:
-            sheets.update(battery.properties.keys())
+        An incremental calculation assumes, that the input cells were only
+        changed by batpy since the last calculation. Changes outside of batpy
+        (e.g. manual edits, macros changing input cells or writes to another
+        cell range of the same cell) are not detected.
 
-        logging.debug(
-            "[ ] Sheets type is %s and sheets available: %s",
-            type(sheets),
-            sheets,
+        With a result cache, the calculation is deferred. Bulk reads of the
+        calculated workbook (e.g. read_battery_results,
+        read_calculation_and_validation_results and read_from_user_input) are
+        answered from the result cache and the calculation is only performed,
+        if a read is not cached or the workbook is otherwise accessed.
+
+        Parameters
+        ----------
+        incremental : bool, optional
+            True, if only values, which changed since the last calculation,
+            should be written (see cell_writes for the number of written and
+            skipped values), by default False writes all values.
+        """
+        values = self._get_calculation_values()
+        if self.result_cache is None:
+            self._write_calculation_values(values, incremental)
+            return
+        self._pending_calculation = (copy.deepcopy(values), incremental)
+        self._calculated_inputs = (
+            get_workbook_identity(self.path, self.excel_cells),
+            copy.deepcopy(self.properties),
+            {
+                f"Battery {slot + 1}": copy.deepcopy(battery.properties)
+                for slot, battery in enumerate(self.batteries)
+            },
         )
+        logging.info("[+] Deferred calculation (result cache)")
 
-        for sheet in tqdm(
-            sheets, "Processing battery configuration in each sheet"
-        ):
-            sheet_buffer = {}
-            for i, battery in enumerate(self.batteries):
-                if sheet in battery.properties:
-                    for key, value in battery.properties[sheet].items():
-                        if key not in sheet_buffer:
-                            sheet_buffer[key] = [None] * self.max_batteries
-                        sheet_buffer[key][i] = value
-            for key, value in sheet_buffer.items():
-                self.write_value(sheet, key, value, self.batteries[0])
+    def _write_calculation_values(
+        self, values: dict[tuple[str, str], any], incremental: bool
+    ) -> None:
+        """Write the values for calculation and calculate the workbook
 
+        Parameters
+        ----------
+        values : dict[tuple[str, str], any]
+            Values in the format {("worksheet", "cell range") : value} (see
+            _get_calculation_values).
+        incremental : bool
+            True, if only values, which changed since the last calculation,
+            should be written.
+        """
+        logging.info("[ ] Start calculation")
+        if not incremental:
+            self._written_values.clear()
+        self.stop_automatic_calculation()
+        self._write_values_bulk({}, values)
         self.start_automatic_calculation()
         logging.info("[+] Finished calculation")
 
-    def _save_batpac_config(self, batpac_path: Path = None) -> None:
+    def _sync_workbook(self, write: bool = False) -> None:
+        """Perform a deferred calculation before accessing the workbook
+
+        Cells written after the calculation change the calculated workbook,
+        so later reads are no longer answered from the result cache.
+
+        Parameters
+        ----------
+        write : bool, optional
+            True, if cells of the workbook are written, by default False.
+        """
+        if self._pending_calculation is not None:
+            values, incremental = self._pending_calculation
+            self._pending_calculation = None
+            calculated_inputs = self._calculated_inputs
+            self._write_calculation_values(values, incremental)
+            self._calculated_inputs = calculated_inputs
+        if write:
+            self._calculated_inputs = None
+
+    def _read_values_bulk(
+        self, cells: Iterable[tuple[str, str]]
+    ) -> dict[tuple[str, str], any]:
+        """Read values from BatPaC Excel tool in bulk
+
+        After a calculation with a result cache, the values are read from the
+        result cache or read from the calculated workbook and stored in the
+        result cache (see BatpyWorkbook._read_values_bulk).
+
+        Parameters
+        ----------
+        cells : Iterable[tuple[str, str]]
+            Worksheets and cell ranges to read.
+
+        Returns
+        -------
+        dict[tuple[str, str], any]
+            Values in the format {("worksheet", "cell range") : value}
+        """
+        if self._calculated_inputs is None:
+            return super()._read_values_bulk(cells)
+        cells = sorted(set(cells))
+        key = get_result_key(*self._calculated_inputs, {"cells": cells})
+        values = self.result_cache.get(key)
+        if values is None:
+            values = super()._read_values_bulk(cells)
+            self.result_cache.set(key, values)
+        return values
+
+    def _get_calculation_values(self) -> dict[tuple[str, str], any]:
+        """Get values for calculation
+
+        Resolve the cell ranges of all BatPaC_tool properties and its included
+        [BatPaC_battery] properties. Battery specific values are written in
+        a row of max_batteries cells, starting at the cell range of the first
+        battery.
+
+        Returns
+        -------
+        dict[tuple[str, str], any]
+            Values in the format {("worksheet", "cell range") : value}
+        """
+        values = {}
+        for sheet, sheet_properties in self.properties.items():
+            for key, value in sheet_properties.items():
+                if value is not None:
+                    values[(sheet, self._wb_helper_range(sheet, key))] = value
+
+        sheet_buffer = {}
+        for i, battery in enumerate(self.batteries):
+            for sheet, sheet_properties in battery.properties.items():
+                for key, value in sheet_properties.items():
+                    sheet_buffer.setdefault(
+                        (sheet, key), [None] * self.max_batteries
+                    )[i] = value
+
+        cell_index = self._get_cell_index()
+        for (sheet, key), battery_values in sheet_buffer.items():
+            try:
+                cell_range, address = cell_index[(sheet, key, 0)]
+            except KeyError as error:
+                logging.error("An exception occurred: %s", error)
+                logging.warning("[!] Key %s , %s not found", sheet, key)
+                raise KeyError from error
+            if address is None:
+                values[(sheet, cell_range)] = battery_values
+                continue
+            row, column = address
+            for i, value in enumerate(battery_values):
+                values[(sheet, join_cell_address(row, column + i))] = value
+        return values
+
+    def _get_config_cells(
+        self,
+    ) -> tuple[dict[tuple[str, str], str], dict[tuple[int, str, str], str]]:
+        """Get the cell ranges of the BatPaC_tool and [BatPaC_battery]
+        configuration
+
+        Returns
+        -------
+        tuple[dict[tuple[str, str], str], dict[tuple[int, str, str], str]]
+            Cell ranges in the format {("sheet", "name") : "cell range"} and
+            {(battery slot, "sheet", "name") : "cell range"} for the batteries
+            of the BatPaC object
+        """
+        batpac_cells = {}
+        battery_cells = {}
+        for sheet, sheet_cells in self.excel_cells.items():
+            for key, value in sheet_cells.items():
+                if not isinstance(value, dict):
+                    batpac_cells[(sheet, key)] = value
+                    continue
+                slot = int(key.replace("Battery ", "")) - 1
+                if slot >= len(self.batteries):
+                    continue
+                for battery_key, battery_value_range in value.items():
+                    battery_cells[
+                        (slot, sheet, battery_key)
+                    ] = battery_value_range
+        return batpac_cells, battery_cells
+
+    def _read_config_values(
+        self, batpac: bool = True, batteries: bool = True
+    ) -> dict[tuple[str, str], any]:
+        """Read the values of the BatPaC_tool and [BatPaC_battery]
+        configuration in bulk
+
+        Parameters
+        ----------
+        batpac : bool, optional
+            True, if the BatPaC_tool cells should be read, by default True.
+        batteries : bool, optional
+            True, if the [BatPaC_battery] cells should be read, by default
+            True.
+
+        Returns
+        -------
+        dict[tuple[str, str], any]
+            Values in the format {("sheet", "cell range") : value}
+        """
+        batpac_cells, battery_cells = self._get_config_cells()
+        cells = set()
+        if batpac:
+            cells.update(
+                (sheet, cell_range)
+                for (sheet, _), cell_range in batpac_cells.items()
+            )
+        if batteries:
+            cells.update(
+                (sheet, cell_range)
+                for (_, sheet, _), cell_range in battery_cells.items()
+            )
+        return self._read_values_bulk(cells)
+
+    def _save_batpac_config(
+        self, batpac_path: Path = None, values: dict = None
+    ) -> None:
         """Save BatPaC_tool configuration
 
         Read all BatPaC_tool properties from the BatPaC Excel tool, save
@@ -527,34 +853,33 @@ class BatpacTool(BatpyWorkbook):
         batpac_path : Path, optional
             If specified, storage path to the TOML file for BatPaC_tool
             properties, by default None.
+        values : dict, optional
+            Values read with _read_config_values, by default None reads the
+            BatPaC_tool cells.
         """
-        for sheet in self.excel_cells:
-            for key, value in self.excel_cells[sheet].items():
-                if isinstance(value, dict):
-                    continue
-                self.set_new_property(sheet, key, self.read_value(sheet, key))
+        if values is None:
+            values = self._read_config_values(batteries=False)
+        batpac_cells, _ = self._get_config_cells()
+        for (sheet, key), cell_range in batpac_cells.items():
+            self.set_new_property(sheet, key, values[(sheet, cell_range)])
 
         if batpac_path is not None:
+            configuration = {
+                "batpy": {
+                    "BatPaC SemVer": str(self.version),
+                    "information": "Saved configuration for BatPaC tool",
+                }
+            } | self.properties
             with open(batpac_path, "w", encoding="utf-8") as toml_file:
-                toml_file.write('["batpy"]\n')
-                toml_file.write(f"'BatPaC SemVer' = '{self.version}'\n")
                 toml_file.write(
-                    "'information' = 'Saved configuration for BatPaC tool'\n"
+                    dump_configuration(
+                        configuration, commented_keys=["Restart (0/1)"]
+                    )
                 )
-                for sheet in tqdm(
-                    self.properties, "Saving BatPaC config from each sheet"
-                ):
-                    toml_file.write(f'["{sheet}"]\n')
-                    for key, value in self.properties[sheet].items():
-                        if value is None or key == "Restart (0/1)":
-                            toml_file.write("# ")
-                        if isinstance(value, str):
-                            toml_file.write(f"'{key}' = '{value}'\n")
-                        else:
-                            toml_file.write(f"'{key}' = {value}\n")
-                    toml_file.write("\n")
-
-    def _save_battery_config(self, battery_path: Path = None) -> None:
+
+    def _save_battery_config(
+        self, battery_path: Path = None, values: dict = None
+    ) -> None:
         """Save [BatPaC_battery] configuration
 
         Read all BatPaC_tool included [BatPaC_battery] properties from the
@@ -566,43 +891,29 @@ class BatpacTool(BatpyWorkbook):
         battery_path : Path, optional
             If specified, storage path to the TOML file for [BatPaC_battery]
             properties, by default None.
+        values : dict, optional
+            Values read with _read_config_values, by default None reads the
+            [BatPaC_battery] cells.
         """
-        for sheet in self.excel_cells:
-            for key, value in self.excel_cells[sheet].items():
-                if isinstance(value, dict):
-                    battery_number = int(key.replace("Battery ", "")) - 1
-                    for battery_key, battery_value_range in value.items():
-                        self.batteries[battery_number].set_new_property(
-                            sheet,
-                            battery_key,
-                            self._read_value_direct(
-                                sheet, battery_value_range
-                            ),
-                        )
-                else:
-                    continue
+        if values is None:
+            values = self._read_config_values(batpac=False)
+        _, battery_cells = self._get_config_cells()
+        for (slot, sheet, key), cell_range in battery_cells.items():
+            self.batteries[slot].set_new_property(
+                sheet, key, values[(sheet, cell_range)]
+            )
 
         if battery_path is not None:
+            configuration = {
+                "batpy": {
+                    "BatPaC SemVer": str(self.version),
+                    "information": "Saved configuration for batteries",
+                }
+            }
+            for battery in self.batteries:
+                configuration[battery.name] = battery.properties
             with open(battery_path, "w", encoding="utf-8") as toml_file:
-                toml_file.write('["batpy"]\n')
-                toml_file.write(f"'BatPaC SemVer' = '{self.version}'\n")
-                toml_file.write(
-                    "'information' = 'Saved configuration for batteries'\n"
-                )
-                for battery in tqdm(
-                    self.batteries,
-                    "Saving battery configuration for each battery",
-                ):
-                    for sheet in battery.properties:
-                        toml_file.write(f'["{battery.name}"."{sheet}"]\n')
-                        for key, value in battery.properties[sheet].items():
-                            if value is None:
-                                toml_file.write("# ")
-                            if isinstance(value, str):
-                                toml_file.write(f"'{key}' = '{value}'\n")
-                            else:
-                                toml_file.write(f"'{key}' = {value}\n")
-                    toml_file.write("\n")
+                toml_file.write(dump_configuration(configuration))
 
     def save_config(
         self, batpac_path: Path = None, battery_path: Path = None
@@ -612,6 +923,8 @@ class BatpacTool(BatpyWorkbook):
         Read all BatPaC_tool properties and its included [BatPaC_battery]
         properties from the BatPaC Excel tool, save these properties in the
         BatPaC_tool and [BatPaC_battery] objects, and write them as TOML file.
+        All cells are read in bulk with one range read per block of nearby
+        cells on each sheet.
 
         Parameters
         ----------
@@ -622,5 +935,6 @@ class BatpacTool(BatpyWorkbook):
             If specified, storage path to the TOML file for [BatPaC_battery]
             properties, by default None.
         """
-        self._save_batpac_config(batpac_path)
-        self._save_battery_config(battery_path)
+        values = self._read_config_values()
+        self._save_batpac_config(batpac_path, values)
+        self._save_battery_config(battery_path, values)
@@ -1,14 +1,27 @@
 # -*- coding: UTF-8 -*-
 """Module, which includes the basic workbook class
 """
+import copy
 import logging
+from collections import Counter
+from collections.abc import Iterable
 from pathlib import Path
 
 import semantic_version
-import xlwings as xw
 
 import batpy
-from batpy.utility_functions import is_version_compatible, load_configuration
+from batpy.utility_functions import (
+    FrozenConfiguration,
+    group_cell_blocks,
+    group_contiguous_cells,
+    is_version_compatible,
+    join_cell_address,
+    load_cached_configuration,
+    split_cell_address,
+)
+from batpy.workbook_backends import WorkbookBackend, create_workbook_backend
+
+_NOT_WRITTEN = object()
 
 
 class BatpyWorkbook:
@@ -18,6 +31,7 @@ class BatpyWorkbook:
         self,
         batpy_workbook_path: Path,
         workbook_visible: bool = False,
+        backend: str | WorkbookBackend = "xlwings",
     ) -> None:
         """Initialize batpy workbook
 
@@ -30,12 +44,18 @@ class BatpyWorkbook:
         workbook_visible : bool, optional
             True, if workbook should be visible during operation, by default
             False.
+        backend : str | WorkbookBackend, optional
+            Name of the workbook backend ("xlwings", "memory" or "openpyxl")
+            or workbook backend object, by default "xlwings".
         """
         logging.info("[ ] Create workbook from %s", batpy_workbook_path)
         self.version = semantic_version.Version(batpy.__version__)
-        self.workbook = xw.Book(batpy_workbook_path)
-        self.workbook.app.visible = workbook_visible
+        self.backend = create_workbook_backend(backend)
+        self.backend.open(batpy_workbook_path, workbook_visible)
+        self.path = batpy_workbook_path
         self.properties = {}
+        self.cell_writes = Counter()
+        self._written_values = {}
         logging.info("[+] Created workbook from %s", batpy_workbook_path)
 
     def __del__(self) -> None:
@@ -44,15 +64,21 @@ class BatpyWorkbook:
         Set the workbook calculation method to "automatic" and the
         "screen_updating" to True after object destruction.
         """
+        if not hasattr(self, "backend"):
+            return
         try:
-            self.workbook.app.calculation = "automatic"
-            self.workbook.app.screen_updating = True
+            self.backend.set_automatic_calculation(True)
         except BaseException as error:
             logging.error("An exception occurred: %s", error)
             raise KeyError(
                 "Could not access the workbook (may already be closed)."
             ) from error
 
+    @property
+    def workbook(self) -> any:
+        """Underlying workbook object of the workbook backend"""
+        return self.backend.workbook
+
     def save(self, path: Path = None) -> None:
         """Save batpy workbook
 
@@ -66,9 +92,10 @@ class BatpyWorkbook:
             batpy workbook.
         """
         logging.info("[ ] Save workbook")
-        self.workbook.save(path)
+        self._sync_workbook()
+        self.backend.save(path)
         if path:
-            self.workbook = xw.Book(path)
+            self.path = path
         logging.info("[+] Saved workbook in %s", path)
 
     def close(self) -> bool:
@@ -82,23 +109,15 @@ class BatpyWorkbook:
         bool
             True, if batpy workbook is closed.
         """
-        if len(self.workbook.app.books) == 1:
-            self.workbook.app.quit()
-            logging.info("[+] Workbook and Excel closed")
-            return True
-        self.workbook.close()
-        logging.info("[+] Workbook closed")
-        return True
+        return self.backend.close()
 
     def stop_automatic_calculation(self) -> None:
         """Stop automatic Excel calculation"""
-        self.workbook.app.calculation = "manual"
-        self.workbook.app.screen_updating = False
+        self.backend.set_automatic_calculation(False)
 
     def start_automatic_calculation(self) -> None:
         """Start automatic Excel calculation"""
-        self.workbook.app.calculation = "automatic"
-        self.workbook.app.screen_updating = True
+        self.backend.set_automatic_calculation(True)
 
     def is_version_compatible(
         self,
@@ -135,28 +154,52 @@ class BatpyWorkbook:
         )
 
     def _load_user_configuration(
-        self, path_to_configuration: Path | str
+        self,
+        path_to_configuration: Path | str | FrozenConfiguration,
+        read_only: bool = False,
     ) -> dict:
         """Load configuration
 
-        Loads a single configuration from a TOML file or string.
+        Loads a single configuration from a TOML file or string. Each distinct
+        configuration is only parsed once (see load_cached_configuration).
 
         Parameters
         ----------
-        path_to_configuration : Path | str
-            Path to the TOML configuration file or configuration as string.
+        path_to_configuration : Path | str | FrozenConfiguration
+            Path to the TOML configuration file or configuration as string or
+            parsed batpy dataset (see datasets.get_parsed_batpy_dataset).
+        read_only : bool, optional
+            True, if the returned configuration will not be modified. Then
+            the cached configuration is returned without copying, by default
+            False.
 
         Returns
         -------
         dict
             Returns dictionary representation of configuration.
         """
-        config = load_configuration(path_to_configuration)
-        config_metadata = config.pop("batpy")
+        config_metadata, config = load_cached_configuration(
+            path_to_configuration
+        )
         self.is_version_compatible(
             semantic_version.Version(config_metadata["BatPaC SemVer"])
         )
-        return config
+        if read_only:
+            return config
+        return copy.deepcopy(config)
+
+    def _sync_workbook(self, write: bool = False) -> None:
+        """Synchronize workbook before accessing it
+
+        Called before the cells of the workbook are read or written and
+        before the workbook is saved. Subclasses, which defer writes (e.g.
+        BatpacTool with a result cache), write them here.
+
+        Parameters
+        ----------
+        write : bool, optional
+            True, if cells of the workbook are written, by default False.
+        """
 
     def _write_value_direct(
         self, worksheet: str, cell_range: str, value: any
@@ -174,7 +217,107 @@ class BatpyWorkbook:
         value : any
             Value to write in the batpy workbook.
         """
-        self.workbook.sheets[worksheet][cell_range].value = value
+        self._sync_workbook(write=True)
+        self.backend.write_value(worksheet, cell_range, value)
+        self._written_values.pop((worksheet, cell_range), None)
+
+    def _write_range_direct(
+        self, worksheet: str, cell_range: str, values: list[list[any]]
+    ) -> None:
+        """Write range in batpy workbook
+
+        Write the values of a cell range directly in the batpy workbook.
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the batpy workbook worksheet.
+        cell_range : str
+            Cell range of the batpy workbook.
+        values : list[list[any]]
+            Values to write in the batpy workbook (rows of columns).
+        """
+        self._sync_workbook(write=True)
+        self.backend.write_range(worksheet, cell_range, values)
+
+    def _write_values_bulk(
+        self,
+        values: dict[tuple[str, str], any],
+        tracked_values: dict[tuple[str, str], any] = None,
+    ) -> None:
+        """Write values in batpy workbook in bulk
+
+        Write the values of many cells with as few range writes as possible.
+        Contiguous cells of a worksheet are coalesced into rectangular blocks,
+        which are written with a single range write each. Cell ranges, which
+        are not a single cell, and lists of values are written directly.
+
+        Tracked values (e.g. of constant export mappings or calculation
+        inputs) are remembered after writing and skipped, if the same value
+        was already written as tracked value in this cell range and the cell
+        range was not written otherwise since. The number of written and
+        skipped cell ranges is counted in cell_writes.
+
+        Parameters
+        ----------
+        values : dict[tuple[str, str], any]
+            Values to write in the format {("worksheet", "cell range") : value}
+        tracked_values : dict[tuple[str, str], any], optional
+            Tracked values to write in the same format (values take
+            precedence), by default None.
+        """
+        values_to_write = dict(values)
+        if tracked_values:
+            for cell, value in tracked_values.items():
+                if cell in values:
+                    continue
+                written_value = self._written_values.get(cell, _NOT_WRITTEN)
+                if (
+                    written_value is _NOT_WRITTEN
+                    or type(written_value) is not type(value)
+                    or written_value != value
+                ):
+                    values_to_write[cell] = value
+            self.cell_writes["skipped"] += len(
+                tracked_values.keys() - values_to_write.keys()
+            )
+        self.cell_writes["written"] += len(values_to_write)
+
+        cells_by_worksheet = {}
+        for (worksheet, cell_range), value in values_to_write.items():
+            address = split_cell_address(cell_range)
+            if address is None or isinstance(value, (list, tuple)):
+                self._write_value_direct(worksheet, cell_range, value)
+            else:
+                cells_by_worksheet.setdefault(worksheet, {})[address] = value
+
+        for worksheet, worksheet_cells in cells_by_worksheet.items():
+            for (
+                first_row,
+                first_column,
+                last_row,
+                last_column,
+            ) in group_contiguous_cells(worksheet_cells):
+                self._write_range_direct(
+                    worksheet,
+                    join_cell_address(first_row, first_column)
+                    + ":"
+                    + join_cell_address(last_row, last_column),
+                    [
+                        [
+                            worksheet_cells[(row, column)]
+                            for column in range(first_column, last_column + 1)
+                        ]
+                        for row in range(first_row, last_row + 1)
+                    ],
+                )
+
+        for cell in values_to_write:
+            self._written_values.pop(cell, None)
+        if tracked_values:
+            for cell, value in tracked_values.items():
+                if cell not in values:
+                    self._written_values[cell] = value
 
     def _read_value_direct(self, worksheet: str, cell_range: str) -> any:
         """Read value from batpy workbook
@@ -199,10 +342,95 @@ class BatpyWorkbook:
             Raises KeyError if the specified worksheet or range could not be
             found.
         """
+        self._sync_workbook()
+        try:
+            return self.backend.read_value(worksheet, cell_range)
+        except BaseException as error:
+            logging.error("An exception occurred: %s", error)
+            logging.warning("[!] Key %s , %s not found", worksheet, cell_range)
+            raise KeyError from error
+
+    def _read_range_direct(
+        self, worksheet: str, cell_range: str
+    ) -> list[list[any]]:
+        """Read range from batpy workbook
+
+        Read the values of a cell range directly from the batpy workbook.
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the batpy workbook worksheet.
+        cell_range : str
+            Cell range of the batpy workbook.
+
+        Returns
+        -------
+        list[list[any]]
+            Values of the batpy workbook cell range (rows of columns).
+
+        Raises
+        ------
+        KeyError
+            Raises KeyError if the specified worksheet or range could not be
+            found.
+        """
+        self._sync_workbook()
         try:
-            value = self.workbook.sheets[worksheet][cell_range].value
-            return value
+            return self.backend.read_range(worksheet, cell_range)
         except BaseException as error:
             logging.error("An exception occurred: %s", error)
             logging.warning("[!] Key %s , %s not found", worksheet, cell_range)
             raise KeyError from error
+
+    def _read_values_bulk(
+        self, cells: Iterable[tuple[str, str]]
+    ) -> dict[tuple[str, str], any]:
+        """Read values from batpy workbook in bulk
+
+        Read the values of many cells with as few range reads as possible.
+        The cells are grouped by worksheet and each group of nearby cells is
+        read with a single range read of its bounding box. Cell ranges, which
+        are not a single cell, are read directly.
+
+        Parameters
+        ----------
+        cells : Iterable[tuple[str, str]]
+            Worksheets and cell ranges to read.
+
+        Returns
+        -------
+        dict[tuple[str, str], any]
+            Values in the format {("worksheet", "cell range") : value}
+        """
+        values = {}
+        cells_by_worksheet = {}
+        for worksheet, cell_range in cells:
+            address = split_cell_address(cell_range)
+            if address is None:
+                values[(worksheet, cell_range)] = self._read_value_direct(
+                    worksheet, cell_range
+                )
+            else:
+                cells_by_worksheet.setdefault(worksheet, {}).setdefault(
+                    address, []
+                ).append(cell_range)
+
+        for worksheet, worksheet_cells in cells_by_worksheet.items():
+            for (
+                (first_row, first_column, last_row, last_column),
+                block_cells,
+            ) in group_cell_blocks(worksheet_cells):
+                block_values = self._read_range_direct(
+                    worksheet,
+                    join_cell_address(first_row, first_column)
+                    + ":"
+                    + join_cell_address(last_row, last_column),
+                )
+                for row, column in block_cells:
+                    value = block_values[row - first_row][
+                        column - first_column
+                    ]
+                    for cell_range in worksheet_cells[(row, column)]:
+                        values[(worksheet, cell_range)] = value
+        return values
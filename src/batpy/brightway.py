@@ -7,7 +7,8 @@ from pathlib import Path
 from batpy.batpac_battery import BatpacBattery
 from batpy.batpac_tool import BatpacTool
 from batpy.batpy_workbook import BatpyWorkbook
-from batpy.formula_engine import evaluate_formula
+from batpy.export_mapping import ExportPlan, compile_export_plan
+from batpy.workbook_backends import WorkbookBackend
 
 
 class BrightwayConnector(BatpyWorkbook):
@@ -20,6 +21,7 @@ class BrightwayConnector(BatpyWorkbook):
         self,
         brightway_workbook_path: Path,
         workbook_visible: bool = False,
+        backend: str | WorkbookBackend = "xlwings",
     ) -> None:
         """Initialize brightway2
 
@@ -32,8 +34,11 @@ class BrightwayConnector(BatpyWorkbook):
         workbook_visible : bool, optional
             True, if workbook should be visible during operation, by default
             False.
+        backend : str | WorkbookBackend, optional
+            Name of the workbook backend ("xlwings", "memory" or "openpyxl")
+            or workbook backend object, by default "xlwings".
         """
-        super().__init__(brightway_workbook_path, workbook_visible)
+        super().__init__(brightway_workbook_path, workbook_visible, backend)
         self._chunk_length = 3
 
     def load_batpac_to_brightway_configuration(
@@ -52,108 +57,81 @@ class BrightwayConnector(BatpyWorkbook):
             path_batpac_to_brightway_file
         )
 
-    def _check_data_chunk(
-        self,
-        chunk_to_check: list,
-        batpac: BatpacTool,
-        battery: BatpacBattery,
-        batpac_config: Path | str | dict,
-    ) -> list:
-        """Checks data from list of chunks
+    def compile_export_plan(
+        self, batpac_config: Path | str | dict
+    ) -> ExportPlan:
+        """Compile export plan
 
-        Converts the references of the list and combines the single chunks into
-        a list of strings.
+        Compiles the loaded brightway2 configuration into an export plan with
+        the resolved cell ranges of the BatPaC Excel tool and the compiled
+        formulas. The export plan can be passed instead of the BatPaC
+        configuration to export_batpac_battery_to_brightway, to export many
+        batteries without compiling the configuration again.
 
         Parameters
         ----------
-        chunk_to_check : list
-            List of chunks to check
-        batpac : BatpacTool
-            Batpac object from which data should be read.
-        battery : BatpacBattery
-            Battery object from which data should be read.
         batpac_config : Path | str | dict
-            Configuration of the BatPaC tool with the corresponding cell ranges
+            Path to the TOML configuration file or configuration as string or
+            dictionary, which contains the cell ranges of the BatPaC Excel
+            tool.
 
         Returns
         -------
-        list
-            List of converted strings
-        """
-        chunk_list = []
-        for sublist_in_chunk in chunk_to_check:
-            if sublist_in_chunk[0] == "":
-                chunk_list.append(str(sublist_in_chunk[1]))
-            else:
-                chunk_list.append(
-                    str(
-                        batpac.read_value(
-                            sublist_in_chunk[0],
-                            sublist_in_chunk[1],
-                            battery,
-                            batpac_config,
-                        )
-                    )
-                )
-            if len(sublist_in_chunk) == self._chunk_length:
-                chunk_list.append(
-                    str(sublist_in_chunk[self._chunk_length - 1])
-                )
-        return chunk_list
-
-    def _get_data_from_chunk(
-        self,
-        chunk_to_write: list,
-        batpac: BatpacTool,
-        battery: BatpacBattery,
-        batpac_config: Path | str | dict,
-    ) -> float:
-        """Get data from chunk
-
-        Converts the chunks into a float.
-
-        Parameters
-        ----------
-        chunk_to_write : list
-            List of chunks to write
-        batpac : BatpacTool
-            Batpac object from which data should be read.
-        battery : BatpacBattery
-            Battery object from which data should be read.
-        batpac_config : Path | str | dict
-            Configuration of the BatPaC tool with the corresponding cell ranges
+        ExportPlan
+            Compiled export plan
 
-        Returns
-        -------
-        float
-            Calculated float of the chunk
+        Raises
+        ------
+        KeyError
+            If no configuration is loaded or a referenced cell could not be
+            found in the BatPaC configuration.
         """
-        data_chunk = self._check_data_chunk(
-            chunk_to_write, batpac, battery, batpac_config
+        if not self.properties:
+            raise KeyError(
+                "No configuration file. \
+Use 'load_batpac_to_brightway_configuration'."
+            )
+        if not isinstance(batpac_config, dict):
+            batpac_config = self._load_user_configuration(
+                batpac_config, read_only=True
+            )
+        return compile_export_plan(
+            self.properties,
+            batpac_config,
+            battery_specific=True,
+            chunk_length=self._chunk_length,
         )
-        formula = "".join(data_chunk)
-        return evaluate_formula(formula)
 
     def export_batpac_battery_to_brightway(
         self,
         batpac: BatpacTool,
         battery: BatpacBattery,
-        batpac_config: Path | str | dict,
+        batpac_config: Path | str | dict | ExportPlan,
+        incremental: bool = False,
     ) -> None:
         """Export battery from BatPaC in brightway worksheet
 
         Export specified battery from BatPaC Excel tool in the brightway2 Excel
         worksheet.
 
+        An incremental export assumes, that the brightway2 Excel worksheet was
+        only changed by batpy since the last incremental export. Constant
+        mappings are then only written once and skipped for subsequent
+        batteries.
+
         Parameters
         ----------
         batpac : BatpacTool
             BatPaC object to read from.
         battery : BatpacBattery
             Battery object to export.
-        batpac_config : Path | str | dict
+        batpac_config : Path | str | dict | ExportPlan
             Path to the TOML configuration file or configuration as string or
-            dictionary.
+            dictionary, or export plan compiled with compile_export_plan.
+        incremental : bool, optional
+            True, if constant mappings, which were already written with the
+            same value, should be skipped (see cell_writes for the number of
+            written and skipped values), by default False writes all mappings.
 
         Raises
         ------
@@ -165,34 +143,22 @@ class BrightwayConnector(BatpyWorkbook):
                 "No configuration file. \
 Use 'load_batpac_to_brightway_configuration'."
             )
-        if battery not in batpac.batteries:
-            raise KeyError("Battery not in BatPaC object.")
+        try:
+            # pylint: disable=W0212
+            battery_slot = batpac._get_battery_slot(battery)
+        except KeyError as error:
+            raise KeyError("Battery not in BatPaC object.") from error
+        if isinstance(batpac_config, ExportPlan):
+            export_plan = batpac_config
+        else:
+            export_plan = self.compile_export_plan(batpac_config)
         self.stop_automatic_calculation()
 
-        for (
-            brightway_sheet_name,
-            brightway_sheet_item,
-        ) in self.properties.items():
-            for (
-                brightway_sheet_item_key,
-                brightway_sheet_item_value,
-            ) in brightway_sheet_item.items():
-                chunks = [
-                    brightway_sheet_item_value[1][
-                        x : x + self._chunk_length  # noqa: E203
-                    ]
-                    for x in range(
-                        0,
-                        len(brightway_sheet_item_value[1]),
-                        self._chunk_length,
-                    )
-                ]
-                self._write_value_direct(
-                    brightway_sheet_name,
-                    brightway_sheet_item_value[0][0],
-                    self._get_data_from_chunk(
-                        chunks, batpac, battery, batpac_config
-                    ),
-                )
-                del brightway_sheet_item_key
+        source_values = batpac._read_values_bulk(  # pylint: disable=W0212
+            export_plan.get_source_cells(battery_slot)
+        )
+        values, constant_values = export_plan.split_values(
+            source_values, battery_slot, incremental
+        )
+        self._write_values_bulk(values, constant_values)
         self.start_automatic_calculation()
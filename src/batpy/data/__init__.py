@@ -2,6 +2,48 @@
 """batpy's build in datasets
 """
 
+import functools
 import os
 
-__versions__ = [f.name for f in os.scandir(f"{__path__[0]}") if f.is_dir()]
+
+@functools.cache
+def _get_versions() -> tuple[str, ...]:
+    """Get the names of the dataset version directories
+
+    The data directory is only scanned on first access of __versions__.
+
+    Returns
+    -------
+    tuple[str, ...]
+        Names of the dataset version directories
+    """
+    return tuple(
+        sorted(
+            entry.name
+            for entry in os.scandir(__path__[0])
+            if entry.is_dir() and not entry.name.startswith("_")
+        )
+    )
+
+
+def __getattr__(name: str) -> list[str]:
+    """Get lazy module attributes
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute
+
+    Returns
+    -------
+    list[str]
+        Available dataset versions for __versions__
+
+    Raises
+    ------
+    AttributeError
+        Raises AttributeError for other attributes.
+    """
+    if name == "__versions__":
+        return list(_get_versions())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
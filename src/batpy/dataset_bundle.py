@@ -0,0 +1,380 @@
+# -*- coding: UTF-8 -*-
+"""Module, which compiles and loads the precompiled dataset bundle
+
+The dataset bundle contains the parsed TOML datasets of all dataset versions
+in marshal format, indexed by the SHA-256 hash of the TOML text. Parsed
+configurations are looked up by the hash of their text, so a modified or new
+TOML file is never answered from an outdated bundle but parsed as TOML.
+
+The marshal format is specific to the Python version, so the bundle is not
+shipped with batpy but compiled on first use into the user cache directory,
+with one bundle per Python interpreter. The header of the bundle contains the
+marshal version and the Python version, which compiled the bundle, and the
+hash of the dataset files. A bundle of another Python version or of changed
+dataset files is compiled again.
+
+The bundle can also be compiled in advance (e.g. after installing batpy) with
+
+    python -m batpy.dataset_bundle
+"""
+import functools
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+from batpy import data
+
+BUNDLE_MAGIC = b"BATPYDS3"
+_HEADER = struct.Struct("<8sIBB32sQ")
+
+
+def get_default_bundle_path() -> Path:
+    """Get default bundle path
+
+    Returns
+    -------
+    Path
+        Path to the dataset bundle of the running Python interpreter in the
+        user cache directory ($XDG_CACHE_HOME/batpy or ~/.cache/batpy).
+    """
+    cache_directory = os.environ.get("XDG_CACHE_HOME", None)
+    if not cache_directory:
+        cache_directory = Path.home() / ".cache"
+    return Path(
+        cache_directory,
+        "batpy",
+        f"datasets.{sys.implementation.cache_tag}.bundle",
+    )
+
+
+def get_sources_hash(data_path: Path | str = None) -> bytes:
+    """Get the hash of the dataset files
+
+    The hash is computed from the path, size and modification time of the
+    TOML datasets, so changed dataset files are detected without reading
+    them.
+
+    Parameters
+    ----------
+    data_path : Path | str, optional
+        Path to the data directory with the dataset version directories, by
+        default None uses the batpy data directory.
+
+    Returns
+    -------
+    bytes
+        SHA-256 digest of the dataset files
+    """
+    data_path = Path(data_path) if data_path else Path(data.__path__[0])
+    sources_hash = hashlib.sha256()
+    for dataset_path in sorted(data_path.glob("*/*.toml")):
+        stat = dataset_path.stat()
+        sources_hash.update(
+            f"{dataset_path.relative_to(data_path).as_posix()}\0"
+            f"{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf-8")
+        )
+    return sources_hash.digest()
+
+
+def get_text_hash(configuration_text: str) -> str:
+    """Get the hash of a configuration text
+
+    Parameters
+    ----------
+    configuration_text : str
+        Configuration as TOML string
+
+    Returns
+    -------
+    str
+        SHA-256 hash of the configuration text
+    """
+    return hashlib.sha256(configuration_text.encode("utf-8")).hexdigest()
+
+
+def _intern_strings(value: any) -> any:
+    """Intern the strings of a configuration
+
+    Interned strings are stored once per configuration in marshal format.
+
+    Parameters
+    ----------
+    value : any
+        Configuration value
+
+    Returns
+    -------
+    any
+        Configuration value with interned strings
+    """
+    if isinstance(value, dict):
+        return {
+            sys.intern(key): _intern_strings(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_intern_strings(item) for item in value]
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def compile_dataset_bundle(
+    data_path: Path | str = None, bundle_path: Path | str = None
+) -> Path:
+    """Compile dataset bundle
+
+    Parse the TOML datasets of all dataset version directories and write
+    them into the dataset bundle. Datasets, which can not be stored in
+    marshal format, are skipped and loaded from TOML. The bundle is written
+    into a temporary file first and then replaces the bundle, so that
+    concurrent processes never read a partially written bundle.
+
+    Parameters
+    ----------
+    data_path : Path | str, optional
+        Path to the data directory with the dataset version directories, by
+        default None uses the batpy data directory.
+    bundle_path : Path | str, optional
+        Path to the dataset bundle, by default None uses
+        get_default_bundle_path().
+
+    Returns
+    -------
+    Path
+        Path to the dataset bundle
+    """
+    # pylint: disable=C0415
+    from batpy.utility_functions import _parse_configuration_text
+
+    data_path = Path(data_path) if data_path else Path(data.__path__[0])
+    bundle_path = (
+        Path(bundle_path) if bundle_path else get_default_bundle_path()
+    )
+    logging.info("[ ] Compile dataset bundle %s", bundle_path)
+    payloads = {}
+    for dataset_path in sorted(data_path.glob("*/*.toml")):
+        configuration_text = dataset_path.read_text(encoding="utf-8")
+        try:
+            payload = marshal.dumps(
+                _intern_strings(_parse_configuration_text(configuration_text))
+            )
+        except ValueError as error:
+            logging.warning(
+                "[!] Dataset %s not bundled: %s", dataset_path, error
+            )
+            continue
+        payloads[get_text_hash(configuration_text)] = payload
+
+    index = {}
+    offset = 0
+    for text_hash, payload in payloads.items():
+        index[text_hash] = (offset, len(payload))
+        offset += len(payload)
+    index_payload = marshal.dumps(index)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=bundle_path.parent, prefix=bundle_path.name, suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as bundle_file:
+            bundle_file.write(
+                _HEADER.pack(
+                    BUNDLE_MAGIC,
+                    marshal.version,
+                    *sys.version_info[:2],
+                    get_sources_hash(data_path),
+                    len(index_payload),
+                )
+            )
+            bundle_file.write(index_payload)
+            for payload in payloads.values():
+                bundle_file.write(payload)
+        os.replace(temporary_path, bundle_path)
+    except BaseException:
+        Path(temporary_path).unlink(missing_ok=True)
+        raise
+    logging.info(
+        "[+] Compiled %s datasets into bundle %s", len(index), bundle_path
+    )
+    return bundle_path
+
+
+class DatasetBundle:
+    """Memory mapped dataset bundle
+
+    Only the index is read on opening, each configuration is unmarshalled
+    from the memory map on request. Configurations are only unmarshalled, if
+    the bundle is compatible (compiled with the same marshal and Python
+    version).
+    """
+
+    def __init__(self, bundle_path: Path | str) -> None:
+        """Open dataset bundle
+
+        Parameters
+        ----------
+        bundle_path : Path | str
+            Path to the dataset bundle
+
+        Raises
+        ------
+        ValueError
+            Raises ValueError, if the file is no dataset bundle.
+        """
+        self.path = Path(bundle_path)
+        with open(self.path, "rb") as bundle_file:
+            self._mmap = mmap.mmap(
+                bundle_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{self.path} is no dataset bundle")
+        (
+            magic,
+            self.marshal_version,
+            major_version,
+            minor_version,
+            self.sources_hash,
+            index_length,
+        ) = _HEADER.unpack_from(self._mmap)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{self.path} is no dataset bundle")
+        self.python_version = (major_version, minor_version)
+        self.compatible = (self.marshal_version, self.python_version) == (
+            marshal.version,
+            sys.version_info[:2],
+        )
+        self._payload_offset = _HEADER.size + index_length
+        try:
+            self.index = marshal.loads(
+                self._mmap[_HEADER.size : self._payload_offset]  # noqa: E203
+            )
+        except (ValueError, EOFError, TypeError) as error:
+            raise ValueError(f"{self.path} has an invalid index") from error
+
+    def close(self) -> None:
+        """Close the memory map of the bundle"""
+        self._mmap.close()
+
+    def __contains__(self, text_hash: str) -> bool:
+        """Check if a configuration is bundled
+
+        Parameters
+        ----------
+        text_hash : str
+            SHA-256 hash of the TOML text (see get_text_hash)
+
+        Returns
+        -------
+        bool
+            True, if the configuration is bundled.
+        """
+        return text_hash in self.index
+
+    def get(self, text_hash: str) -> dict | None:
+        """Get configuration
+
+        Parameters
+        ----------
+        text_hash : str
+            SHA-256 hash of the TOML text (see get_text_hash)
+
+        Returns
+        -------
+        dict | None
+            New dictionary representation of the configuration, or None if
+            the configuration is not bundled, the bundle is not compatible or
+            the configuration can not be unmarshalled.
+        """
+        if not self.compatible:
+            return None
+        try:
+            offset, length = self.index[text_hash]
+        except KeyError:
+            return None
+        start = self._payload_offset + offset
+        try:
+            return marshal.loads(
+                self._mmap[start : start + length]  # noqa: E203
+            )
+        except (ValueError, EOFError, TypeError) as error:
+            logging.warning(
+                "[!] Dataset %s not loaded from bundle: %s", text_hash, error
+            )
+            return None
+
+
+@functools.cache
+def get_dataset_bundle() -> DatasetBundle | None:
+    """Get the dataset bundle of the batpy data directory
+
+    The dataset bundle is opened once per process. A missing, invalid,
+    incompatible or outdated bundle is compiled (see compile_dataset_bundle).
+
+    Returns
+    -------
+    DatasetBundle | None
+        Dataset bundle, or None if no valid and compatible dataset bundle is
+        available and it can not be compiled.
+    """
+    bundle_path = get_default_bundle_path()
+    try:
+        bundle = DatasetBundle(bundle_path)
+    except FileNotFoundError:
+        bundle = None
+    except (OSError, ValueError, EOFError, TypeError) as error:
+        logging.info("[!] Invalid dataset bundle: %s", error)
+        bundle = None
+    if bundle is not None:
+        if bundle.compatible and bundle.sources_hash == get_sources_hash():
+            return bundle
+        logging.info("[!] Outdated dataset bundle %s", bundle_path)
+        bundle.close()
+    try:
+        compile_dataset_bundle(bundle_path=bundle_path)
+        bundle = DatasetBundle(bundle_path)
+    except (OSError, ValueError, EOFError, TypeError) as error:
+        logging.info("[!] No dataset bundle available: %s", error)
+        return None
+    if not bundle.compatible:
+        logging.info(
+            "[!] Dataset bundle of Python %s.%s skipped",
+            *bundle.python_version,
+        )
+        return None
+    return bundle
+
+
+def load_bundled_configuration(
+    configuration_text: str, text_hash: str = None
+) -> dict | None:
+    """Load configuration from the dataset bundle
+
+    Parameters
+    ----------
+    configuration_text : str
+        Configuration as TOML string
+    text_hash : str, optional
+        SHA-256 hash of configuration_text, by default None computes it.
+
+    Returns
+    -------
+    dict | None
+        Dictionary representation of configuration, or None if the
+        configuration is not bundled.
+    """
+    bundle = get_dataset_bundle()
+    if bundle is None:
+        return None
+    return bundle.get(text_hash or get_text_hash(configuration_text))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    compile_dataset_bundle()
@@ -3,8 +3,10 @@
 """
 
 # import logging
+import functools
 import os
 import shutil
+from collections.abc import Iterable
 from pathlib import Path
 from pkgutil import get_data, get_loader
 from types import ModuleType
@@ -14,6 +16,145 @@ import semantic_version
 from batpy import data, utility_functions
 
 
+class DatasetRegistry:
+    """Registry of the included batpy datasets
+
+    The available dataset versions are parsed once and the dataset names of
+    each version are listed on first request, so repeated dataset lookups are
+    dictionary hits.
+    """
+
+    def __init__(self, version_dirs: Iterable[str]) -> None:
+        """Initialize dataset registry
+
+        Parameters
+        ----------
+        version_dirs : Iterable[str]
+            Names of the dataset directories. Names, which are no semantic
+            versions, are ignored.
+        """
+        versions = []
+        for version_dir in version_dirs:
+            try:
+                versions.append(semantic_version.Version(version_dir))
+            except ValueError:
+                continue
+        self.versions = tuple(sorted(versions))
+        self.latest_version = max(self.versions) if self.versions else None
+        self._dataset_names = {}
+
+    def get_dataset_version(
+        self, dataset_version: semantic_version.Version | str = None
+    ) -> semantic_version.Version:
+        """Get dataset version
+
+        Parameters
+        ----------
+        dataset_version : semantic_version.Version | str, optional
+            Specific version of the included batpy dataset, otherwise latest
+            version available, by default None.
+
+        Returns
+        -------
+        semantic_version.Version
+            Dataset version
+        """
+        if isinstance(dataset_version, str):
+            if dataset_version == "":
+                return self.latest_version
+            return _parse_version(dataset_version)
+        if dataset_version is None:
+            return self.latest_version
+        return dataset_version
+
+    def get_dataset_names(
+        self, dataset_version: semantic_version.Version | str = None
+    ) -> list[str]:
+        """Get dataset names
+
+        Parameters
+        ----------
+        dataset_version : semantic_version.Version | str, optional
+            Specific version of the included batpy dataset, otherwise latest
+            version available, by default None.
+
+        Returns
+        -------
+        list[str]
+            List of included batpy dataset names.
+
+        Raises
+        ------
+        ValueError
+            If 'dataset_version' is not available.
+        """
+        dataset_version = self.get_dataset_version(dataset_version)
+        if dataset_version not in self.versions:
+            raise ValueError(
+                f"dataset version {dataset_version} is not available"
+            )
+        if dataset_version not in self._dataset_names:
+            self._dataset_names[dataset_version] = tuple(
+                dataset_name
+                for dataset_name in os.listdir(
+                    Path(data.__path__[0], _get_version_dir(dataset_version))
+                )
+                if dataset_name.endswith(".toml")
+            )
+        return list(self._dataset_names[dataset_version])
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_version(dataset_version: str) -> semantic_version.Version:
+    """Parse dataset version
+
+    Parameters
+    ----------
+    dataset_version : str
+        Dataset version as string
+
+    Returns
+    -------
+    semantic_version.Version
+        Dataset version
+    """
+    return semantic_version.Version(dataset_version)
+
+
+def _get_version_dir(dataset_version: semantic_version.Version) -> str:
+    """Get the name of the dataset directory of a dataset version
+
+    Parameters
+    ----------
+    dataset_version : semantic_version.Version
+        Dataset version
+
+    Returns
+    -------
+    str
+        Name of the dataset directory
+    """
+    return (
+        f"{dataset_version.major}."
+        f"{dataset_version.minor}."
+        f"{dataset_version.patch}"
+    )
+
+
+@functools.cache
+def get_dataset_registry() -> DatasetRegistry:
+    """Get dataset registry
+
+    The dataset registry is created once per process.
+
+    Returns
+    -------
+    DatasetRegistry
+        Registry of the included batpy datasets
+    """
+    return DatasetRegistry(data.__versions__)
+
+
 def get_available_batpy_dataset_versions() -> list[semantic_version.Version]:
     """Get available batpy dataset versions
 
@@ -22,14 +163,7 @@ def get_available_batpy_dataset_versions() -> list[semantic_version.Version]:
     list[semantic_version.Version]
         List of available batpy dataset versions
     """
-
-    available_versions = []
-    for version_dir in data.__versions__:
-        try:
-            available_versions.append(semantic_version.Version(version_dir))
-        except ValueError:
-            continue
-    return available_versions
+    return list(get_dataset_registry().versions)
 
 
 def get_latest_batpy_dataset_version() -> semantic_version.Version:
@@ -40,7 +174,7 @@ def get_latest_batpy_dataset_version() -> semantic_version.Version:
     semantic_version.Version
         Latest batpy dataset version available
     """
-    return max(get_available_batpy_dataset_versions())
+    return get_dataset_registry().latest_version
 
 
 def get_batpy_dataset(
@@ -61,26 +195,10 @@ def get_batpy_dataset(
     str
         File content as string.
     """
-    data_dir = "data/"
-    if isinstance(dataset_version, str):
-        if dataset_version == "":
-            dataset_version = None
-        else:
-            dataset_version = semantic_version.Version(dataset_version)
-
-    if dataset_version is None:
-        dataset_version = get_latest_batpy_dataset_version()
-
-    if dataset_version:
-        data_dir = (
-            data_dir
-            + str(dataset_version.major)
-            + "."
-            + str(dataset_version.minor)
-            + "."
-            + str(dataset_version.patch)
-            + "/"
-        )
+    dataset_version = get_dataset_registry().get_dataset_version(
+        dataset_version
+    )
+    data_dir = f"data/{_get_version_dir(dataset_version)}/"
 
     if not dataset_name.endswith(".toml"):
         dataset_name += ".toml"
@@ -89,6 +207,60 @@ def get_batpy_dataset(
     return get_data(__name__, data_dir + filename).decode()
 
 
+def get_parsed_batpy_dataset(
+    dataset_name: str, dataset_version: semantic_version.Version | str = None
+) -> utility_functions.FrozenConfiguration:
+    """Get parsed batpy dataset
+
+    Each dataset is only parsed once per process. The returned read-only
+    configuration is shared between all callers and can be used everywhere a
+    configuration path or string is accepted.
+
+    Parameters
+    ----------
+    dataset_name : str
+        Name of included batpy dataset.
+    dataset_version : semantic_version.Version | str, optional
+        Specific version of the included batpy dataset, otherwise latest
+        version available, by default None.
+
+    Returns
+    -------
+    utility_functions.FrozenConfiguration
+        Read-only configuration with the batpy metadata as metadata.
+    """
+    return _parse_batpy_dataset(
+        dataset_name.removesuffix(".toml"),
+        get_dataset_registry().get_dataset_version(dataset_version),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_batpy_dataset(
+    dataset_name: str, dataset_version: semantic_version.Version
+) -> utility_functions.FrozenConfiguration:
+    """Parse batpy dataset
+
+    Parameters
+    ----------
+    dataset_name : str
+        Name of included batpy dataset.
+    dataset_version : semantic_version.Version
+        Version of the included batpy dataset.
+
+    Returns
+    -------
+    utility_functions.FrozenConfiguration
+        Read-only configuration with the batpy metadata as metadata.
+    """
+    config = utility_functions.load_configuration(
+        get_batpy_dataset(dataset_name, dataset_version)
+    )
+    return utility_functions.FrozenConfiguration(
+        config, config.pop("batpy", {})
+    )
+
+
 def get_available_batpy_dataset_names(
     dataset_version: semantic_version.Version | str = None,
 ) -> list[str]:
@@ -111,41 +283,7 @@ def get_available_batpy_dataset_names(
         If 'dataset_version' is not available.
     """
 
-    batpy_dataset_names = []
-    data_dir = data.__path__[0] + "/"
-
-    if isinstance(dataset_version, str):
-        if dataset_version == "":
-            dataset_version = None
-        else:
-            dataset_version = semantic_version.Version(dataset_version)
-
-    if dataset_version is None:
-        dataset_version = get_latest_batpy_dataset_version()
-
-    if dataset_version:
-        data_dir = (
-            data_dir
-            + str(dataset_version.major)
-            + "."
-            + str(dataset_version.minor)
-            + "."
-            + str(dataset_version.patch)
-            + "/"
-        )
-
-    if dataset_version in get_available_batpy_dataset_versions():
-        batpy_dataset_names = next(os.walk(data_dir), (None, None, []))[2]
-        batpy_dataset_names = [
-            dataset_name
-            for dataset_name in batpy_dataset_names
-            if dataset_name.endswith(".toml")
-        ]
-
-    else:
-        raise ValueError(f"dataset version {dataset_version} is not available")
-
-    return batpy_dataset_names
+    return get_dataset_registry().get_dataset_names(dataset_version)
 
 
 def get_dataset_information(dataset_stream: str) -> str:
@@ -246,26 +384,10 @@ def copy_integrated_dataset(
         Specific version of the included batpy dataset, otherwise latest
         version available, by default None.
     """
-    if isinstance(dataset_version_to_export, str):
-        if dataset_version_to_export == "":
-            dataset_version_to_export = None
-        else:
-            dataset_version_to_export = semantic_version.Version(
-                dataset_version_to_export
-            )
-
-    if dataset_version_to_export is None:
-        dataset_version_to_export = get_latest_batpy_dataset_version()
-
-    if dataset_version_to_export:
-        data_dir = (
-            str(dataset_version_to_export.major)
-            + "."
-            + str(dataset_version_to_export.minor)
-            + "."
-            + str(dataset_version_to_export.patch)
-            + "/"
-        )
+    dataset_version_to_export = get_dataset_registry().get_dataset_version(
+        dataset_version_to_export
+    )
+    data_dir = _get_version_dir(dataset_version_to_export)
     if not dataset_to_export.endswith(".toml"):
         dataset_to_export += ".toml"
 
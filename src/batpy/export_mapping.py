@@ -0,0 +1,495 @@
+# -*- coding: UTF-8 -*-
+"""Module, which handles the export mappings between batpy workbooks
+
+An export mapping assigns a formula to a target cell range of a workbook. The
+formula is described by a flat list of chunks in the format
+[worksheet, name, operation], in which the worksheet and name reference a
+cell of the source workbook. If the worksheet is an empty string, the name is
+taken as it is (e.g. constant or parenthesis).
+
+Referenced cells are not spliced into the formula as text. Instead they are
+replaced by named variables, so that the formula of a mapping is the same for
+every battery and only the values of the variables change.
+
+An export configuration can be compiled into an export plan, which contains
+the compiled formulas and the resolved cell ranges of the referenced cells.
+The plan can be evaluated repeatedly for many batteries with only value
+reads and arithmetic.
+"""
+
+import logging
+from collections.abc import Iterator, Mapping
+from typing import NamedTuple
+
+from batpy.formula_engine import CompiledFormula, compile_formula
+
+CHUNK_LENGTH = 3
+REFERENCE_VARIABLE_PREFIX = "_ref_"
+
+
+def split_mapping_chunks(
+    mapping_formula: list, chunk_length: int = CHUNK_LENGTH
+) -> list[list]:
+    """Split mapping formula into chunks
+
+    Parameters
+    ----------
+    mapping_formula : list
+        Flat list of the mapping formula
+    chunk_length : int, optional
+        Length of a single chunk, by default CHUNK_LENGTH
+
+    Returns
+    -------
+    list[list]
+        List of chunks in the format [worksheet, name, operation]
+    """
+    return [
+        mapping_formula[x : x + chunk_length]  # noqa: E203
+        for x in range(0, len(mapping_formula), chunk_length)
+    ]
+
+
+def build_mapping_formula(
+    chunks: list[list], chunk_length: int = CHUNK_LENGTH
+) -> tuple[str, dict[str, tuple[str, str]]]:
+    """Build formula with named variables from chunks
+
+    Each referenced cell is replaced by a named variable. A cell, which is
+    referenced multiple times, is bound to the same variable.
+
+    Parameters
+    ----------
+    chunks : list[list]
+        List of chunks in the format [worksheet, name, operation]
+    chunk_length : int, optional
+        Length of a single chunk, by default CHUNK_LENGTH
+
+    Returns
+    -------
+    tuple[str, dict[str, tuple[str, str]]]
+        Formula and the binding of its variables in the format
+        {"variable" : ("worksheet", "name")}
+
+    Examples
+    --------
+    >>> build_mapping_formula([["Sheet", "Name", "+"], ["", "5"]])
+    ('_ref_0+5', {'_ref_0': ('Sheet', 'Name')})
+    """
+    formula_parts = []
+    variables = {}
+    for sublist_in_chunk in chunks:
+        if sublist_in_chunk[0] == "":
+            formula_parts.append(str(sublist_in_chunk[1]))
+        else:
+            reference = (sublist_in_chunk[0], sublist_in_chunk[1])
+            formula_parts.append(
+                variables.setdefault(
+                    reference, f"{REFERENCE_VARIABLE_PREFIX}{len(variables)}"
+                )
+            )
+        if len(sublist_in_chunk) == chunk_length:
+            formula_parts.append(str(sublist_in_chunk[chunk_length - 1]))
+    bindings = {
+        variable: reference for reference, variable in variables.items()
+    }
+    return "".join(formula_parts), bindings
+
+
+def get_constant_value(
+    chunks: list[list], chunk_length: int = CHUNK_LENGTH
+) -> float | None:
+    """Get value of a constant mapping
+
+    A mapping is constant, if it does not reference any cell and its formula
+    is folded into a single value.
+
+    Parameters
+    ----------
+    chunks : list[list]
+        List of chunks in the format [worksheet, name, operation]
+    chunk_length : int, optional
+        Length of a single chunk, by default CHUNK_LENGTH
+
+    Returns
+    -------
+    float | None
+        Value of the mapping, if the mapping is constant, otherwise None.
+    """
+    formula, bindings = build_mapping_formula(chunks, chunk_length)
+    if bindings:
+        return None
+    return compile_formula(formula).constant_value
+
+
+def get_constant_mappings(
+    properties: dict, chunk_length: int = CHUNK_LENGTH
+) -> dict[str, dict[str, float]]:
+    """Get constant mappings of an export configuration
+
+    Constant mappings write the same value for every battery, so that they
+    only need to be written once in a workbook.
+
+    Parameters
+    ----------
+    properties : dict
+        Export configuration in the format
+        {"sheet" : {"name" : [[cell range], [mapping formula]]} }
+    chunk_length : int, optional
+        Length of a single chunk, by default CHUNK_LENGTH
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        Constant mappings and their values in the format
+        {"sheet" : {"name" : value} }
+    """
+    constant_mappings = {}
+    for sheet_name, sheet_item in properties.items():
+        for item_key, item_value in sheet_item.items():
+            constant_value = get_constant_value(
+                split_mapping_chunks(item_value[1], chunk_length),
+                chunk_length,
+            )
+            if constant_value is not None:
+                constant_mappings.setdefault(sheet_name, {})[
+                    item_key
+                ] = constant_value
+    return constant_mappings
+
+
+class ExportPlanSource(NamedTuple):
+    """Referenced cell of an export plan entry
+
+    Attributes
+    ----------
+    variable : str
+        Variable of the formula, which is bound to the referenced cell
+    worksheet : str
+        Name of the source workbook worksheet
+    name : str
+        Name of the source workbook cell description
+    cell_ranges : tuple[str | None, ...]
+        Cell range for each battery slot (index 0 for "Battery 1"), or a
+        single cell range if the referenced cell is not battery specific. None,
+        if no cell range is defined for the battery slot.
+    battery_specific : bool
+        True, if cell_ranges contains the cell range for each battery slot,
+        False, if cell_ranges contains the cell range for all batteries.
+    """
+
+    variable: str
+    worksheet: str
+    name: str
+    cell_ranges: tuple[str | None, ...]
+    battery_specific: bool
+
+
+class ExportPlanEntry(NamedTuple):
+    """Compiled mapping of an export plan
+
+    Attributes
+    ----------
+    worksheet : str
+        Name of the target workbook worksheet
+    cell_range : str
+        Cell range of the target workbook
+    formula : CompiledFormula
+        Compiled formula of the mapping
+    sources : tuple[ExportPlanSource, ...]
+        Referenced cells, which are bound to the variables of the formula
+    """
+
+    worksheet: str
+    cell_range: str
+    formula: CompiledFormula
+    sources: tuple[ExportPlanSource, ...]
+
+
+class ExportPlan:
+    """Compiled export configuration
+
+    The export plan contains a compiled entry for each mapping of an export
+    configuration. It is immutable and can be evaluated repeatedly for many
+    batteries. If the export configuration or the cell configuration
+    changes, a new export plan has to be compiled.
+    """
+
+    def __init__(self, entries: tuple[ExportPlanEntry, ...]) -> None:
+        """Initialize export plan
+
+        Parameters
+        ----------
+        entries : tuple[ExportPlanEntry, ...]
+            Compiled mappings of the export configuration
+        """
+        self.entries = tuple(entries)
+
+    def __len__(self) -> int:
+        """Number of compiled mappings
+
+        Returns
+        -------
+        int
+            Number of compiled mappings
+        """
+        return len(self.entries)
+
+    def get_source_cells(self, battery_slot: int = 0) -> list[tuple[str, str]]:
+        """Get referenced cells of the export plan
+
+        Parameters
+        ----------
+        battery_slot : int, optional
+            Battery slot (index 0 for "Battery 1") of the battery specific
+            cells, by default 0.
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            Unique worksheets and cell ranges of all referenced cells.
+
+        Raises
+        ------
+        KeyError
+            If a referenced cell is not defined for the battery slot.
+        """
+        source_cells = {}
+        for entry in self.entries:
+            for source in entry.sources:
+                source_cells[
+                    (
+                        source.worksheet,
+                        _get_source_cell_range(source, battery_slot),
+                    )
+                ] = None
+        return list(source_cells)
+
+    def evaluate(
+        self,
+        source_values: Mapping[tuple[str, str], any],
+        battery_slot: int = 0,
+    ) -> Iterator[tuple[ExportPlanEntry, float]]:
+        """Evaluate export plan
+
+        The export plan is evaluated from a snapshot of the values of the
+        referenced cells (see get_source_cells), so that the source workbook
+        can be read in bulk beforehand.
+
+        Parameters
+        ----------
+        source_values : Mapping[tuple[str, str], any]
+            Values of the referenced cells in the format
+            {("worksheet", "cell range") : value}
+        battery_slot : int, optional
+            Battery slot (index 0 for "Battery 1") from which the battery
+            specific cells are read, by default 0.
+
+        Yields
+        ------
+        Iterator[tuple[ExportPlanEntry, float]]
+            Compiled mapping and its calculated value
+
+        Raises
+        ------
+        KeyError
+            If a referenced cell is not defined for the battery slot or not
+            included in source_values.
+        """
+        for entry in self.entries:
+            vars_val = {}
+            for source in entry.sources:
+                vars_val[source.variable] = source_values[
+                    (
+                        source.worksheet,
+                        _get_source_cell_range(source, battery_slot),
+                    )
+                ]
+            yield entry, entry.formula(vars_val)
+
+    def split_values(
+        self,
+        source_values: Mapping[tuple[str, str], any],
+        battery_slot: int = 0,
+        split_constants: bool = True,
+    ) -> tuple[dict[tuple[str, str], float], dict[tuple[str, str], float]]:
+        """Evaluate export plan into values and constant values
+
+        Parameters
+        ----------
+        source_values : Mapping[tuple[str, str], any]
+            Values of the referenced cells in the format
+            {("worksheet", "cell range") : value}
+        battery_slot : int, optional
+            Battery slot (index 0 for "Battery 1") from which the battery
+            specific cells are read, by default 0.
+        split_constants : bool, optional
+            True, if the values of constant mappings should be returned
+            separately, by default True.
+
+        Returns
+        -------
+        tuple[dict[tuple[str, str], float], dict[tuple[str, str], float]]
+            Values of the mappings and values of the constant mappings (empty,
+            if split_constants is False) in the format
+            {("worksheet", "cell range") : value}
+        """
+        values = {}
+        constant_values = {}
+        for entry, value in self.evaluate(source_values, battery_slot):
+            if split_constants and entry.formula.is_constant:
+                constant_values[(entry.worksheet, entry.cell_range)] = value
+            else:
+                values[(entry.worksheet, entry.cell_range)] = value
+        return values, constant_values
+
+
+def _get_source_cell_range(source: ExportPlanSource, battery_slot: int) -> str:
+    """Get cell range of a referenced cell for a battery slot
+
+    Parameters
+    ----------
+    source : ExportPlanSource
+        Referenced cell
+    battery_slot : int
+        Battery slot (index 0 for "Battery 1")
+
+    Returns
+    -------
+    str
+        Cell range of the referenced cell
+
+    Raises
+    ------
+    KeyError
+        If the referenced cell is not defined for the battery slot.
+    """
+    if not source.battery_specific:
+        return source.cell_ranges[0]
+    cell_range = None
+    if 0 <= battery_slot < len(source.cell_ranges):
+        cell_range = source.cell_ranges[battery_slot]
+    if cell_range is None:
+        logging.warning(
+            "[!] Key %s , %s not found for Battery %s",
+            source.worksheet,
+            source.name,
+            battery_slot + 1,
+        )
+        raise KeyError(
+            f"{source.worksheet}, {source.name} not found for "
+            f"Battery {battery_slot + 1}"
+        )
+    return cell_range
+
+
+def _resolve_cell_ranges(
+    cell_config: dict, worksheet: str, name: str, battery_specific: bool
+) -> tuple[str | None, ...]:
+    """Resolve cell ranges of a referenced cell
+
+    Parameters
+    ----------
+    cell_config : dict
+        Cell configuration of the source workbook
+    worksheet : str
+        Name of the source workbook worksheet
+    name : str
+        Name of the source workbook cell description
+    battery_specific : bool
+        True, if the cell ranges are defined for each battery in the format
+        {"sheet" : {"Battery N" : {"name" : cell range} } }.
+
+    Returns
+    -------
+    tuple[str | None, ...]
+        Cell range for each battery slot or a single cell range, if the
+        referenced cell is not battery specific.
+
+    Raises
+    ------
+    KeyError
+        If the worksheet or cell description could not be found.
+    """
+    try:
+        worksheet_config = cell_config[worksheet]
+        if not battery_specific:
+            return (worksheet_config[name],)
+
+        battery_cell_ranges = {}
+        for battery_key, battery_config in worksheet_config.items():
+            if isinstance(battery_config, dict) and name in battery_config:
+                battery_number = int(battery_key.replace("Battery ", ""))
+                battery_cell_ranges[battery_number - 1] = battery_config[name]
+        if not battery_cell_ranges:
+            raise KeyError(name)
+    except (KeyError, TypeError, ValueError) as error:
+        logging.warning("[!] Key %s , %s not found", worksheet, name)
+        raise KeyError(f"{worksheet}, {name} not found") from error
+
+    return tuple(
+        battery_cell_ranges.get(battery_slot)
+        for battery_slot in range(max(battery_cell_ranges) + 1)
+    )
+
+
+def compile_export_plan(
+    properties: dict,
+    cell_config: dict,
+    battery_specific: bool = True,
+    chunk_length: int = CHUNK_LENGTH,
+) -> ExportPlan:
+    """Compile export configuration into an export plan
+
+    Parameters
+    ----------
+    properties : dict
+        Export configuration in the format
+        {"sheet" : {"name" : [[cell range], [mapping formula]]} }
+    cell_config : dict
+        Cell configuration of the source workbook, which contains the cell
+        ranges of the referenced cells.
+    battery_specific : bool, optional
+        True, if the referenced cells are defined for each battery in the
+        cell configuration, by default True.
+    chunk_length : int, optional
+        Length of a single chunk, by default CHUNK_LENGTH
+
+    Returns
+    -------
+    ExportPlan
+        Compiled export plan
+
+    Raises
+    ------
+    KeyError
+        If a referenced cell could not be found in the cell configuration.
+    """
+    entries = []
+    for sheet_name, sheet_item in properties.items():
+        for item_value in sheet_item.values():
+            formula, bindings = build_mapping_formula(
+                split_mapping_chunks(item_value[1], chunk_length),
+                chunk_length,
+            )
+            sources = tuple(
+                ExportPlanSource(
+                    variable,
+                    worksheet,
+                    name,
+                    _resolve_cell_ranges(
+                        cell_config, worksheet, name, battery_specific
+                    ),
+                    battery_specific,
+                )
+                for variable, (worksheet, name) in bindings.items()
+            )
+            entries.append(
+                ExportPlanEntry(
+                    sheet_name,
+                    item_value[0][0],
+                    compile_formula(formula),
+                    sources,
+                )
+            )
+    return ExportPlan(tuple(entries))
@@ -7,9 +7,13 @@
     """
 
 import ast
+import functools
 import operator
+from collections.abc import Callable, Mapping
+from types import ModuleType
 
 MAX_FORMULA_LENGTH = 1024
+FORMULA_CACHE_SIZE = 1024
 
 
 def _byte_offset_to_char_offset(source: str, byte_offset: int) -> int:
@@ -143,54 +147,326 @@ class FormulaRuntimeError(FormulaError):
     """
 
 
-def _eval_constant(
-    source: str, node: ast.Constant, vars_val: dict[str, any]
-) -> float:
-    """Evaluate the value of the AST constant node
+def _import_numpy() -> ModuleType:
+    """Import numpy for vectorized evaluation
+
+    numpy is only needed for the vectorized evaluation of formulas (optional
+    dependency of the extra "batch") and is therefore imported on first use.
+
+    Returns
+    -------
+    ModuleType
+        numpy module
+
+    Raises
+    ------
+    ImportError
+        Error, if numpy is not installed
+    """
+    try:
+        import numpy  # pylint: disable=C0415
+    except ImportError as error:
+        raise ImportError(
+            "Vectorized formula evaluation requires numpy "
+            "(pip install batpy[batch])"
+        ) from error
+    return numpy
+
+
+class _ConstantFunction:
+    """Lowered formula part, which always evaluates to the same value
+
+    Constant parts of a formula are folded while compiling the formula and
+    are represented by this callable, so that the folded value can be
+    inspected.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: float) -> None:
+        """Initialize constant function
+
+        Parameters
+        ----------
+        value : float
+            Value of the constant
+        """
+        self.value = value
+
+    def __call__(self, bound_values: dict[str, float]) -> float:
+        """Evaluate constant function
+
+        Parameters
+        ----------
+        bound_values : dict[str, float]
+            Variables used in the formula and their values (not used)
+
+        Returns
+        -------
+        float
+            Value of the constant
+        """
+        _ = bound_values
+        return self.value
+
+
+class CompiledFormula:
+    """Formula, which is parsed, validated and lowered into a callable once
+
+    A compiled formula can be evaluated repeatedly with different variable
+    values, without parsing the formula or walking the AST again. Constant
+    subexpressions are folded while compiling; if the whole formula is
+    constant, is_constant is True and constant_value holds its value.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        function: Callable[[dict[str, float]], float],
+        variable_nodes: dict[str, ast.Name],
+    ) -> None:
+        """Initialize compiled formula
+
+        Parameters
+        ----------
+        source : str
+            Formula, which has been compiled
+        function : Callable[[dict[str, float]], float]
+            Lowered formula, which evaluates the formula for bound variables
+        variable_nodes : dict[str, ast.Name]
+            Variables used in the formula and their (first) AST name node
+        """
+        self.source = source
+        self.variables = frozenset(variable_nodes)
+        self._function = function
+        self._variable_nodes = variable_nodes
+
+    @property
+    def is_constant(self) -> bool:
+        """Check if the compiled formula is constant
+
+        Returns
+        -------
+        bool
+            True, if the formula does not depend on any variable and was
+            folded into a single value.
+        """
+        return isinstance(self._function, _ConstantFunction)
+
+    @property
+    def constant_value(self) -> float | None:
+        """Get the value of a constant formula
+
+        Returns
+        -------
+        float | None
+            Value of the formula, if the formula is constant, otherwise None.
+        """
+        if self.is_constant:
+            return self._function.value
+        return None
+
+    def __repr__(self) -> str:
+        """Compiled formula representation
+
+        Returns
+        -------
+        str
+            Compiled formula as string
+        """
+        return f"{type(self).__name__}({self.source!r})"
+
+    def _bind(self, vars_val: dict[str, any]) -> dict[str, any]:
+        """Bind the variables used in the formula
+
+        Parameters
+        ----------
+        vars_val : dict[str, any]
+            Variables and their values used to evaluate the function
+
+        Returns
+        -------
+        dict[str, any]
+            Variables used in the formula and their values
+
+        Raises
+        ------
+        FormulaSyntaxError.from_ast_node
+            Error, if a variable of the formula is undefined
+        """
+        bound_values = {}
+        for name, node in self._variable_nodes.items():
+            try:
+                bound_values[name] = vars_val[name]
+            except KeyError as exc:
+                raise FormulaSyntaxError.from_ast_node(
+                    self.source, node, f"Undefined variable: {name}"
+                ) from exc
+        return bound_values
+
+    def __call__(self, vars_val: dict[str, any] = None) -> float:
+        """Evaluate compiled formula
+
+        Parameters
+        ----------
+        vars_val : dict[str, any], optional
+            Variables and their values used to evaluate the function,
+            by default None
+
+        Returns
+        -------
+        float
+            Result of the evaluated formula
+
+        Raises
+        ------
+        FormulaSyntaxError
+            Error, if a variable of the formula is undefined
+        FormulaRuntimeError
+            Error, if exception occurs during runtime
+        """
+        if vars_val is None:
+            vars_val = {}
+        bound_values = self._bind(vars_val)
+
+        try:
+            for name, value in bound_values.items():
+                bound_values[name] = float(value)
+            return self._function(bound_values)
+        except Exception as error:
+            raise FormulaRuntimeError(f"Evaluation failed: {error}") from error
+
+    def evaluate_batch(self, vars_columns: Mapping[str, any] = None) -> any:
+        """Evaluate compiled formula over whole columns
+
+        Evaluate the compiled formula in a single vectorized pass with numpy.
+        The columns of the variables used in the formula are broadcast against
+        each other, so scalars can be mixed with columns. Columns of unused
+        variables are ignored.
+
+        Parameters
+        ----------
+        vars_columns : Mapping[str, any], optional
+            Variables and their columns (array-like) of values used to
+            evaluate the function, by default None
+
+        Returns
+        -------
+        numpy.ndarray
+            Results of the evaluated formula for each row
+
+        Raises
+        ------
+        FormulaSyntaxError
+            Error, if a variable of the formula is undefined
+        FormulaRuntimeError
+            Error, if exception occurs during runtime
+        """
+        numpy = _import_numpy()
+        if vars_columns is None:
+            vars_columns = {}
+        bound_columns = self._bind(vars_columns)
+
+        try:
+            shape = numpy.broadcast_shapes(
+                *(numpy.shape(column) for column in bound_columns.values())
+            )
+            for name, column in bound_columns.items():
+                bound_columns[name] = numpy.asarray(column, dtype=float)
+            with numpy.errstate(divide="raise", invalid="raise"):
+                result = self._function(bound_columns)
+            return numpy.broadcast_to(
+                numpy.asarray(result, dtype=float), shape
+            ).copy()
+        except Exception as error:
+            raise FormulaRuntimeError(f"Evaluation failed: {error}") from error
+
+
+def _compile_constant(
+    source: str, node: ast.Constant
+) -> Callable[[dict[str, float]], float]:
+    """Compile the AST constant node
 
     Parameters
     ----------
     source : str
-        Formula to evaluate
+        Formula to compile
     node : ast.Constant
         Ast node
-    vars_val : dict[str, any]
-        Variables and their values used to evaluate the function
 
     Returns
     -------
-    float
-        Result of the evaluated formula
+    Callable[[dict[str, float]], float]
+        Callable, which returns the value of the constant
 
     Raises
     ------
     FormulaSyntaxError.from_ast_node
         Error, if AST node's formula syntax is wrong
     """
-    _ = vars_val
     if isinstance(node.value, (int, float)):
-        return float(node.value)
+        return _ConstantFunction(float(node.value))
     raise FormulaSyntaxError.from_ast_node(
         source, node, "Literals of this type are not supported"
     )
 
 
-def _eval_name(source: str, node: ast.Name, vars_val: dict[str, any]) -> float:
-    """Evaluate the value of the variable (AST name node)
+def _compile_name(
+    source: str, node: ast.Name
+) -> Callable[[dict[str, float]], float]:
+    """Compile the variable (AST name node)
 
     Parameters
     ----------
     source : str
-        Formula to evaluate
+        Formula to compile
     node : ast.Name
         Ast node
-    vars_val : dict[str, any]
-        Variables and their values used to evaluate the function
 
     Returns
     -------
-    float
-        Result of the evaluated formula
+    Callable[[dict[str, float]], float]
+        Callable, which returns the bound value of the variable
+    """
+    _ = source
+    return operator.itemgetter(node.id)
+
+
+def _is_constant_one(function: Callable[[dict[str, float]], float]) -> bool:
+    """Check if a lowered formula part is the constant one
+
+    Parameters
+    ----------
+    function : Callable[[dict[str, float]], float]
+        Lowered formula part
+
+    Returns
+    -------
+    bool
+        True, if the formula part always evaluates to one.
+    """
+    return isinstance(function, _ConstantFunction) and function.value == 1.0
+
+
+def _compile_node(
+    source: str, node: ast.AST
+) -> Callable[[dict[str, float]], float]:
+    """Compile supported AST node
+
+    The compile_node function accepts supported AST nodes and passes the node
+    to a more specific function, which is looked up by the exact node type.
+
+    Parameters
+    ----------
+    source : str
+        Formula to compile
+    node : ast.AST
+        Ast node
+
+    Returns
+    -------
+    Callable[[dict[str, float]], float]
+        Callable, which evaluates the node for bound variables
 
     Raises
     ------
@@ -198,53 +474,71 @@ def _eval_name(source: str, node: ast.Name, vars_val: dict[str, any]) -> float:
         Error, if AST node's formula syntax is wrong
     """
     try:
-        return float(vars_val[node.id])
+        compiler = _NODE_COMPILERS[type(node)]
     except KeyError as exc:
         raise FormulaSyntaxError.from_ast_node(
-            source, node, f"Undefined variable: {node.id}"
+            source, node, "This syntax is not supported"
         ) from exc
 
+    return compiler(source, node)
+
 
-def _eval_node(source: str, node: ast.AST, vars_val: dict[str, any]) -> float:
-    """Evaluate supported AST node
+@functools.lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def compile_formula(formula: str) -> CompiledFormula:
+    """Compile formula from string
 
-    The eval_node function accepts supported AST nodes and passes the node to a
-    more specific function.
+    The formula is parsed and validated once and lowered into a reusable
+    callable. Compiled formulas are cached by their formula text, so repeated
+    formulas only cost the binding of their variables.
 
     Parameters
     ----------
-    source : str
-        Formula to evaluate
-    node : ast.AST
-        Ast node
-    vars_val : dict[str, any]
-        Variables and their values used to evaluate the function
+    formula : str
+        Formula to compile
 
     Returns
     -------
-    float
-        Result of the evaluated formula
+    CompiledFormula
+        Compiled formula
 
     Raises
     ------
-    FormulaSyntaxError.from_ast_node
-        Error, if AST node's formula syntax is wrong
+    FormulaSyntaxError
+        Error, if formula syntax is wrong
+    FormulaSyntaxError.from_syntax_error
+        Error, if formula could not be parsed
+
+    Examples
+    --------
+    >>> compiled_formula = compile_formula("a + b * 2")
+    >>> compiled_formula({"a": 2, "b": 20})
+    42.0
     """
-    supported_evaluators = {
-        ast.Expression: _eval_expression,
-        ast.Constant: _eval_constant,
-        ast.Name: _eval_name,
-        ast.BinOp: _eval_binop,
-        ast.UnaryOp: _eval_unaryop,
-    }
-
-    for ast_type, evaluator in supported_evaluators.items():
-        if isinstance(node, ast_type):
-            return evaluator(source, node, vars_val)
+    if len(formula) > MAX_FORMULA_LENGTH:
+        raise FormulaSyntaxError(
+            f"The formula is too long: {len(formula)} > {MAX_FORMULA_LENGTH}",
+            1,
+            1,
+        )
 
-    raise FormulaSyntaxError.from_ast_node(
-        source, node, "This syntax is not supported"
-    )
+    try:
+        node = ast.parse(formula, "<string>", mode="eval")
+    except SyntaxError as error:
+        raise FormulaSyntaxError.from_syntax_error(error, "Could not parse")
+
+    try:
+        function = _compile_node(formula, node)
+    except RecursionError as error:
+        raise FormulaSyntaxError(
+            "The formula is nested too deeply", 1, 1
+        ) from error
+
+    variable_nodes = {}
+    for child_node in ast.walk(node):
+        if isinstance(child_node, ast.Name):
+            variable_nodes.setdefault(child_node.id, child_node)
+
+    return CompiledFormula(formula, function, variable_nodes)
 
 
 def evaluate_formula(formula: str, vars_val: dict[str, any] = None) -> float:
@@ -275,134 +569,175 @@ def evaluate_formula(formula: str, vars_val: dict[str, any] = None) -> float:
     Examples
     --------
     >>> evaluate_formula("a + b * 2", {"a": 2, "b": 20})
-    42
+    42.0
     """
-    if vars_val is None:
-        vars_val = {}
-    if len(formula) > MAX_FORMULA_LENGTH:
-        raise FormulaSyntaxError(
-            f"The formula is too long: {len(formula)} > {MAX_FORMULA_LENGTH}",
-            1,
-            1,
-        )
+    return compile_formula(formula)(vars_val)
 
-    try:
-        node = ast.parse(formula, "<string>", mode="eval")
-    except SyntaxError as error:
-        raise FormulaSyntaxError.from_syntax_error(error, "Could not parse")
 
-    try:
-        return _eval_node(formula, node, vars_val)
-    except FormulaSyntaxError:
-        raise
-    except Exception as error:
-        raise FormulaRuntimeError(f"Evaluation failed: {error}") from error
+def evaluate_formula_batch(
+    formula: str, vars_columns: Mapping[str, any] = None
+) -> any:
+    """Evaluate formula from string over whole columns
 
+    The formula is compiled once and evaluated in a single vectorized pass
+    with numpy, e.g. for all rows of a Monte Carlo simulation.
 
-def _eval_expression(
-    source: str, node: ast.Expression, vars_val: dict[str, any]
-) -> float:
-    """Evaluate top level AST node
+    Parameters
+    ----------
+    formula : str
+        Formula to evaluate
+    vars_columns : Mapping[str, any], optional
+        Variables and their columns (array-like) of values used to evaluate
+        the function, by default None
+
+    Returns
+    -------
+    numpy.ndarray
+        Results of the evaluated formula for each row
+
+    Raises
+    ------
+    FormulaSyntaxError
+        Error, if formula syntax is wrong
+    FormulaSyntaxError.from_syntax_error
+        Error, if formula could not be parsed
+    FormulaRuntimeError
+        Error, if exception occurs during runtime
+
+    Examples
+    --------
+    >>> evaluate_formula_batch("a + b * 2", {"a": [2, 4], "b": [20, 19]})
+    array([42., 42.])
+    """
+    return compile_formula(formula).evaluate_batch(vars_columns)
+
+
+def _compile_expression(
+    source: str, node: ast.Expression
+) -> Callable[[dict[str, float]], float]:
+    """Compile top level AST node
 
     Parameters
     ----------
     source : str
-        Formula to evaluate
+        Formula to compile
     node : ast.AST
         Ast node
-    vars_val : dict[str, any]
-        Variables and their values used to evaluate the function
 
     Returns
     -------
-    float
-        Result of the evaluated formula
+    Callable[[dict[str, float]], float]
+        Callable, which evaluates the formula for bound variables
     """
-    return _eval_node(source, node.body, vars_val)
+    return _compile_node(source, node.body)
 
 
-def _eval_binop(
-    source: str, node: ast.BinOp, vars_val: dict[str, any]
-) -> float:
-    """Evaluate binary operations from AST node
+def _compile_binop(
+    source: str, node: ast.BinOp
+) -> Callable[[dict[str, float]], float]:
+    """Compile binary operations from AST node
 
-    Evaluate the left and the right operands using eval_node and then apply
-    the binary operation over their values.
+    Compile the left and the right operands using compile_node and return a
+    callable, which applies the binary operation over their values. If both
+    operands are constant, the operation is folded into a constant.
+    Multiplications and divisions by one are dropped, since they do not
+    change the value.
 
     Parameters
     ----------
     source : str
-        Formula to evaluate
+        Formula to compile
     node : ast.BinOp
         Ast node
-    vars_val : dict[str, any]
-        Variables and their values used to evaluate the function
 
     Returns
     -------
-    float
-        Result of the evaluated formula
+    Callable[[dict[str, float]], float]
+        Callable, which evaluates the binary operation for bound variables
 
     Raises
     ------
     FormulaSyntaxError.from_ast_node
         Error, if AST node's formula syntax is wrong
     """
-    supported_operations = {
-        ast.Add: operator.add,
-        ast.Sub: operator.sub,
-        ast.Mult: operator.mul,
-        ast.Div: operator.truediv,
-    }
-
-    left_value = _eval_node(source, node.left, vars_val)
-    right_value = _eval_node(source, node.right, vars_val)
+    left = _compile_node(source, node.left)
+    right = _compile_node(source, node.right)
 
     try:
-        apply = supported_operations[type(node.op)]
+        apply = _SUPPORTED_BINARY_OPERATIONS[type(node.op)]
     except KeyError as exc:
         raise FormulaSyntaxError.from_ast_node(
             source, node, "Operations of this type are not supported"
         ) from exc
 
-    return apply(left_value, right_value)
+    if isinstance(left, _ConstantFunction) and isinstance(
+        right, _ConstantFunction
+    ):
+        try:
+            return _ConstantFunction(apply(left.value, right.value))
+        except ArithmeticError:
+            # Errors like a division by zero are raised on evaluation
+            pass
+    if _is_constant_one(right) and apply in (operator.mul, operator.truediv):
+        return left
+    if _is_constant_one(left) and apply is operator.mul:
+        return right
+
+    return lambda bound_values: apply(left(bound_values), right(bound_values))
 
 
-def _eval_unaryop(
-    source: str, node: ast.UnaryOp, vars_val: dict[str, any]
-) -> float:
-    """Evaluate unary operations from AST node
+def _compile_unaryop(
+    source: str, node: ast.UnaryOp
+) -> Callable[[dict[str, float]], float]:
+    """Compile unary operations from AST node
 
     Parameters
     ----------
     source : str
-        Formula to evaluate
+        Formula to compile
     node : ast.UnaryOp
         Ast node
-    vars_val : dict[str, any]
-        Variables and their values used to evaluate the function
 
     Returns
     -------
-    float
-        Result of the evaluated formula
+    Callable[[dict[str, float]], float]
+        Callable, which evaluates the unary operation for bound variables
 
     Raises
     ------
     FormulaSyntaxError.from_ast_node
         Error, if AST node's formula syntax is wrong
     """
-    supported_operations = {
-        ast.USub: operator.neg,
-    }
-
-    operand_value = _eval_node(source, node.operand, vars_val)
+    operand = _compile_node(source, node.operand)
 
     try:
-        apply = supported_operations[type(node.op)]
+        apply = _SUPPORTED_UNARY_OPERATIONS[type(node.op)]
     except KeyError as exc:
         raise FormulaSyntaxError.from_ast_node(
             source, node, "Operations of this type are not supported"
         ) from exc
 
-    return apply(operand_value)
+    if isinstance(operand, _ConstantFunction):
+        return _ConstantFunction(apply(operand.value))
+
+    return lambda bound_values: apply(operand(bound_values))
+
+
+_SUPPORTED_BINARY_OPERATIONS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+_SUPPORTED_UNARY_OPERATIONS = {
+    ast.USub: operator.neg,
+}
+
+_NODE_COMPILERS = {
+    ast.Expression: _compile_expression,
+    ast.Constant: _compile_constant,
+    ast.Name: _compile_name,
+    ast.BinOp: _compile_binop,
+    ast.UnaryOp: _compile_unaryop,
+}
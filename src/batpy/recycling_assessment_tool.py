@@ -9,7 +9,8 @@ from batpy.batpac_battery import BatpacBattery
 from batpy.batpac_tool import BatpacTool
 from batpy.batpy_workbook import BatpyWorkbook
 from batpy.brightway import BrightwayConnector
-from batpy.formula_engine import evaluate_formula
+from batpy.export_mapping import ExportPlan, compile_export_plan
+from batpy.workbook_backends import WorkbookBackend
 
 
 class RATConnector(BatpyWorkbook):
@@ -24,6 +25,7 @@ class RATConnector(BatpyWorkbook):
         rat_workbook_path: Path,
         excel_cell_definitions_toml_path: Path | str,
         workbook_visible: bool = False,
+        backend: str | WorkbookBackend = "xlwings",
     ) -> None:
         """Initialize RAT
 
@@ -36,14 +38,18 @@ class RATConnector(BatpyWorkbook):
         workbook_visible : bool, optional
             True, if workbook should be visible during operation, by default
             False.
+        backend : str | WorkbookBackend, optional
+            Name of the workbook backend ("xlwings", "memory" or "openpyxl")
+            or workbook backend object, by default "xlwings".
         """
-        super().__init__(rat_workbook_path, workbook_visible)
+        super().__init__(rat_workbook_path, workbook_visible, backend)
         self.excel_cells = self._load_user_configuration(
             excel_cell_definitions_toml_path
         )
         self._chunk_length = 3
         self.properties_batpac = None
         self.properties_brightway = None
+        self._export_plans = {}
 
     def load_batpac_to_rat_configuration(
         self, path_batpac_to_rat_file: Path | str
@@ -60,6 +66,7 @@ class RATConnector(BatpyWorkbook):
         self.properties_batpac = self._load_user_configuration(
             path_batpac_to_rat_file
         )
+        self._export_plans.pop("batpac_to_rat", None)
 
     def load_rat_to_brightway_configuration(
         self, path_rat_to_brightway_file: Path | str
@@ -76,6 +83,7 @@ class RATConnector(BatpyWorkbook):
         self.properties_brightway = self._load_user_configuration(
             path_rat_to_brightway_file
         )
+        self._export_plans.pop("rat_to_brightway", None)
 
     def _wb_helper_range(
         self,
@@ -115,7 +123,7 @@ class RATConnector(BatpyWorkbook):
                     range_dict = additional_cell_config
                 else:
                     range_dict = self._load_user_configuration(
-                        additional_cell_config
+                        additional_cell_config, read_only=True
                     )
             else:
                 range_dict = self.excel_cells
@@ -159,175 +167,161 @@ class RATConnector(BatpyWorkbook):
             self._wb_helper_range(worksheet, name, additional_cell_config),
         )
 
-    def _check_data_chunk_batpac(
+    def _get_export_plan(
         self,
-        chunk_to_check: list,
-        batpac: BatpacTool,
-        battery: BatpacBattery,
-        batpac_config: Path | str | dict,
-    ) -> list:
-        """Checks data from list of chunks from batpac
-
-        Converts the references of the list and combines the single chunks into
-        a list of strings.
+        plan_name: str,
+        properties: dict,
+        cell_config: Path | str | dict,
+        battery_specific: bool,
+    ) -> ExportPlan:
+        """Get cached export plan
+
+        Returns the cached export plan, if it was compiled for the same cell
+        configuration, otherwise the export plan is compiled and cached. Cell
+        configurations from TOML files or strings are identified by their
+        content (see load_cached_configuration), dictionaries by identity. The
+        cache is invalidated, if a new configuration is loaded.
 
         Parameters
         ----------
-        chunk_to_check : list
-            List of chunks to check
-        batpac : BatpacTool
-            Batpac object from which data should be read.
-        battery : BatpacBattery
-            Battery object from which data should be read.
-        batpac_config : Path | str | dict
-            Configuration of the BatPaC tool with the corresponding cell ranges
+        plan_name : str
+            Name of the export plan in the cache.
+        properties : dict
+            Export configuration to compile.
+        cell_config : Path | str | dict
+            Path to the TOML configuration file or configuration as string or
+            dictionary, which contains the cell ranges of the source workbook.
+        battery_specific : bool
+            True, if the referenced cells are defined for each battery in the
+            cell configuration.
 
         Returns
         -------
-        list
-            List of converted strings
+        ExportPlan
+            Compiled export plan
         """
-        chunk_list = []
-        for sublist_in_chunk in chunk_to_check:
-            if sublist_in_chunk[0] == "":
-                chunk_list.append(str(sublist_in_chunk[1]))
-            else:
-                chunk_list.append(
-                    str(
-                        batpac.read_value(
-                            sublist_in_chunk[0],
-                            sublist_in_chunk[1],
-                            battery,
-                            batpac_config,
-                        )
-                    )
-                )
-            if len(sublist_in_chunk) == self._chunk_length:
-                chunk_list.append(
-                    str(sublist_in_chunk[self._chunk_length - 1])
-                )
-        return chunk_list
-
-    def _get_data_from_chunk_batpac(
-        self,
-        chunk_to_write: list,
-        batpac: BatpacTool,
-        battery: BatpacBattery,
-        batpac_config: Path | str | dict,
-    ) -> float:
-        """Get data from chunk from batpac
+        if isinstance(cell_config, dict):
+            cell_config_dict = cell_config
+        else:
+            cell_config_dict = self._load_user_configuration(
+                cell_config, read_only=True
+            )
+        cached_plan = self._export_plans.get(plan_name, None)
+        if cached_plan is not None and cached_plan[0] is cell_config_dict:
+            return cached_plan[1]
+
+        export_plan = compile_export_plan(
+            properties,
+            cell_config_dict,
+            battery_specific=battery_specific,
+            chunk_length=self._chunk_length,
+        )
+        self._export_plans[plan_name] = (cell_config_dict, export_plan)
+        return export_plan
+
+    def compile_batpac_to_rat_plan(
+        self, batpac_config: Path | str | dict
+    ) -> ExportPlan:
+        """Compile export plan from BatPaC to RAT
 
-        Converts the chunks into a float.
+        Compiles the loaded BatPaC to RAT configuration into an export plan,
+        which can be passed instead of the BatPaC configuration to
+        export_batpac_battery_to_rat. The export plan is cached on the
+        connector until a new configuration is loaded.
 
         Parameters
         ----------
-        chunk_to_write : list
-            List of chunks to write
-        batpac : BatpacTool
-            Batpac object from which data should be read.
-        battery : BatpacBattery
-            Battery object from which data should be read.
         batpac_config : Path | str | dict
-            Configuration of the BatPaC tool with the corresponding cell ranges
+            Path to the TOML configuration file or configuration as string or
+            dictionary, which contains the cell ranges of the BatPaC Excel
+            tool.
 
         Returns
         -------
-        float
-            Calculated float of the chunk
+        ExportPlan
+            Compiled export plan
+
+        Raises
+        ------
+        KeyError
+            If no configuration is loaded or a referenced cell could not be
+            found in the BatPaC configuration.
         """
-        data_chunk = self._check_data_chunk_batpac(
-            chunk_to_write, batpac, battery, batpac_config
+        if not self.properties_batpac:
+            raise KeyError(
+                "No configuration file. \
+Use 'load_batpac_to_rat_configuration'."
+            )
+        return self._get_export_plan(
+            "batpac_to_rat", self.properties_batpac, batpac_config, True
         )
-        formula = "".join(data_chunk)
-        return evaluate_formula(formula)
 
-    def _check_data_chunk(
-        self,
-        chunk_to_check: list,
-        rat_config: Path | str | dict,
-    ) -> list:
-        """Checks data from list of chunks
+    def compile_rat_to_brightway_plan(
+        self, rat_config: Path | str | dict
+    ) -> ExportPlan:
+        """Compile export plan from RAT to brightway
 
-        Converts the references of the list and combines the single chunks into
-        a list of strings.
+        Compiles the loaded RAT to brightway configuration into an export
+        plan, which can be passed instead of the RAT configuration to
+        export_rat_to_brightway. The export plan is cached on the connector
+        until a new configuration is loaded.
 
         Parameters
         ----------
-        chunk_to_check : list
-            List of chunks to check
         rat_config : Path | str | dict
-            Configuration of the rat tool with the corresponding cell ranges
+            Path to the TOML configuration file or configuration as string or
+            dictionary, which contains the cell ranges of the RAT Excel tool.
 
         Returns
         -------
-        list
-            List of converted strings
-        """
-        chunk_list = []
-        for sublist_in_chunk in chunk_to_check:
-            if sublist_in_chunk[0] == "":
-                chunk_list.append(str(sublist_in_chunk[1]))
-            else:
-                chunk_list.append(
-                    str(
-                        self.read_value(
-                            sublist_in_chunk[0],
-                            sublist_in_chunk[1],
-                            rat_config,
-                        )
-                    )
-                )
-            if len(sublist_in_chunk) == self._chunk_length:
-                chunk_list.append(
-                    str(sublist_in_chunk[self._chunk_length - 1])
-                )
-        return chunk_list
-
-    def _get_data_from_chunk(
-        self,
-        chunk_to_write: list,
-        rat_config: Path | str | dict,
-    ) -> float:
-        """Get data from chunk
-
-        Converts the chunks into a float.
-
-        Parameters
-        ----------
-        chunk_to_write : list
-            List of chunks to write
-        rat_config : Path | str | dict
-            Configuration of the rat tool with the corresponding cell ranges
+        ExportPlan
+            Compiled export plan
 
-        Returns
-        -------
-        float
-            Calculated float of the chunk
+        Raises
+        ------
+        KeyError
+            If no configuration is loaded or a referenced cell could not be
+            found in the RAT configuration.
         """
-        data_chunk = self._check_data_chunk(chunk_to_write, rat_config)
-        formula = "".join(data_chunk)
-        return evaluate_formula(formula)
+        if not self.properties_brightway:
+            raise KeyError(
+                "No configuration file. \
+Use 'load_rat_to_brightway_configuration'."
+            )
+        return self._get_export_plan(
+            "rat_to_brightway", self.properties_brightway, rat_config, False
+        )
 
     def export_batpac_battery_to_rat(
         self,
         batpac: BatpacTool,
         battery: BatpacBattery,
-        batpac_config: Path | str | dict,
+        batpac_config: Path | str | dict | ExportPlan,
+        incremental: bool = False,
     ) -> None:
         """Export battery from BatPaC in rat worksheet
 
         Export specified battery from BatPaC Excel tool in the RAT Excel
         worksheet.
 
+        An incremental export assumes, that the RAT Excel worksheet was only
+        changed by batpy since the last incremental export. Constant mappings
+        are then only written once and skipped for subsequent batteries.
+
         Parameters
         ----------
         batpac : BatpacTool
             BatPaC object to read from.
         battery : BatpacBattery
             Battery object to export.
-        batpac_config : Path | str | dict
+        batpac_config : Path | str | dict | ExportPlan
             Path to the TOML configuration file or configuration as string or
-            dictionary.
+            dictionary, or export plan compiled with
+            compile_batpac_to_rat_plan.
+        incremental : bool, optional
+            True, if constant mappings, which were already written with the
+            same value, should be skipped (see cell_writes for the number of
+            written and skipped values), by default False writes all mappings.
 
         Raises
         ------
@@ -339,55 +333,53 @@ class RATConnector(BatpyWorkbook):
                 "No configuration file. \
 Use 'load_batpac_to_rat_configuration'."
             )
-        if battery not in batpac.batteries:
-            raise KeyError("Battery not in BatPaC object.")
+        try:
+            # pylint: disable=W0212
+            battery_slot = batpac._get_battery_slot(battery)
+        except KeyError as error:
+            raise KeyError("Battery not in BatPaC object.") from error
+        if isinstance(batpac_config, ExportPlan):
+            export_plan = batpac_config
+        else:
+            export_plan = self.compile_batpac_to_rat_plan(batpac_config)
         self.stop_automatic_calculation()
 
-        for (
-            rat_sheet_name,
-            rat_sheet_item,
-        ) in self.properties_batpac.items():
-            for (
-                rat_sheet_item_key,
-                rat_sheet_item_value,
-            ) in rat_sheet_item.items():
-                chunks = [
-                    rat_sheet_item_value[1][
-                        x : x + self._chunk_length  # noqa: E203
-                    ]
-                    for x in range(
-                        0,
-                        len(rat_sheet_item_value[1]),
-                        self._chunk_length,
-                    )
-                ]
-                self._write_value_direct(
-                    rat_sheet_name,
-                    rat_sheet_item_value[0][0],
-                    self._get_data_from_chunk_batpac(
-                        chunks, batpac, battery, batpac_config
-                    ),
-                )
-                del rat_sheet_item_key
+        source_values = batpac._read_values_bulk(  # pylint: disable=W0212
+            export_plan.get_source_cells(battery_slot)
+        )
+        values, constant_values = export_plan.split_values(
+            source_values, battery_slot, incremental
+        )
+        self._write_values_bulk(values, constant_values)
         self.start_automatic_calculation()
 
     def export_rat_to_brightway(
         self,
         brightway: BrightwayConnector,
-        rat_config: Path | str | dict,
+        rat_config: Path | str | dict | ExportPlan,
+        incremental: bool = False,
     ) -> None:
         """Export current battery from rat to brightway worksheet
 
         Export the current battery from the recycling assessment tool to the
         brightway worksheet.
 
+        An incremental export assumes, that the brightway worksheet was only
+        changed by batpy since the last incremental export. Constant mappings
+        are then only written once and skipped for subsequent batteries.
+
         Parameters
         ----------
         brightway : BrightwayConnector
             Brightway object to export the data.
-        rat_config : Path | str | dict
+        rat_config : Path | str | dict | ExportPlan
             Path to the TOML configuration file or configuration as string or
-            dictionary.
+            dictionary, or export plan compiled with
+            compile_rat_to_brightway_plan.
+        incremental : bool, optional
+            True, if constant mappings, which were already written with the
+            same value, should be skipped (see cell_writes for the number of
+            written and skipped values), by default False writes all mappings.
 
         Raises
         ------
@@ -399,31 +391,17 @@ Use 'load_batpac_to_rat_configuration'."
                 "No configuration file. \
 Use 'load_rat_to_brightway_configuration'."
             )
+        if isinstance(rat_config, ExportPlan):
+            export_plan = rat_config
+        else:
+            export_plan = self.compile_rat_to_brightway_plan(rat_config)
         self.stop_automatic_calculation()
 
-        for (
-            rat_sheet_name,
-            rat_sheet_item,
-        ) in self.properties_brightway.items():
-            for (
-                rat_sheet_item_key,
-                rat_sheet_item_value,
-            ) in rat_sheet_item.items():
-                chunks = [
-                    rat_sheet_item_value[1][
-                        x : x + self._chunk_length  # noqa: E203
-                    ]
-                    for x in range(
-                        0,
-                        len(rat_sheet_item_value[1]),
-                        self._chunk_length,
-                    )
-                ]
-                # pylint: disable=W0212
-                brightway._write_value_direct(
-                    rat_sheet_name,
-                    rat_sheet_item_value[0][0],
-                    self._get_data_from_chunk(chunks, rat_config),
-                )
-                del rat_sheet_item_key
+        source_values = self._read_values_bulk(export_plan.get_source_cells())
+        values, constant_values = export_plan.split_values(
+            source_values, split_constants=incremental
+        )
+        brightway._write_values_bulk(  # pylint: disable=W0212
+            values, constant_values
+        )
         self.start_automatic_calculation()
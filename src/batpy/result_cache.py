@@ -0,0 +1,449 @@
+# -*- coding: UTF-8 -*-
+"""Module, which includes an on-disk cache of BatPaC battery results
+
+The results of a battery are stored in a SQLite database under a key, which
+is the hash of the workbook identity (BatPaC workbook and user input cell
+definitions), canonicalized BatPaC tool properties, battery properties, result
+cell configuration and batpy version. Recurring battery designs can then be
+answered from the cache without calculating them in the BatPaC Excel tool.
+
+The results of calculate_batteries (modules batpac_sharding and batpac_pool)
+are cached per battery. A BatpacTool with a result cache defers its
+calculation and caches the bulk reads of the calculated workbook (e.g.
+read_calculation_and_validation_results and read_from_user_input) under the
+properties of the calculation, so the BatPaC Excel tool only calculates, if a
+read is not cached.
+
+The results are stored in pickle format, so only open result caches from
+trusted locations.
+"""
+import copy
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+from collections import Counter
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import batpy
+from batpy.batpac_battery import BatpacBattery
+from batpy.utility_functions import load_cached_configuration
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+SCHEMA_VERSION = 2
+
+
+def get_default_cache_path() -> Path:
+    """Get default cache path
+
+    Returns
+    -------
+    Path
+        Path to the SQLite database in the user cache directory
+        ($XDG_CACHE_HOME/batpy or ~/.cache/batpy).
+    """
+    cache_directory = os.environ.get("XDG_CACHE_HOME", None)
+    if not cache_directory:
+        cache_directory = Path.home() / ".cache"
+    return Path(cache_directory, "batpy", "batpac_results.sqlite")
+
+
+@functools.lru_cache(maxsize=32)
+def _get_file_hash(path: Path, modified: int, size: int) -> str:
+    """Get the hash of a file
+
+    The modification time and size are part of the cache key, so an edited
+    file is hashed again.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the file
+    modified : int
+        Modification time of the file in nanoseconds
+    size : int
+        Size of the file in bytes
+
+    Returns
+    -------
+    str
+        SHA-256 hash of the file content
+    """
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def get_workbook_identity(
+    batpac_workbook_path: Path | str | None, cell_definitions: dict
+) -> str:
+    """Get workbook identity
+
+    Hash the content of the BatPaC workbook (e.g. the BatPaC version) and the
+    user input cell definitions. Workbooks without file (e.g. memory
+    workbooks) are only identified by the cell definitions.
+
+    Parameters
+    ----------
+    batpac_workbook_path : Path | str | None
+        Path to the BatPaC Excel tool (*.xlsm).
+    cell_definitions : dict
+        Configuration of the user input cells of the BatPaC Excel tool.
+
+    Returns
+    -------
+    str
+        Workbook identity
+    """
+    workbook_hash = None
+    if (
+        batpac_workbook_path is not None
+        and Path(batpac_workbook_path).is_file()
+    ):
+        path = Path(batpac_workbook_path).resolve()
+        stat = path.stat()
+        workbook_hash = _get_file_hash(path, stat.st_mtime_ns, stat.st_size)
+    canonical_inputs = json.dumps(
+        [workbook_hash, cell_definitions],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical_inputs.encode("utf-8")).hexdigest()
+
+
+def get_result_key(
+    workbook_identity: str,
+    batpac_properties: dict,
+    battery_properties: dict,
+    result_cell_config: Path | str | dict,
+) -> str:
+    """Get result key
+
+    Hash the workbook identity, canonicalized BatPaC tool properties, battery
+    properties, result cell configuration and batpy version.
+
+    Parameters
+    ----------
+    workbook_identity : str
+        Identity of the BatPaC workbook (see get_workbook_identity).
+    batpac_properties : dict
+        Properties of the BatPaC tool.
+    battery_properties : dict
+        Properties of the battery.
+    result_cell_config : Path | str | dict
+        Path to the TOML file or string (default dataset) or dictionary
+        containing the battery specific cell ranges of the results.
+
+    Returns
+    -------
+    str
+        Result key
+    """
+    if not isinstance(result_cell_config, dict):
+        _, result_cell_config = load_cached_configuration(result_cell_config)
+    canonical_inputs = json.dumps(
+        [
+            batpy.__version__,
+            workbook_identity,
+            batpac_properties,
+            battery_properties,
+            result_cell_config,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical_inputs.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of BatPaC battery results
+
+    The least recently used results are evicted, if the stored results exceed
+    max_size bytes. The number of cache hits and misses is counted in
+    statistics.
+    """
+
+    def __init__(
+        self, path: Path | str = None, max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        """Initialize result cache
+
+        Parameters
+        ----------
+        path : Path | str, optional
+            Path to the SQLite database, by default None uses
+            get_default_cache_path().
+        max_size : int, optional
+            Maximum size of the stored results in bytes, by default 256 MiB.
+        """
+        self.path = Path(path) if path else get_default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.statistics = Counter()
+        self._connection = sqlite3.connect(self.path)
+        with self._connection:
+            if (
+                self._connection.execute("PRAGMA user_version").fetchone()[0]
+                != SCHEMA_VERSION
+            ):
+                self._connection.execute("DROP TABLE IF EXISTS results")
+                self._connection.execute("DROP TABLE IF EXISTS metadata")
+                self._connection.execute(
+                    f"PRAGMA user_version = {SCHEMA_VERSION}"
+                )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "last_access INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_access "
+                "ON results(last_access)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "name TEXT PRIMARY KEY, "
+                "value INTEGER NOT NULL)"
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO metadata VALUES (?, 0)",
+                [("access",), ("size",)],
+            )
+        logging.info("[+] Opened result cache %s", self.path)
+
+    def __enter__(self) -> "ResultCache":
+        """Enter context
+
+        Returns
+        -------
+        ResultCache
+            Result cache
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Exit context and close the result cache"""
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of stored results
+
+        Returns
+        -------
+        int
+            Number of stored results
+        """
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM results"
+        ).fetchone()[0]
+
+    def _update_metadata(self, name: str, change: int) -> int:
+        """Update a metadata counter
+
+        The access counter and the total size of the stored results are kept
+        in the metadata table, so they are updated without scanning the
+        results.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter ("access" or "size")
+        change : int
+            Change of the counter
+
+        Returns
+        -------
+        int
+            Updated counter
+        """
+        self._connection.execute(
+            "UPDATE metadata SET value = value + ? WHERE name = ?",
+            (change, name),
+        )
+        return self._connection.execute(
+            "SELECT value FROM metadata WHERE name = ?", (name,)
+        ).fetchone()[0]
+
+    def get(self, key: str) -> dict | None:
+        """Get results
+
+        Parameters
+        ----------
+        key : str
+            Result key (see get_result_key)
+
+        Returns
+        -------
+        dict | None
+            Results in the format {"sheet" : {"name" : value} }, or None if
+            the key is not cached.
+        """
+        row = self._connection.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.statistics["misses"] += 1
+            return None
+        with self._connection:
+            self._connection.execute(
+                "UPDATE results SET last_access = ? WHERE key = ?",
+                (self._update_metadata("access", 1), key),
+            )
+        self.statistics["hits"] += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: str, results: dict) -> None:
+        """Set results
+
+        The results are stored losslessly in pickle format.
+
+        Parameters
+        ----------
+        key : str
+            Result key (see get_result_key)
+        results : dict
+            Results in the format {"sheet" : {"name" : value} }
+        """
+        value = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT size FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    value,
+                    len(value),
+                    self._update_metadata("access", 1),
+                ),
+            )
+            size = self._update_metadata(
+                "size", len(value) - (row[0] if row else 0)
+            )
+            if size > self.max_size:
+                self._evict(size)
+
+    def _evict(self, size: int) -> None:
+        """Evict the least recently used results exceeding max_size
+
+        Parameters
+        ----------
+        size : int
+            Total size of the stored results in bytes
+        """
+        evicted_keys = []
+        evicted_size = 0
+        for key, result_size in self._connection.execute(
+            "SELECT key, size FROM results ORDER BY last_access"
+        ):
+            if size - evicted_size <= self.max_size:
+                break
+            evicted_keys.append((key,))
+            evicted_size += result_size
+        self._connection.executemany(
+            "DELETE FROM results WHERE key = ?", evicted_keys
+        )
+        self._update_metadata("size", -evicted_size)
+        self.statistics["evictions"] += len(evicted_keys)
+
+    def calculate_battery_results(
+        self,
+        workbook_identity: str,
+        batpac_properties: dict,
+        batteries: Iterable[BatpacBattery],
+        result_cell_config: Path | str | dict,
+        calculate: Callable[[list[BatpacBattery]], dict[BatpacBattery, dict]],
+    ) -> dict[BatpacBattery, dict]:
+        """Calculate results of batteries with the result cache
+
+        Get the results of cached batteries from the result cache and
+        calculate the other batteries. Batteries with identical properties are
+        only calculated once. The calculated results are stored in the result
+        cache.
+
+        Parameters
+        ----------
+        workbook_identity : str
+            Identity of the BatPaC workbook (see get_workbook_identity).
+        batpac_properties : dict
+            Properties of the BatPaC tool.
+        batteries : Iterable[BatpacBattery]
+            BatPaC_battery objects
+        result_cell_config : Path | str | dict
+            Path to the TOML file or string (default dataset) or dictionary
+            containing the battery specific cell ranges of the results.
+        calculate : Callable[[list[BatpacBattery]], dict[BatpacBattery, dict]]
+            Function, which calculates the results of batteries in the format
+            {battery : {"sheet" : {"name" : value} } }
+
+        Returns
+        -------
+        dict[BatpacBattery, dict]
+            Dictionary in the format {battery : {"sheet" : {"name" : value} } }
+            in the order of batteries
+        """
+        if not isinstance(result_cell_config, dict):
+            _, result_cell_config = load_cached_configuration(
+                result_cell_config
+            )
+        battery_keys = {}
+        cached_results = {}
+        missing_batteries = {}
+        for battery in batteries:
+            key = get_result_key(
+                workbook_identity,
+                batpac_properties,
+                battery.properties,
+                result_cell_config,
+            )
+            battery_keys[battery] = key
+            if key in cached_results or key in missing_batteries:
+                continue
+            key_results = self.get(key)
+            if key_results is None:
+                missing_batteries[key] = battery
+            else:
+                cached_results[key] = key_results
+
+        logging.info(
+            "[ ] Calculate %s of %s batteries (result cache)",
+            len(missing_batteries),
+            len(battery_keys),
+        )
+        if missing_batteries:
+            calculated_results = calculate(list(missing_batteries.values()))
+            for key, battery in missing_batteries.items():
+                self.set(key, calculated_results[battery])
+                cached_results[key] = calculated_results[battery]
+
+        results = {}
+        for battery, key in battery_keys.items():
+            if missing_batteries.get(key, None) is battery:
+                results[battery] = cached_results[key]
+            else:
+                results[battery] = copy.deepcopy(cached_results[key])
+        return results
+
+    def clear(self) -> None:
+        """Remove all results"""
+        with self._connection:
+            self._connection.execute("DELETE FROM results")
+            self._connection.execute(
+                "UPDATE metadata SET value = 0 WHERE name = 'size'"
+            )
+
+    def close(self) -> None:
+        """Close the SQLite database"""
+        self._connection.close()
+        logging.info("[+] Closed result cache %s", self.path)
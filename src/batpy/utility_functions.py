@@ -1,40 +1,309 @@
 # -*- coding: UTF-8 -*-
 """Module, which contains utility functions for batpy
 """
+import copy
 import logging
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
 from pathlib import Path
+from types import MappingProxyType
 
 import semantic_version
 import toml
 
+from batpy.dataset_bundle import get_text_hash, load_bundled_configuration
 
-def load_configuration(configuration: Path | str) -> dict:
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None
+
+CELL_ADDRESS_PATTERN = re.compile(r"\$?([A-Z]{1,3})\$?([1-9][0-9]*)")
+CONFIGURATION_CACHE_SIZE = 32
+
+_configuration_cache = OrderedDict()
+
+
+class FrozenConfiguration(dict):
+    """Read-only configuration
+
+    Dictionary representation of a configuration without the batpy metadata,
+    which is available as metadata. Nested tables are frozen as well and
+    arrays are stored as tuples. A FrozenConfiguration can be shared between
+    all consumers and is accepted everywhere a configuration is accepted.
+    copy.deepcopy returns a mutable copy as plain dictionary.
+    """
+
+    def __init__(
+        self, configuration: Mapping = None, metadata: Mapping = None
+    ) -> None:
+        """Initialize read-only configuration
+
+        Parameters
+        ----------
+        configuration : Mapping, optional
+            Configuration in the format {"table" : {"key" : value} }, by
+            default None.
+        metadata : Mapping, optional
+            batpy metadata of the configuration, by default None.
+        """
+        super().__init__(
+            (key, _freeze_value(value))
+            for key, value in (configuration or {}).items()
+        )
+        self.metadata = MappingProxyType(dict(metadata or {}))
+
+    def _read_only(self, *args, **kwargs) -> None:
+        """Reject modifications
+
+        Raises
+        ------
+        TypeError
+            Raises TypeError, as the configuration is read-only.
+        """
+        raise TypeError(
+            "Configuration is read-only, use copy.deepcopy to get a mutable "
+            "copy"
+        )
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> dict:
+        """Shallow copy
+
+        Returns
+        -------
+        dict
+            Mutable dictionary with the read-only values
+        """
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        """Deep copy
+
+        Parameters
+        ----------
+        memo : dict
+            Memo of copy.deepcopy
+
+        Returns
+        -------
+        dict
+            Mutable copy with plain dictionaries and lists
+        """
+        return _thaw_value(self)
+
+    def __reduce__(self) -> tuple:
+        """Reduce for pickling
+
+        Returns
+        -------
+        tuple
+            Class and arguments to recreate the configuration
+        """
+        return (self.__class__, (_thaw_value(self), dict(self.metadata)))
+
+
+def _freeze_value(value: any) -> any:
+    """Freeze a configuration value
+
+    Parameters
+    ----------
+    value : any
+        Configuration value
+
+    Returns
+    -------
+    any
+        Read-only configuration value
+    """
+    if isinstance(value, FrozenConfiguration):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenConfiguration(value)
+    if isinstance(value, list):
+        return tuple(_freeze_value(item) for item in value)
+    return value
+
+
+def _thaw_value(value: any) -> any:
+    """Thaw a frozen configuration value
+
+    Parameters
+    ----------
+    value : any
+        Read-only configuration value
+
+    Returns
+    -------
+    any
+        Mutable copy of the configuration value
+    """
+    if isinstance(value, Mapping):
+        return {key: _thaw_value(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw_value(item) for item in value]
+    return copy.deepcopy(value)
+
+
+def load_configuration(configuration: Path | str | dict) -> dict:
     """Load configuration
 
     Loads a single configuration from a TOML file, string or dictionary.
+    Included datasets are loaded from the precompiled dataset bundle (see
+    dataset_bundle) instead of parsing the TOML text, if available.
 
     Parameters
     ----------
-    configuration : Path | str
+    configuration : Path | str | dict
         Path to the TOML configuration file or configuration as string or
-        dictionary.
+        dictionary (e.g. FrozenConfiguration).
 
     Returns
     -------
     dict
         Returns dictionary representation of configuration.
     """
+    if isinstance(configuration, FrozenConfiguration):
+        return {"batpy": dict(configuration.metadata)} | copy.deepcopy(
+            configuration
+        )
+    if isinstance(configuration, dict):
+        return copy.deepcopy(configuration)
     logging.info("[ ] Load configuration from %s", configuration)
-    try:
-        Path.exists(Path(configuration))
-        config = toml.load(configuration)
-    except (AttributeError, OSError):
-        config = toml.loads(configuration)
+    config = _load_configuration_text(_read_configuration_text(configuration))
     logging.info("[+] Loaded configuration from %s", configuration)
     logging.debug("[ ] Config properties %s", config)
     return config
 
 
+def _load_configuration_text(
+    configuration_text: str, text_hash: str = None
+) -> dict:
+    """Load configuration text from the dataset bundle or parse it as TOML
+
+    Parameters
+    ----------
+    configuration_text : str
+        TOML configuration as string.
+    text_hash : str, optional
+        SHA-256 hash of configuration_text (see dataset_bundle.get_text_hash),
+        by default None computes it.
+
+    Returns
+    -------
+    dict
+        Returns dictionary representation of configuration.
+    """
+    config = load_bundled_configuration(configuration_text, text_hash)
+    if config is None:
+        config = _parse_configuration_text(configuration_text)
+    return config
+
+
+def _read_configuration_text(configuration: Path | str) -> str:
+    """Read configuration text
+
+    A Path is always read as TOML file. A string is TOML text, if it contains
+    a line break or "=", otherwise it is read as TOML file, if the file
+    exists.
+
+    Parameters
+    ----------
+    configuration : Path | str
+        Path to the TOML configuration file or configuration as string.
+
+    Returns
+    -------
+    str
+        TOML configuration as string.
+    """
+    if isinstance(configuration, Path):
+        return configuration.read_text(encoding="utf-8")
+    if "\n" in configuration or "=" in configuration:
+        return configuration
+    try:
+        configuration_path = Path(configuration)
+        if configuration_path.is_file():
+            return configuration_path.read_text(encoding="utf-8")
+    except (ValueError, OSError):
+        pass
+    return configuration
+
+
+def _parse_configuration_text(configuration_text: str) -> dict:
+    """Parse configuration text
+
+    Parses with the standard library tomllib (Python 3.11+) and falls back to
+    the toml package, if tomllib is not available or rejects the text.
+
+    Parameters
+    ----------
+    configuration_text : str
+        TOML configuration as string.
+
+    Returns
+    -------
+    dict
+        Returns dictionary representation of configuration.
+    """
+    if tomllib is not None:
+        try:
+            return tomllib.loads(configuration_text)
+        except tomllib.TOMLDecodeError as error:
+            logging.debug(
+                "[!] tomllib could not parse configuration %s", error
+            )
+    return toml.loads(configuration_text)
+
+
+def load_cached_configuration(
+    configuration: Path | str | FrozenConfiguration,
+) -> tuple[dict, dict]:
+    """Load cached configuration
+
+    Loads a single configuration from a TOML file or string and splits it into
+    the batpy metadata and the configuration. Parsed configurations are cached
+    by the hash of their content, so that each distinct configuration is only
+    parsed once. The returned dictionaries are shared between all callers and
+    must not be modified. A FrozenConfiguration is returned as is.
+
+    Parameters
+    ----------
+    configuration : Path | str | FrozenConfiguration
+        Path to the TOML configuration file or configuration as string or
+        read-only configuration.
+
+    Returns
+    -------
+    tuple[dict, dict]
+        Returns dictionary representation of batpy metadata and
+        configuration.
+    """
+    if isinstance(configuration, FrozenConfiguration):
+        return configuration.metadata, configuration
+    configuration_text = _read_configuration_text(configuration)
+    configuration_hash = get_text_hash(configuration_text)
+    cached_configuration = _configuration_cache.get(configuration_hash, None)
+    if cached_configuration is not None:
+        _configuration_cache.move_to_end(configuration_hash)
+        return cached_configuration
+
+    config = _load_configuration_text(configuration_text, configuration_hash)
+    cached_configuration = (config.pop("batpy", {}), config)
+    _configuration_cache[configuration_hash] = cached_configuration
+    if len(_configuration_cache) > CONFIGURATION_CACHE_SIZE:
+        _configuration_cache.popitem(last=False)
+    return cached_configuration
+
+
+def clear_configuration_cache() -> None:
+    """Clear the cache of load_cached_configuration"""
+    _configuration_cache.clear()
+
+
 def is_version_compatible(
     self_version: semantic_version.Version,
     version_to_check: semantic_version.Version,
@@ -130,3 +399,283 @@ def combine_configuration(configuration_list: list[Path | str]) -> dict:
             )
         combined_configuration |= config
     return combined_configuration
+
+
+def dump_configuration(
+    configuration: dict, commented_keys: Iterable[str] = ()
+) -> str:
+    """Dump configuration
+
+    Serializes a configuration as TOML string. Each nested dictionary is
+    written as table with a dotted header (e.g. ["Battery 1"."Chem"]). Keys
+    with the value None, which can not be represented in TOML, and keys in
+    commented_keys are written as comments.
+
+    Parameters
+    ----------
+    configuration : dict
+        Configuration in the format {"table" : {"key" : value} } or with
+        further nested tables.
+    commented_keys : Iterable[str], optional
+        Keys, which are written as comments, by default ().
+
+    Returns
+    -------
+    str
+        Configuration as TOML string
+    """
+    commented_keys = set(commented_keys)
+    encoder = toml.TomlEncoder()
+    lines = []
+
+    def dump_key(key: str) -> str:
+        """Dump key as literal string, if possible
+
+        Keys with escaped quotes are not parsed correctly by toml.
+        """
+        if "'" in key or any(ord(character) < 32 for character in key):
+            return encoder.dump_value(key)
+        return f"'{key}'"
+
+    def dump_table(header: tuple[str, ...], table: dict) -> None:
+        """Dump table and its subtables"""
+        if header and (
+            not table or not all(isinstance(v, dict) for v in table.values())
+        ):
+            if lines:
+                lines.append("")
+            lines.append(
+                "[" + ".".join(dump_key(name) for name in header) + "]"
+            )
+        subtables = []
+        for key, value in table.items():
+            if isinstance(value, dict):
+                subtables.append((header + (key,), value))
+                continue
+            line = (
+                f"{dump_key(key)} = "
+                f"{'None' if value is None else encoder.dump_value(value)}"
+            )
+            if value is None or key in commented_keys:
+                line = "# " + line
+            lines.append(line)
+        for subtable_header, subtable in subtables:
+            dump_table(subtable_header, subtable)
+
+    dump_table((), configuration)
+    return "\n".join(lines) + "\n"
+
+
+def split_cell_address(cell_range: str) -> tuple[int, int] | None:
+    """Split cell address
+
+    Split the address of a single cell (e.g. "B16" or "$B$16") into its row
+    and column number.
+
+    Parameters
+    ----------
+    cell_range : str
+        Cell address
+
+    Returns
+    -------
+    tuple[int, int] | None
+        Row and column number (starting at 1), or None if cell_range is not
+        the address of a single cell.
+
+    Examples
+    --------
+    >>> split_cell_address("AB16")
+    (16, 28)
+    """
+    if not isinstance(cell_range, str):
+        return None
+    match = CELL_ADDRESS_PATTERN.fullmatch(cell_range.upper())
+    if match is None:
+        return None
+    column = 0
+    for character in match.group(1):
+        column = column * 26 + ord(character) - ord("A") + 1
+    return int(match.group(2)), column
+
+
+def join_cell_address(row: int, column: int) -> str:
+    """Join cell address
+
+    Join row and column number into the address of a single cell.
+
+    Parameters
+    ----------
+    row : int
+        Row number (starting at 1)
+    column : int
+        Column number (starting at 1)
+
+    Returns
+    -------
+    str
+        Cell address
+
+    Examples
+    --------
+    >>> join_cell_address(16, 28)
+    'AB16'
+    """
+    column_name = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        column_name = chr(ord("A") + remainder) + column_name
+    return f"{column_name}{row}"
+
+
+def split_cell_range(cell_range: str) -> tuple[int, int, int, int] | None:
+    """Split cell range
+
+    Split the address of a single cell (e.g. "B16") or a rectangular cell
+    range (e.g. "B16:C20") into its first and last row and column number.
+
+    Parameters
+    ----------
+    cell_range : str
+        Cell address or cell range
+
+    Returns
+    -------
+    tuple[int, int, int, int] | None
+        First row, first column, last row and last column (starting at 1), or
+        None if cell_range is neither a cell address nor a cell range.
+
+    Examples
+    --------
+    >>> split_cell_range("C20:B16")
+    (16, 2, 20, 3)
+    """
+    if not isinstance(cell_range, str):
+        return None
+    first_cell, separator, last_cell = cell_range.partition(":")
+    first_address = split_cell_address(first_cell)
+    last_address = (
+        split_cell_address(last_cell) if separator else first_address
+    )
+    if first_address is None or last_address is None:
+        return None
+    return (
+        min(first_address[0], last_address[0]),
+        min(first_address[1], last_address[1]),
+        max(first_address[0], last_address[0]),
+        max(first_address[1], last_address[1]),
+    )
+
+
+def group_cell_blocks(
+    cells: Iterable[tuple[int, int]],
+    max_row_gap: int = 50,
+    max_column_gap: int = 10,
+) -> list[tuple[tuple[int, int, int, int], list[tuple[int, int]]]]:
+    """Group cells into rectangular blocks
+
+    Group cells of a worksheet into bounding boxes, which can be read with a
+    single range read each. The used columns are split into column groups,
+    if the gap between two used columns exceeds max_column_gap, and the
+    cells of each column group are split into blocks, if the gap between two
+    used rows exceeds max_row_gap, to avoid reading large unused regions.
+
+    Parameters
+    ----------
+    cells : Iterable[tuple[int, int]]
+        Row and column number of the cells
+    max_row_gap : int, optional
+        Maximum number of rows between two used rows in the same block, by
+        default 50.
+    max_column_gap : int, optional
+        Maximum number of columns between two used columns in the same block,
+        by default 10.
+
+    Returns
+    -------
+    list[tuple[tuple[int, int, int, int], list[tuple[int, int]]]]
+        Blocks in the format ((first row, first column, last row, last
+        column), [cells in the block])
+    """
+    cells = sorted(set(cells))
+    column_groups = {}
+    group_column = None
+    previous_column = None
+    for column in sorted({column for _, column in cells}):
+        if (
+            previous_column is None
+            or column - previous_column > max_column_gap
+        ):
+            group_column = column
+        column_groups[column] = group_column
+        previous_column = column
+
+    group_cells = {}
+    for cell in cells:
+        group_cells.setdefault(column_groups[cell[1]], []).append(cell)
+
+    blocks = []
+    for _, column_group_cells in sorted(group_cells.items()):
+        block_cells = []
+        for cell in column_group_cells:
+            if block_cells and cell[0] - block_cells[-1][0] > max_row_gap:
+                blocks.append(block_cells)
+                block_cells = []
+            block_cells.append(cell)
+        if block_cells:
+            blocks.append(block_cells)
+
+    return [
+        (
+            (
+                block_cells[0][0],
+                min(column for _, column in block_cells),
+                block_cells[-1][0],
+                max(column for _, column in block_cells),
+            ),
+            block_cells,
+        )
+        for block_cells in blocks
+    ]
+
+
+def group_contiguous_cells(
+    cells: Iterable[tuple[int, int]]
+) -> list[tuple[int, int, int, int]]:
+    """Group contiguous cells into rectangular blocks
+
+    Consecutive rows of a column are coalesced into runs, and runs of
+    adjacent columns with the same rows are coalesced into rectangular
+    blocks. Each block only contains the given cells, so that it can be
+    written with a single range write.
+
+    Parameters
+    ----------
+    cells : Iterable[tuple[int, int]]
+        Row and column number of the cells
+
+    Returns
+    -------
+    list[tuple[int, int, int, int]]
+        Blocks in the format (first row, first column, last row, last column)
+    """
+    column_runs = {}
+    for row, column in sorted(set(cells), key=lambda cell: (cell[1], cell[0])):
+        runs = column_runs.setdefault(column, [])
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+
+    blocks = []
+    open_blocks = {}
+    for column, runs in column_runs.items():
+        for first_row, last_row in runs:
+            block = open_blocks.get((first_row, last_row), None)
+            if block is not None and block[3] == column - 1:
+                block[3] = column
+            else:
+                block = [first_row, column, last_row, column]
+                blocks.append(block)
+                open_blocks[(first_row, last_row)] = block
+    return [tuple(block) for block in blocks]
@@ -0,0 +1,735 @@
+# -*- coding: UTF-8 -*-
+"""Module, which includes the workbook backends of batpy workbooks
+
+A workbook backend opens a workbook and provides the cell access (read and
+write of values and ranges), calculation, macros, saving and closing for a
+batpy workbook. The following backends are available:
+
+- "xlwings": Excel workbook opened with xlwings (default, requires Excel)
+- "memory": In-memory workbook without Excel
+- "openpyxl": Workbook file opened with openpyxl (requires the xlsx extra),
+  without calculation of formulas
+"""
+import logging
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import xlwings as xw
+
+from batpy.utility_functions import join_cell_address, split_cell_range
+
+
+class WorkbookBackend:
+    """Base class of workbook backends"""
+
+    def open(self, path: Path, visible: bool = False) -> None:
+        """Open workbook
+
+        Parameters
+        ----------
+        path : Path
+            Path to the workbook file (*.xlsx | *.xlsm).
+        visible : bool, optional
+            True, if workbook should be visible during operation, by default
+            False.
+        """
+        raise NotImplementedError
+
+    @property
+    def workbook(self) -> any:
+        """Underlying workbook object of the backend"""
+        return None
+
+    def read_value(self, worksheet: str, cell_range: str) -> any:
+        """Read value
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the worksheet.
+        cell_range : str
+            Cell range or defined name of the worksheet.
+
+        Returns
+        -------
+        any
+            Value of a single cell, list of values of a single row or column
+            or list of rows of columns.
+        """
+        raise NotImplementedError
+
+    def read_range(self, worksheet: str, cell_range: str) -> list[list[any]]:
+        """Read range
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the worksheet.
+        cell_range : str
+            Cell range or defined name of the worksheet.
+
+        Returns
+        -------
+        list[list[any]]
+            Values of the cell range (rows of columns).
+        """
+        raise NotImplementedError
+
+    def write_value(self, worksheet: str, cell_range: str, value: any) -> None:
+        """Write value
+
+        A list of values is written as row and a list of lists as rows of
+        columns, starting at the first cell of the cell range.
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the worksheet.
+        cell_range : str
+            Cell range or defined name of the worksheet.
+        value : any
+            Value to write.
+        """
+        raise NotImplementedError
+
+    def write_range(
+        self, worksheet: str, cell_range: str, values: list[list[any]]
+    ) -> None:
+        """Write range
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the worksheet.
+        cell_range : str
+            Cell range or defined name of the worksheet.
+        values : list[list[any]]
+            Values to write (rows of columns).
+        """
+        raise NotImplementedError
+
+    def set_automatic_calculation(self, automatic: bool) -> None:
+        """Set automatic calculation
+
+        Parameters
+        ----------
+        automatic : bool
+            True, if the workbook should be calculated automatically.
+        """
+
+    def calculate(self) -> None:
+        """Calculate workbook"""
+
+    def run_macro(self, name: str) -> None:
+        """Run macro
+
+        Parameters
+        ----------
+        name : str
+            Name of the macro (e.g. "Module1.Reset").
+        """
+        logging.warning("[!] Macro %s is not supported by %s", name, self)
+
+    def save(self, path: Path = None) -> None:
+        """Save workbook
+
+        Parameters
+        ----------
+        path : Path, optional
+            If the path is specified, the workbook will be saved under the
+            path, by default None will overwrite the current workbook.
+        """
+        raise NotImplementedError
+
+    def close(self) -> bool:
+        """Close workbook
+
+        Returns
+        -------
+        bool
+            True, if workbook is closed.
+        """
+        raise NotImplementedError
+
+
+class XlwingsBackend(WorkbookBackend):
+    """Workbook backend for Excel workbooks opened with xlwings
+
+    By default, the workbook is opened with xlwings.Book, which attaches to
+    the workbook, if it is already open in Excel. If an Excel instance is
+    passed, the workbook is opened in this instance (e.g. the own Excel
+    instance of a BatpacPool worker).
+    """
+
+    def __init__(self, app: xw.App = None) -> None:
+        """Initialize xlwings backend
+
+        Parameters
+        ----------
+        app : xw.App, optional
+            Excel instance to open the workbook in, by default None opens the
+            workbook with xlwings.Book. The Excel instance is not quit on
+            closing the workbook.
+        """
+        self._app = app
+        self._workbook = None
+
+    def open(self, path: Path, visible: bool = False) -> None:
+        """Open workbook
+
+        Parameters
+        ----------
+        path : Path
+            Path to the workbook file (*.xlsx | *.xlsm), or None for a new
+            workbook.
+        visible : bool, optional
+            True, if workbook should be visible during operation, by default
+            False.
+        """
+        if self._app is None:
+            self._workbook = xw.Book(path)
+            self._workbook.app.visible = visible
+        elif path is None:
+            self._workbook = self._app.books.add()
+        else:
+            self._workbook = self._app.books.open(path)
+
+    @property
+    def workbook(self) -> xw.Book:
+        """Underlying xlwings book"""
+        return self._workbook
+
+    def read_value(self, worksheet: str, cell_range: str) -> any:
+        """Read value with xlwings (see WorkbookBackend.read_value)"""
+        return self._workbook.sheets[worksheet][cell_range].value
+
+    def read_range(self, worksheet: str, cell_range: str) -> list[list[any]]:
+        """Read range with xlwings (see WorkbookBackend.read_range)"""
+        return (
+            self._workbook.sheets[worksheet][cell_range].options(ndim=2).value
+        )
+
+    def write_value(self, worksheet: str, cell_range: str, value: any) -> None:
+        """Write value with xlwings (see WorkbookBackend.write_value)"""
+        self._workbook.sheets[worksheet][cell_range].value = value
+
+    def write_range(
+        self, worksheet: str, cell_range: str, values: list[list[any]]
+    ) -> None:
+        """Write range with xlwings (see WorkbookBackend.write_range)"""
+        self._workbook.sheets[worksheet][cell_range].value = values
+
+    def set_automatic_calculation(self, automatic: bool) -> None:
+        """Set calculation mode and screen updating of the Excel instance
+
+        Parameters
+        ----------
+        automatic : bool
+            True, if Excel should calculate automatically and update the
+            screen.
+        """
+        self._workbook.app.calculation = "automatic" if automatic else "manual"
+        self._workbook.app.screen_updating = automatic
+
+    def calculate(self) -> None:
+        """Calculate the Excel instance"""
+        self._workbook.app.calculate()
+
+    def run_macro(self, name: str) -> None:
+        """Run VBA macro of the workbook (see WorkbookBackend.run_macro)"""
+        self._workbook.macro(name)()
+
+    def save(self, path: Path = None) -> None:
+        """Save workbook (see WorkbookBackend.save)
+
+        If the workbook is saved under another path, the saved workbook is
+        opened.
+        """
+        self._workbook.save(path)
+        if path:
+            if self._app is None:
+                self._workbook = xw.Book(path)
+            else:
+                self._workbook = self._app.books.open(path)
+
+    def close(self) -> bool:
+        """Close workbook
+
+        Excel is quit, if the workbook is the last open workbook of an Excel
+        instance, which was not passed to the backend.
+
+        Returns
+        -------
+        bool
+            True, if workbook is closed.
+        """
+        if self._app is None and len(self._workbook.app.books) == 1:
+            self._workbook.app.quit()
+            self._workbook = None
+            logging.info("[+] Workbook and Excel closed")
+            return True
+        self._workbook.close()
+        self._workbook = None
+        logging.info("[+] Workbook closed")
+        return True
+
+
+class _CellGridBackend(WorkbookBackend):
+    """Base class of workbook backends, which store the cells in Python
+
+    Cell ranges are resolved to blocks of cells, so that subclasses only have
+    to read and write blocks. The number of read and write operations is
+    counted in calls.
+    """
+
+    def __init__(self) -> None:
+        """Initialize cell grid backend"""
+        self.calls = Counter()
+
+    def _resolve_defined_name(
+        self, worksheet: str, name: str
+    ) -> tuple[str, str]:
+        """Resolve defined name
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the worksheet.
+        name : str
+            Defined name.
+
+        Returns
+        -------
+        tuple[str, str]
+            Worksheet and cell range of the defined name.
+
+        Raises
+        ------
+        KeyError
+            Raises KeyError if the defined name could not be found.
+        """
+        raise KeyError(f"Defined name {name} not found in {worksheet}")
+
+    def _resolve_range(
+        self, worksheet: str, cell_range: str
+    ) -> tuple[str, tuple[int, int, int, int]]:
+        """Resolve cell range
+
+        Parameters
+        ----------
+        worksheet : str
+            Name of the worksheet.
+        cell_range : str
+            Cell range or defined name of the worksheet.
+
+        Returns
+        -------
+        tuple[str, tuple[int, int, int, int]]
+            Worksheet and first row, first column, last row and last column of
+            the cell range.
+
+        Raises
+        ------
+        KeyError
+            Raises KeyError if the cell range could not be resolved.
+        """
+        bounds = split_cell_range(cell_range)
+        if bounds is None:
+            worksheet, cell_range = self._resolve_defined_name(
+                worksheet, cell_range
+            )
+            bounds = split_cell_range(cell_range)
+            if bounds is None:
+                raise KeyError(f"Invalid cell range {cell_range}")
+        return worksheet, bounds
+
+    def _read_block(
+        self, worksheet: str, bounds: tuple[int, int, int, int]
+    ) -> list[list[any]]:
+        """Read block of cells (rows of columns)"""
+        raise NotImplementedError
+
+    def _write_block(
+        self,
+        worksheet: str,
+        first_row: int,
+        first_column: int,
+        values: list[list[any]],
+    ) -> None:
+        """Write block of cells (rows of columns)"""
+        raise NotImplementedError
+
+    def read_value(self, worksheet: str, cell_range: str) -> any:
+        """Read value from the cell block (see WorkbookBackend.read_value)"""
+        self.calls["read_value"] += 1
+        values = self._read_block(*self._resolve_range(worksheet, cell_range))
+        if len(values) == 1 and len(values[0]) == 1:
+            return values[0][0]
+        if len(values) == 1:
+            return values[0]
+        if all(len(row) == 1 for row in values):
+            return [row[0] for row in values]
+        return values
+
+    def read_range(self, worksheet: str, cell_range: str) -> list[list[any]]:
+        """Read range from the cell block (see WorkbookBackend.read_range)"""
+        self.calls["read_range"] += 1
+        return self._read_block(*self._resolve_range(worksheet, cell_range))
+
+    def write_value(self, worksheet: str, cell_range: str, value: any) -> None:
+        """Write value into the cell block (see WorkbookBackend.write_value)"""
+        self.calls["write_value"] += 1
+        worksheet, (first_row, first_column, _, _) = self._resolve_range(
+            worksheet, cell_range
+        )
+        if not isinstance(value, (list, tuple)):
+            values = [[value]]
+        elif value and all(isinstance(row, (list, tuple)) for row in value):
+            values = [list(row) for row in value]
+        else:
+            values = [list(value)]
+        self._write_block(worksheet, first_row, first_column, values)
+
+    def write_range(
+        self, worksheet: str, cell_range: str, values: list[list[any]]
+    ) -> None:
+        """Write range into the cell block (see WorkbookBackend.write_range)"""
+        self.calls["write_range"] += 1
+        worksheet, (first_row, first_column, _, _) = self._resolve_range(
+            worksheet, cell_range
+        )
+        self._write_block(worksheet, first_row, first_column, values)
+
+
+class MemoryBackend(_CellGridBackend):
+    """Workbook backend for in-memory workbooks
+
+    The in-memory workbook does not calculate formulas. A calculation and
+    macros can be provided as Python functions, which are called with the
+    backend.
+    """
+
+    def __init__(
+        self,
+        cells: dict[tuple[str, str], any] = None,
+        defined_names: dict[tuple[str, str], str] = None,
+        calculation: Callable[["MemoryBackend"], None] = None,
+        macros: dict[str, Callable[["MemoryBackend"], None]] = None,
+    ) -> None:
+        """Initialize in-memory backend
+
+        Parameters
+        ----------
+        cells : dict[tuple[str, str], any], optional
+            Initial values in the format {("worksheet", "cell") : value}, by
+            default None.
+        defined_names : dict[tuple[str, str], str], optional
+            Defined names in the format {("worksheet", "name") : "cell range"},
+            by default None.
+        calculation : Callable[[MemoryBackend], None], optional
+            Function, which calculates the workbook, by default None.
+        macros : dict[str, Callable[[MemoryBackend], None]], optional
+            Functions of the macros in the format {"name" : function}, by
+            default None.
+        """
+        super().__init__()
+        self.path = None
+        self.defined_names = dict(defined_names or {})
+        self.calculation = calculation
+        self.macros = dict(macros or {})
+        self.automatic_calculation = False
+        self._cells = {}
+        for (worksheet, cell_range), value in (cells or {}).items():
+            self.write_value(worksheet, cell_range, value)
+        self.automatic_calculation = True
+        self.calls.clear()
+
+    def open(self, path: Path, visible: bool = False) -> None:
+        """Open in-memory workbook
+
+        The workbook file is not read, only the path is remembered.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the workbook.
+        visible : bool, optional
+            Ignored by the in-memory workbook, by default False.
+        """
+        self.path = path
+
+    def get_cells(self) -> dict[tuple[str, str], any]:
+        """Get cells
+
+        Returns
+        -------
+        dict[tuple[str, str], any]
+            Values in the format {("worksheet", "cell") : value}
+        """
+        return {
+            (worksheet, join_cell_address(row, column)): value
+            for (worksheet, row, column), value in self._cells.items()
+        }
+
+    def _resolve_defined_name(
+        self, worksheet: str, name: str
+    ) -> tuple[str, str]:
+        """Resolve defined name from defined_names"""
+        try:
+            return worksheet, self.defined_names[(worksheet, name)]
+        except KeyError as error:
+            raise KeyError(
+                f"Defined name {name} not found in {worksheet}"
+            ) from error
+
+    def _read_block(
+        self, worksheet: str, bounds: tuple[int, int, int, int]
+    ) -> list[list[any]]:
+        """Read block of cells (rows of columns), None for empty cells"""
+        first_row, first_column, last_row, last_column = bounds
+        return [
+            [
+                self._cells.get((worksheet, row, column), None)
+                for column in range(first_column, last_column + 1)
+            ]
+            for row in range(first_row, last_row + 1)
+        ]
+
+    def _write_block(
+        self,
+        worksheet: str,
+        first_row: int,
+        first_column: int,
+        values: list[list[any]],
+    ) -> None:
+        """Write block of cells (rows of columns)
+
+        None removes the value of a cell. The workbook is calculated
+        afterwards, if the calculation is automatic.
+        """
+        for row, row_values in enumerate(values, first_row):
+            for column, value in enumerate(row_values, first_column):
+                if value is None:
+                    self._cells.pop((worksheet, row, column), None)
+                else:
+                    self._cells[(worksheet, row, column)] = value
+        if self.automatic_calculation:
+            self.calculate()
+
+    def set_automatic_calculation(self, automatic: bool) -> None:
+        """Set automatic calculation
+
+        The workbook is calculated, if the calculation is set to
+        automatic.
+
+        Parameters
+        ----------
+        automatic : bool
+            True, if the workbook should be calculated automatically.
+        """
+        self.automatic_calculation = automatic
+        if automatic:
+            self.calculate()
+
+    def calculate(self) -> None:
+        """Calculate workbook with the calculation function, if defined"""
+        if self.calculation:
+            self.calls["calculate"] += 1
+            automatic_calculation = self.automatic_calculation
+            self.automatic_calculation = False
+            try:
+                self.calculation(self)
+            finally:
+                self.automatic_calculation = automatic_calculation
+
+    def run_macro(self, name: str) -> None:
+        """Run macro function (see WorkbookBackend.run_macro)
+
+        Macros without function are ignored with a warning.
+        """
+        if name in self.macros:
+            self.calls["run_macro"] += 1
+            self.macros[name](self)
+        else:
+            super().run_macro(name)
+
+    def save(self, path: Path = None) -> None:
+        """Save workbook (see WorkbookBackend.save)
+
+        The in-memory workbook is not written, only the path is
+        remembered.
+        """
+        if path:
+            self.path = path
+
+    def close(self) -> bool:
+        """Close in-memory workbook
+
+        Returns
+        -------
+        bool
+            True, if workbook is closed.
+        """
+        logging.info("[+] Workbook closed")
+        return True
+
+
+class OpenpyxlBackend(_CellGridBackend):
+    """Workbook backend for workbook files opened with openpyxl
+
+    Formulas are not calculated by openpyxl. Cell values are read from the
+    values cached by the last calculation in Excel (or from the values written
+    with this backend) and the formulas of the workbook are kept when saving.
+    """
+
+    def __init__(self) -> None:
+        """Initialize openpyxl backend"""
+        super().__init__()
+        self.path = None
+        self._workbook = None
+        self._values_workbook = None
+
+    def open(self, path: Path, visible: bool = False) -> None:
+        """Open workbook file with openpyxl
+
+        The workbook is loaded twice, with formulas for writing and with
+        the cached values for reading.
+
+        Parameters
+        ----------
+        path : Path
+            Path to the workbook file (*.xlsx | *.xlsm).
+        visible : bool, optional
+            Ignored by openpyxl, by default False.
+
+        Raises
+        ------
+        ImportError
+            Raises ImportError, if openpyxl is not installed.
+        """
+        try:
+            import openpyxl  # pylint: disable=C0415
+        except ImportError as error:
+            raise ImportError(
+                "The openpyxl workbook backend requires openpyxl "
+                "(pip install batpy[xlsx])"
+            ) from error
+        self.path = Path(path)
+        keep_vba = self.path.suffix.lower() == ".xlsm"
+        self._workbook = openpyxl.load_workbook(self.path, keep_vba=keep_vba)
+        self._values_workbook = openpyxl.load_workbook(
+            self.path, data_only=True
+        )
+
+    @property
+    def workbook(self) -> any:
+        """Underlying openpyxl workbook"""
+        return self._workbook
+
+    def _resolve_defined_name(
+        self, worksheet: str, name: str
+    ) -> tuple[str, str]:
+        """Resolve worksheet or workbook scoped defined name"""
+        defined_name = self._workbook[worksheet].defined_names.get(name, None)
+        if defined_name is None:
+            defined_name = self._workbook.defined_names.get(name, None)
+        if defined_name is None:
+            raise KeyError(f"Defined name {name} not found in {worksheet}")
+        for destination in defined_name.destinations:
+            return destination
+        raise KeyError(f"Defined name {name} has no cell range")
+
+    def _read_block(
+        self, worksheet: str, bounds: tuple[int, int, int, int]
+    ) -> list[list[any]]:
+        """Read block of cached cell values (rows of columns)"""
+        first_row, first_column, last_row, last_column = bounds
+        return [
+            list(row)
+            for row in self._values_workbook[worksheet].iter_rows(
+                min_row=first_row,
+                min_col=first_column,
+                max_row=last_row,
+                max_col=last_column,
+                values_only=True,
+            )
+        ]
+
+    def _write_block(
+        self,
+        worksheet: str,
+        first_row: int,
+        first_column: int,
+        values: list[list[any]],
+    ) -> None:
+        """Write block of cells (rows of columns) into both workbooks"""
+        sheet = self._workbook[worksheet]
+        values_sheet = self._values_workbook[worksheet]
+        for row, row_values in enumerate(values, first_row):
+            for column, value in enumerate(row_values, first_column):
+                sheet.cell(row=row, column=column, value=value)
+                values_sheet.cell(row=row, column=column, value=value)
+
+    def calculate(self) -> None:
+        """Warn, that formulas are not calculated by openpyxl"""
+        logging.warning("[!] Formulas are not calculated by openpyxl")
+
+    def save(self, path: Path = None) -> None:
+        """Save workbook with formulas (see WorkbookBackend.save)"""
+        if path:
+            self.path = Path(path)
+        self._workbook.save(self.path)
+
+    def close(self) -> bool:
+        """Close workbook
+
+        Returns
+        -------
+        bool
+            True, if workbook is closed.
+        """
+        self._workbook.close()
+        self._values_workbook.close()
+        logging.info("[+] Workbook closed")
+        return True
+
+
+WORKBOOK_BACKENDS = {
+    "xlwings": XlwingsBackend,
+    "memory": MemoryBackend,
+    "openpyxl": OpenpyxlBackend,
+}
+
+
+def create_workbook_backend(
+    backend: str | WorkbookBackend = "xlwings",
+) -> WorkbookBackend:
+    """Create workbook backend
+
+    Parameters
+    ----------
+    backend : str | WorkbookBackend, optional
+        Name of the workbook backend ("xlwings", "memory" or "openpyxl") or
+        workbook backend object, by default "xlwings".
+
+    Returns
+    -------
+    WorkbookBackend
+        Workbook backend object
+
+    Raises
+    ------
+    KeyError
+        Raises KeyError if the workbook backend is not available.
+    """
+    if isinstance(backend, WorkbookBackend):
+        return backend
+    try:
+        return WORKBOOK_BACKENDS[backend]()
+    except KeyError as error:
+        logging.error("An exception occurred: %s", error)
+        raise KeyError(
+            f"Workbook backend {backend} not available "
+            f"({', '.join(WORKBOOK_BACKENDS)})"
+        ) from error
@@ -0,0 +1,148 @@
+# -*- coding: UTF-8 -*-
+"""Tests for module batpac_pool
+"""
+
+import os
+
+import pytest
+
+from batpy import batpac_pool, datasets, utility_functions
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_pool import BatpacPool
+from batpy.workbook_backends import MemoryBackend
+
+BATPY_BATPAC_RESULTS = datasets.get_batpy_dataset(
+    "batpy_batpac_calculation_and_validation_results"
+)
+BATPY_BATPAC_USER_INPUT_CELLS = datasets.get_batpy_dataset(
+    "batpy_batpac_user_input_cells"
+)
+
+
+def calculate_plant_size(backend: MemoryBackend) -> None:
+    """Stand-in calculation of the BatPaC Excel tool
+
+    The plant size of each battery is twice its number of cells per module
+    and the worker process is written as configuration error.
+
+    Parameters
+    ----------
+    backend : MemoryBackend
+        In-memory workbook backend
+    """
+    for slot in range(7):
+        value = backend.read_value(
+            "Dashboard", utility_functions.join_cell_address(67, 4 + slot)
+        )
+        backend.write_value(
+            "Dashboard",
+            utility_functions.join_cell_address(131, 4 + slot),
+            None if value is None else value * 2,
+        )
+        backend.write_value(
+            "Dashboard",
+            utility_functions.join_cell_address(129, 4 + slot),
+            os.getpid(),
+        )
+
+
+def create_batteries(number_of_batteries: int) -> list[BatpacBattery]:
+    """Create batteries with different numbers of cells per module"""
+    batteries = []
+    for i in range(number_of_batteries):
+        battery = BatpacBattery(f"Battery {i}")
+        battery.set_new_property(
+            "Dashboard", "Number of cells per module", float(i)
+        )
+        batteries.append(battery)
+    return batteries
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batpac_pool(workers):
+    """Test BatpacPool with in-memory stand-in backend"""
+    batteries = create_batteries(30)
+    with BatpacPool(
+        None,
+        BATPY_BATPAC_USER_INPUT_CELLS,
+        datasets.get_batpy_dataset("batpy_batpac_config"),
+        workers=workers,
+        backend=MemoryBackend(calculation=calculate_plant_size),
+    ) as pool:
+        assert pool.workers == workers
+        results = pool.calculate_batteries(batteries, BATPY_BATPAC_RESULTS)
+        assert not pool.calculate_batteries([], BATPY_BATPAC_RESULTS)
+
+    assert list(results) == batteries
+    worker_processes = set()
+    for i, battery in enumerate(batteries):
+        battery_results = results[battery]["Dashboard"]
+        assert battery_results["Plant Size, GWh"] == i * 2
+        worker_processes.add(
+            battery_results["Configuration Errors (see table to right)"]
+        )
+    assert os.getpid() not in worker_processes
+    assert 1 <= len(worker_processes) <= workers
+
+
+def test_batpac_pool_default_workers():
+    """Test that BatpacPool uses a small fixed number of workers"""
+    with BatpacPool(
+        None, BATPY_BATPAC_USER_INPUT_CELLS, backend="memory"
+    ) as pool:
+        assert pool.workers == batpac_pool.DEFAULT_WORKERS == 2
+
+
+def test_copy_workbook(tmp_path):
+    """Test _copy_workbook and _close_worker"""
+    workbook_path = tmp_path / "test_batpac.xlsm"
+    workbook_path.write_bytes(b"workbook")
+    assert batpac_pool._copy_workbook(None) is None
+    copy_path = batpac_pool._copy_workbook(workbook_path)
+    assert copy_path != workbook_path
+    assert copy_path.name == workbook_path.name
+    assert copy_path.read_bytes() == b"workbook"
+    batpac_pool._close_worker()
+    assert not copy_path.exists()
+
+
+def test_initialize_worker_xlwings(monkeypatch):
+    """Test that xlwings workers open the workbook in their own Excel"""
+
+    class FakeExcelApp:
+        """Stand-in for xlwings.App"""
+
+        def __init__(self, visible: bool, add_book: bool) -> None:
+            """Initialize fake Excel instance"""
+            self.visible = visible
+            self.add_book = add_book
+            self.quitted = False
+
+        def quit(self):
+            """Quit Excel instance"""
+            self.quitted = True
+
+    class FakeBatpacTool:
+        """Stand-in for BatpacTool, which records the workbook backend"""
+
+        def __init__(self, path, cell_definition, backend) -> None:
+            """Initialize fake BatPaC tool"""
+            self.backend = backend
+
+        def close(self):
+            """Close fake BatPaC tool"""
+
+    monkeypatch.setattr(batpac_pool.xw, "App", FakeExcelApp)
+    monkeypatch.setattr(batpac_pool, "BatpacTool", FakeBatpacTool)
+    monkeypatch.setattr(batpac_pool.util, "Finalize", lambda *args, **_: None)
+    batpac_pool._initialize_worker(
+        None, BATPY_BATPAC_USER_INPUT_CELLS, None, "xlwings", False
+    )
+    app = batpac_pool._worker_state["app"]
+    assert not app.visible and not app.add_book
+    backend = batpac_pool._worker_state["batpac"].backend
+    assert isinstance(backend, batpac_pool.XlwingsBackend)
+    assert backend._app is app  # pylint: disable=W0212
+    batpac_pool._close_worker()
+    assert app.quitted
+    assert not batpac_pool._worker_state
@@ -0,0 +1,144 @@
+# -*- coding: UTF-8 -*-
+"""Tests for module batpac_sharding
+"""
+
+import pytest
+
+from batpy import datasets, utility_functions
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_sharding import (
+    calculate_batteries,
+    calculate_battery_group,
+    partition_batteries,
+)
+from batpy.batpac_tool import BatpacTool
+from batpy.workbook_backends import MemoryBackend
+
+BATPY_BATPAC_RESULTS = datasets.get_batpy_dataset(
+    "batpy_batpac_calculation_and_validation_results"
+)
+
+
+def calculate_plant_size(backend: MemoryBackend) -> None:
+    """Stand-in calculation of the BatPaC Excel tool
+
+    The plant size of each battery is twice its number of cells per module.
+
+    Parameters
+    ----------
+    backend : MemoryBackend
+        In-memory workbook backend
+    """
+    input_row, input_column = utility_functions.split_cell_address("D67")
+    result_row, result_column = utility_functions.split_cell_address("D131")
+    for slot in range(7):
+        value = backend.read_value(
+            "Dashboard",
+            utility_functions.join_cell_address(
+                input_row, input_column + slot
+            ),
+        )
+        backend.write_value(
+            "Dashboard",
+            utility_functions.join_cell_address(
+                result_row, result_column + slot
+            ),
+            None if value is None else value * 2,
+        )
+
+
+def create_memory_batpac() -> BatpacTool:
+    """Create BatPaC tool with in-memory backend and stand-in calculation
+
+    Returns
+    -------
+    BatpacTool
+        BatPaC tool
+    """
+    return BatpacTool(
+        None,
+        datasets.get_batpy_dataset("batpy_batpac_user_input_cells"),
+        backend=MemoryBackend(calculation=calculate_plant_size),
+    )
+
+
+def create_batteries(number_of_batteries: int) -> list[BatpacBattery]:
+    """Create batteries with different numbers of cells per module
+
+    Parameters
+    ----------
+    number_of_batteries : int
+        Number of batteries
+
+    Returns
+    -------
+    list[BatpacBattery]
+        BatPaC_battery objects
+    """
+    batteries = []
+    for i in range(number_of_batteries):
+        battery = BatpacBattery(f"Battery {i}")
+        battery.set_new_property(
+            "Dashboard", "Number of cells per module", float(i)
+        )
+        batteries.append(battery)
+    return batteries
+
+
+@pytest.mark.parametrize(
+    "number_of_batteries, group_size, expected_group_sizes",
+    [
+        (0, 7, []),
+        (7, 7, [7]),
+        (17, 7, [7, 7, 3]),
+        (3, 1, [1, 1, 1]),
+    ],
+)
+def test_partition_batteries(
+    number_of_batteries, group_size, expected_group_sizes
+):
+    """Test partition_batteries"""
+    batteries = create_batteries(number_of_batteries)
+    groups = partition_batteries(batteries, group_size)
+    assert [len(group) for group in groups] == expected_group_sizes
+    assert [battery for group in groups for battery in group] == batteries
+    with pytest.raises(ValueError):
+        partition_batteries(batteries, 0)
+
+
+@pytest.mark.parametrize("number_of_workbooks", [1, 2])
+def test_calculate_batteries(number_of_workbooks):
+    """Test calculate_batteries"""
+    batpac_tools = [create_memory_batpac() for _ in range(number_of_workbooks)]
+    batteries = create_batteries(17)
+    results = calculate_batteries(
+        batpac_tools[0] if number_of_workbooks == 1 else batpac_tools,
+        batteries,
+        BATPY_BATPAC_RESULTS,
+    )
+    assert list(results) == batteries
+    for i, battery in enumerate(batteries):
+        assert results[battery]["Dashboard"]["Plant Size, GWh"] == i * 2
+        assert set(results[battery]["Dashboard"]) == {
+            "Configuration Errors (see table to right)",
+            "Configuration Warnings (see table  to right)",
+            "Plant Size, GWh",
+            "Power-to-energy ratio",
+            "Adequacy of cooling",
+            "Cathode thickness limited by",
+        }
+    assert batpac_tools[0].batteries == batteries[14:]
+    if number_of_workbooks == 2:
+        assert batpac_tools[1].batteries == batteries[7:14]
+
+    with pytest.raises(ValueError):
+        calculate_batteries([], batteries, BATPY_BATPAC_RESULTS)
+
+
+def test_calculate_battery_group():
+    """Test calculate_battery_group"""
+    batpac = create_memory_batpac()
+    with pytest.raises(ValueError):
+        calculate_battery_group(
+            batpac, create_batteries(8), BATPY_BATPAC_RESULTS
+        )
@@ -0,0 +1,540 @@
+# pylint: disable=W0212
+# -*- coding: UTF-8 -*-
+"""Tests for module batpac_tool with the in-memory workbook backend
+"""
+
+import pytest
+
+from batpy import datasets, recycling_assessment_tool, utility_functions
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_tool import BatpacTool
+from batpy.brightway import BrightwayConnector
+from batpy.export_mapping import compile_export_plan
+from batpy.recycling_assessment_tool import RATConnector
+from batpy.workbook_backends import MemoryBackend
+
+BATPY_METADATA = '["batpy"]\n"BatPaC SemVer" = "0.4.0"\n'
+
+
+def create_memory_batpac(macros: dict = None) -> BatpacTool:
+    """Create BatPaC tool with in-memory backend
+
+    Parameters
+    ----------
+    macros : dict, optional
+        Functions of the macros in the format {"name" : function}, by default
+        None.
+
+    Returns
+    -------
+    BatpacTool
+        BatPaC tool
+    """
+    return BatpacTool(
+        None,
+        datasets.get_batpy_dataset("batpy_batpac_user_input_cells"),
+        backend=MemoryBackend(macros=macros),
+    )
+
+
+def test_calculate():
+    """Test calculate"""
+    reset_calls = []
+    batpac = create_memory_batpac(
+        {"Module1.Reset": lambda backend: reset_calls.append(backend)}
+    )
+    batpac.load_batpac_file(datasets.get_batpy_dataset("batpy_batpac_config"))
+    batteries = [BatpacBattery(f"Battery {i}") for i in range(1, 4)]
+    batpac.load_batteries_file(
+        datasets.get_batpy_dataset("batpy_batteries_config"), batteries
+    )
+    batpac.calculate()
+
+    cells = batpac.backend.get_cells()
+    number_of_writes = 0
+    for sheet, sheet_properties in batpac.properties.items():
+        for key, value in sheet_properties.items():
+            if value is not None:
+                cell_range = batpac._wb_helper_range(sheet, key)
+                assert batpac._read_value_direct(sheet, cell_range) == value
+                number_of_writes += 1
+    battery_keys = set()
+    for battery in batteries:
+        for sheet, sheet_properties in battery.properties.items():
+            for key, value in sheet_properties.items():
+                assert batpac.read_value(sheet, key, battery) == value
+                battery_keys.add((sheet, key))
+    number_of_writes += len(battery_keys)
+    row, column = utility_functions.split_cell_address(
+        batpac._wb_helper_range(
+            "Dashboard", "Number of modules in parallel", batteries[0]
+        )
+    )
+    assert (
+        "Dashboard",
+        utility_functions.join_cell_address(row, column + 3),
+    ) not in cells
+
+    assert len(reset_calls) == 1
+    assert batpac.backend.calls["write_range"] < number_of_writes / 3
+
+
+def test_add_battery(capsys, caplog):
+    """Test that batteries exceeding the limit are only logged"""
+    batpac = create_memory_batpac()
+    batteries = [BatpacBattery(f"Battery {i}") for i in range(1, 9)]
+    batpac.add_battery(batteries)
+    assert batpac.batteries == batteries[:7]
+    assert not capsys.readouterr().out
+    assert "Battery 8" in caplog.text
+
+
+def test_wb_helper_range():
+    """Test _wb_helper_range with the cell index"""
+    batpac = create_memory_batpac()
+    batteries = [BatpacBattery("Battery") for _ in range(batpac.max_batteries)]
+    batpac.add_battery(batteries)
+    for sheet, sheet_cells in batpac.excel_cells.items():
+        for name, cell_range in sheet_cells.items():
+            if not isinstance(cell_range, dict):
+                assert batpac._wb_helper_range(sheet, name) == cell_range
+                continue
+            battery = batteries[int(name.removeprefix("Battery ")) - 1]
+            for battery_name, battery_range in cell_range.items():
+                assert (
+                    batpac._wb_helper_range(sheet, battery_name, battery)
+                    == battery_range
+                )
+                assert (
+                    batpac._wb_helper_range(
+                        sheet, battery_name, battery, batpac.excel_cells
+                    )
+                    == battery_range
+                )
+
+    with pytest.raises(KeyError):
+        batpac._wb_helper_range("Dashboard", "Unknown name")
+    with pytest.raises(KeyError):
+        batpac._wb_helper_range(
+            "Dashboard",
+            "Number of modules in parallel",
+            BatpacBattery("Battery"),
+        )
+
+    batpac.batteries.reverse()
+    assert batpac._get_battery_slot(batteries[0]) == batpac.max_batteries - 1
+    batpac.excel_cells = {"Dashboard": {"Cell": "A1"}}
+    assert batpac._wb_helper_range("Dashboard", "Cell") == "A1"
+    batpac.excel_cells["Dashboard"]["Cell"] = "B2"
+    assert batpac._wb_helper_range("Dashboard", "Cell") == "B2"
+    del batpac.excel_cells["Dashboard"]["Cell"]
+    with pytest.raises(KeyError):
+        batpac._wb_helper_range("Dashboard", "Cell")
+
+
+def test_read_value_additional_cell_config(monkeypatch):
+    """Test read_value with additional_cell_config, which is parsed once"""
+    utility_functions.clear_configuration_cache()
+    load_calls = []
+    load_configuration_text = (
+        utility_functions._load_configuration_text  # pylint: disable=W0212
+    )
+    monkeypatch.setattr(
+        utility_functions,
+        "_load_configuration_text",
+        lambda text, text_hash=None: load_calls.append(text)
+        or load_configuration_text(text, text_hash),
+    )
+    batpac = create_memory_batpac()
+    battery = BatpacBattery("Battery 1")
+    batpac.add_battery([battery])
+    rat = RATConnector(
+        None,
+        datasets.get_batpy_dataset("batpy_recycling_assessment_tool_config"),
+        backend="memory",
+    )
+    assert len(load_calls) == 2
+
+    batpac_config = datasets.get_batpy_dataset("batpy_batpac_battery_design")
+    batpac_cells = batpac._load_user_configuration(batpac_config)
+    for sheet, sheet_cells in batpac_cells.items():
+        for name, cell_range in sheet_cells["Battery 1"].items():
+            batpac.backend.write_value(sheet, cell_range, name)
+            assert (
+                batpac.read_value(sheet, name, battery, batpac_config) == name
+            )
+            assert rat._wb_helper_range(sheet, "Battery 1", batpac_config)
+    assert len(load_calls) == 3
+
+    batpac_cells["Battery Design"].clear()
+    assert batpac._load_user_configuration(batpac_config) != batpac_cells
+    assert batpac._load_user_configuration(
+        batpac_config, read_only=True
+    ) is rat._load_user_configuration(batpac_config, read_only=True)
+
+
+def test_rat_export_plan_cache(tmp_path):
+    """Test that export plans are cached by the cell configuration content"""
+    rat = RATConnector(
+        None,
+        datasets.get_batpy_dataset("batpy_recycling_assessment_tool_config"),
+        backend="memory",
+    )
+    rat.load_batpac_to_rat_configuration(
+        '["batpy"]\n"BatPaC SemVer" = "0.4.0"\n["Battery"]\n'
+        '"Total capacity" = [["C2"], ["Battery Design", "Energy", ""]]\n'
+    )
+    batpac_config = (
+        '["batpy"]\n"BatPaC SemVer" = "0.4.0"\n'
+        '["Battery Design"."Battery 1"]\nEnergy = "G13"\n'
+    )
+    batpac_config_path = tmp_path / "batpac_config.toml"
+    batpac_config_path.write_text(batpac_config, encoding="utf-8")
+
+    export_plan = rat.compile_batpac_to_rat_plan(batpac_config_path)
+    assert rat.compile_batpac_to_rat_plan(batpac_config_path) is export_plan
+    assert rat.compile_batpac_to_rat_plan(batpac_config) is export_plan
+
+    batpac_config_path.write_text(batpac_config + "\n", encoding="utf-8")
+    assert (
+        rat.compile_batpac_to_rat_plan(batpac_config_path) is not export_plan
+    )
+
+    batpac_cells = rat._load_user_configuration(batpac_config)
+    export_plan = rat.compile_batpac_to_rat_plan(batpac_cells)
+    assert rat.compile_batpac_to_rat_plan(batpac_cells) is export_plan
+    assert rat.compile_batpac_to_rat_plan(dict(batpac_cells)) is not (
+        export_plan
+    )
+
+
+def create_memory_rat(monkeypatch) -> tuple[RATConnector, list]:
+    """Create RAT connector with in-memory backend, which records compiles
+
+    Parameters
+    ----------
+    monkeypatch : pytest.MonkeyPatch
+        Monkeypatch fixture
+
+    Returns
+    -------
+    tuple[RATConnector, list]
+        RAT connector and list of the compiled export configurations
+    """
+    compiled_plans = []
+    monkeypatch.setattr(
+        recycling_assessment_tool,
+        "compile_export_plan",
+        lambda properties, *args, **kwargs: compiled_plans.append(properties)
+        or compile_export_plan(properties, *args, **kwargs),
+    )
+    rat = RATConnector(
+        None,
+        datasets.get_batpy_dataset("batpy_recycling_assessment_tool_config"),
+        backend="memory",
+    )
+    return rat, compiled_plans
+
+
+def record_read_values_bulk(workbook, monkeypatch) -> list:
+    """Record the bulk reads of a workbook
+
+    Parameters
+    ----------
+    workbook : BatpyWorkbook
+        Workbook, whose bulk reads are recorded.
+    monkeypatch : pytest.MonkeyPatch
+        Monkeypatch fixture
+
+    Returns
+    -------
+    list
+        List of the cells of each bulk read
+    """
+    bulk_reads = []
+    read_values_bulk = workbook._read_values_bulk
+    monkeypatch.setattr(
+        workbook,
+        "_read_values_bulk",
+        lambda cells: bulk_reads.append(list(cells))
+        or read_values_bulk(cells),
+    )
+    return bulk_reads
+
+
+def test_export_batpac_battery_to_rat(monkeypatch):
+    """Test export_batpac_battery_to_rat with in-memory workbooks"""
+    rat, compiled_plans = create_memory_rat(monkeypatch)
+    rat.load_batpac_to_rat_configuration(
+        BATPY_METADATA + '["Battery"]\n'
+        '"Total capacity" = [["C2"], ["Battery Design", "Energy", "/1000"]]\n'
+        '"Mass" = [["C3"], ["Battery Design", "Mass", ""]]\n'
+        '"Constant" = [["C4"], ["", "1", ""]]\n'
+    )
+    batpac_config = (
+        BATPY_METADATA
+        + '["Battery Design"."Battery 1"]\nEnergy = "G13"\nMass = "G12"\n'
+        '["Battery Design"."Battery 2"]\nEnergy = "H13"\nMass = "H12"\n'
+    )
+    batpac = create_memory_batpac()
+    batteries = [BatpacBattery("Battery 1"), BatpacBattery("Battery 2")]
+    batpac.add_battery(batteries)
+    for cell_range, value in {
+        "G12": 10.0,
+        "G13": 42000.0,
+        "H12": 20.0,
+        "H13": 84000.0,
+    }.items():
+        batpac.backend.write_value("Battery Design", cell_range, value)
+    bulk_reads = record_read_values_bulk(batpac, monkeypatch)
+
+    rat.export_batpac_battery_to_rat(batpac, batteries[1], batpac_config)
+    assert rat.backend.get_cells() == {
+        ("Battery", "C2"): 84.0,
+        ("Battery", "C3"): 20.0,
+        ("Battery", "C4"): 1.0,
+    }
+    rat.export_batpac_battery_to_rat(batpac, batteries[0], batpac_config)
+    assert rat.backend.get_cells() == {
+        ("Battery", "C2"): 42.0,
+        ("Battery", "C3"): 10.0,
+        ("Battery", "C4"): 1.0,
+    }
+    assert len(compiled_plans) == 1
+    assert [sorted(cells) for cells in bulk_reads] == [
+        [("Battery Design", "H12"), ("Battery Design", "H13")],
+        [("Battery Design", "G12"), ("Battery Design", "G13")],
+    ]
+    assert not batpac.backend.calls["read_value"]
+
+
+def test_export_rat_to_brightway(monkeypatch):
+    """Test export_rat_to_brightway with in-memory workbooks"""
+    rat, compiled_plans = create_memory_rat(monkeypatch)
+    rat.load_rat_to_brightway_configuration(
+        BATPY_METADATA + '["Sheet"]\n'
+        '"Recycled" = [["B2"], ["Battery", "Recycled mass", "*2"]]\n'
+        '"Recovered" = [["B3"], ["Battery", "Recovered mass", ""]]\n'
+        '"Constant" = [["B4"], ["", "5", ""]]\n'
+    )
+    rat_config = (
+        BATPY_METADATA
+        + '["Battery"]\n"Recycled mass" = "D10"\n"Recovered mass" = "D11"\n'
+    )
+    rat.backend.write_value("Battery", "D11", 4.0)
+    bulk_reads = record_read_values_bulk(rat, monkeypatch)
+    brightway = BrightwayConnector(None, backend="memory")
+
+    for recycled_mass in [3.0, 6.0]:
+        rat.backend.write_value("Battery", "D10", recycled_mass)
+        rat.export_rat_to_brightway(brightway, rat_config)
+        assert brightway.backend.get_cells() == {
+            ("Sheet", "B2"): recycled_mass * 2,
+            ("Sheet", "B3"): 4.0,
+            ("Sheet", "B4"): 5.0,
+        }
+    assert len(compiled_plans) == 1
+    assert [sorted(cells) for cells in bulk_reads] == [
+        [("Battery", "D10"), ("Battery", "D11")]
+    ] * 2
+    assert not rat.backend.calls["read_value"]
+
+
+def test_read_battery_results():
+    """Test read_battery_results"""
+    batpac = create_memory_batpac()
+    batteries = [BatpacBattery("Battery 1"), BatpacBattery("Battery 2")]
+    batpac.add_battery(batteries)
+    batpac.backend.write_value("Dashboard", "E131", 2.0)
+    results = batpac.read_battery_results(
+        {
+            "Dashboard": {
+                "Battery 1": {"Plant Size, GWh": "D131"},
+                "Battery 2": {"Plant Size, GWh": "E131"},
+            },
+            "Chem": {"Cell": "A1"},
+        }
+    )
+    assert results == {
+        batteries[0]: {"Dashboard": {"Plant Size, GWh": None}},
+        batteries[1]: {"Dashboard": {"Plant Size, GWh": 2.0}},
+    }
+    with pytest.raises(KeyError):
+        batpac.read_battery_results(
+            {"Dashboard": {"Battery 1": {"Plant Size, GWh": "D131"}}}
+        )
+
+
+def test_calculate_incremental():
+    """Test calculate, which only writes changed values"""
+    batpac = create_memory_batpac()
+    batpac.load_batpac_file(datasets.get_batpy_dataset("batpy_batpac_config"))
+    batteries = [BatpacBattery(f"Battery {i}") for i in range(1, 4)]
+    batpac.load_batteries_file(
+        datasets.get_batpy_dataset("batpy_batteries_config"), batteries
+    )
+    batpac.calculate(incremental=True)
+    number_of_values = batpac.cell_writes["written"]
+    assert number_of_values == len(batpac._get_calculation_values())
+    assert batpac.cell_writes["skipped"] == 0
+
+    batpac.backend.calls.clear()
+    batpac.cell_writes.clear()
+    batpac.calculate(incremental=True)
+    assert batpac.cell_writes == {"written": 0, "skipped": number_of_values}
+    assert batpac.backend.calls == {"write_value": 1}
+
+    batpac.cell_writes.clear()
+    batteries[1].set_property("Dashboard", "Number of cells per module", 7.0)
+    batpac.set_new_property("Chem", "Unknown property", None)
+    batpac.calculate(incremental=True)
+    assert batpac.cell_writes == {
+        "written": 1,
+        "skipped": number_of_values - 1,
+    }
+    assert (
+        batpac.read_value(
+            "Dashboard", "Number of cells per module", batteries[1]
+        )
+        == 7.0
+    )
+
+    batpac.cell_writes.clear()
+    batpac.write_value(
+        "Dashboard", "Number of cells per module", 1.0, batteries[1]
+    )
+    batpac.calculate(incremental=True)
+    assert batpac.cell_writes["written"] == 1
+    assert (
+        batpac.read_value(
+            "Dashboard", "Number of cells per module", batteries[1]
+        )
+        == 7.0
+    )
+
+    batpac.cell_writes.clear()
+    batpac.calculate(incremental=False)
+    assert batpac.cell_writes == {"written": number_of_values, "skipped": 0}
+
+    batpac.cell_writes.clear()
+    batpac.calculate()
+    assert batpac.cell_writes == {"written": number_of_values, "skipped": 0}
+
+
+def test_read_from_user_input():
+    """Test read_from_user_input with bulk reads"""
+    batpac = create_memory_batpac()
+    summary_config = datasets.get_batpy_dataset(
+        "batpy_batpac_summary_of_results"
+    )
+    summary_cells = batpac._load_user_configuration(summary_config)
+    number_of_cells = 0
+    for sheet, sheet_cells in summary_cells.items():
+        for name, cell_range in sheet_cells.items():
+            if isinstance(cell_range, dict):
+                for battery_name, battery_range in cell_range.items():
+                    batpac.backend.write_value(
+                        sheet, battery_range, f"{name} {battery_name}"
+                    )
+                    number_of_cells += 1
+            else:
+                batpac.backend.write_value(sheet, cell_range, name)
+                number_of_cells += 1
+
+    batpac.backend.calls.clear()
+    values = batpac.read_from_user_input(summary_config)
+    assert batpac.backend.calls["read_range"] < number_of_cells / 10
+    assert "read_value" not in batpac.backend.calls
+    for sheet, sheet_cells in summary_cells.items():
+        for name, cell_range in sheet_cells.items():
+            if isinstance(cell_range, dict):
+                for battery_name in cell_range:
+                    assert (
+                        values[sheet][name][battery_name]
+                        == f"{name} {battery_name}"
+                    )
+            else:
+                assert values[sheet][name] == name
+    assert batpac._load_user_configuration(summary_config) == summary_cells
+
+
+def test_read_calculation_and_validation_results(capsys):
+    """Test read_calculation_and_validation_results with a single range read"""
+    batpac = create_memory_batpac()
+    batteries = [BatpacBattery(f"Battery {i}") for i in range(1, 8)]
+    batpac.add_battery(batteries)
+    with pytest.raises(KeyError):
+        batpac.read_calculation_and_validation_results()
+
+    for slot in range(batpac.max_batteries):
+        batpac.backend.write_value(
+            "Dashboard",
+            utility_functions.join_cell_address(131, 4 + slot),
+            float(slot),
+        )
+    batpac.backend.calls.clear()
+    results = batpac.read_calculation_and_validation_results(
+        datasets.get_batpy_dataset(
+            "batpy_batpac_calculation_and_validation_results"
+        ),
+        print_table=False,
+    )
+    assert batpac.backend.calls == {"read_range": 1}
+    assert results["Parameter"] == [battery.name for battery in batteries]
+    assert results["Plant Size, GWh"] == [float(i) for i in range(7)]
+    assert results["Adequacy of cooling"] == [None] * 7
+    assert len(results) == 7
+    assert not capsys.readouterr().out
+
+    assert batpac.read_calculation_and_validation_results() == results
+    output = capsys.readouterr().out
+    assert "Plant Size, GWh" in output and "Battery 7" in output
+
+
+def test_save_config(tmp_path):
+    """Test save_config with bulk reads"""
+    batpac = create_memory_batpac()
+    batpac.load_batpac_file(datasets.get_batpy_dataset("batpy_batpac_config"))
+    batteries = [BatpacBattery(f"Battery {i}") for i in range(1, 4)]
+    batpac.load_batteries_file(
+        datasets.get_batpy_dataset("batpy_batteries_config"), batteries
+    )
+    batpac.calculate()
+    batpac.batteries[0].set_property(
+        "Dashboard", "Number of cells per module", 1.5
+    )
+
+    batpac.backend.calls.clear()
+    batpac_path = tmp_path / "batpac_config.toml"
+    battery_path = tmp_path / "batteries_config.toml"
+    batpac.save_config(batpac_path, battery_path)
+    batpac_cells, battery_cells = batpac._get_config_cells()
+    number_of_cells = len(batpac_cells) + len(battery_cells)
+    assert "read_value" not in batpac.backend.calls
+    assert batpac.backend.calls["read_range"] < number_of_cells / 10
+    assert (
+        batpac.batteries[0].properties["Dashboard"][
+            "Number of cells per module"
+        ]
+        != 1.5
+    )
+
+    saved_batpac = create_memory_batpac()
+    saved_batpac.load_batpac_file(batpac_path)
+    saved_batteries = [BatpacBattery(f"Battery {i}") for i in range(1, 4)]
+    saved_batpac.load_batteries_file(battery_path, saved_batteries)
+    for sheet, sheet_properties in batpac.properties.items():
+        for key, value in sheet_properties.items():
+            if value is None or key == "Restart (0/1)":
+                assert key not in saved_batpac.properties.get(sheet, {})
+            else:
+                assert saved_batpac.properties[sheet][key] == value
+    for battery, saved_battery in zip(batteries, saved_batteries):
+        assert saved_battery.properties == {
+            sheet: {
+                key: value
+                for key, value in sheet_properties.items()
+                if value is not None
+            }
+            for sheet, sheet_properties in battery.properties.items()
+        }
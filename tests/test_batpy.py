@@ -0,0 +1,105 @@
+# pylint: disable=W0212
+# -*- coding: UTF-8 -*-
+"""Tests for the import of package batpy
+"""
+
+import subprocess
+import sys
+from importlib.metadata import version
+
+import pytest
+
+import batpy
+from batpy import data
+
+LAZY_MODULES = {"importlib.metadata", "toml", "tomllib", "numpy", "xlwings"}
+IMPORT_TIME_LIMIT_US = 500000
+
+
+def get_imported_modules(statement: str) -> set[str]:
+    """Get imported modules of a statement in a new interpreter
+
+    Parameters
+    ----------
+    statement : str
+        Import statement to run in a new interpreter
+
+    Returns
+    -------
+    set[str]
+        Names of the imported modules
+    """
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            statement + "\nimport sys\nprint('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(process.stdout.splitlines())
+
+
+def get_import_times(statement: str) -> dict[str, int]:
+    """Get import times with python -X importtime
+
+    Parameters
+    ----------
+    statement : str
+        Import statement to run in a new interpreter
+
+    Returns
+    -------
+    dict[str, int]
+        Cumulative import times in microseconds in the format
+        {"module" : time}
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def test_import():
+    """Test that importing batpy does not read metadata or scan datasets"""
+    imported_modules = get_imported_modules(
+        "import batpy, batpy.data\n"
+        "assert not batpy._get_version.cache_info().currsize\n"
+        "assert not batpy.data._get_versions.cache_info().currsize"
+    )
+    assert {"batpy", "batpy.data"} <= imported_modules
+    assert not LAZY_MODULES & imported_modules
+
+
+@pytest.mark.benchmark
+def test_import_time():
+    """Test the import time of batpy with python -X importtime"""
+    import_times = get_import_times("import batpy, batpy.data")
+    assert "importlib.metadata" not in import_times
+    assert import_times["batpy"] < IMPORT_TIME_LIMIT_US
+    assert import_times["batpy.data"] < IMPORT_TIME_LIMIT_US
+
+
+def test_version():
+    """Test lazy __version__ and __versions__"""
+    assert batpy.__version__ == version("batpy")
+    assert batpy._get_version.cache_info().currsize == 1
+    assert "0.4.0" in data.__versions__
+    assert "__pycache__" not in data.__versions__
+    assert data.__versions__ is not data.__versions__
+    assert data._get_versions.cache_info().hits > 0
+    with pytest.raises(AttributeError):
+        assert batpy.__unknown__
+    with pytest.raises(AttributeError):
+        assert data.__unknown__
@@ -0,0 +1,201 @@
+# pylint: disable=W0212
+# -*- coding: UTF-8 -*-
+"""Tests for module batpy_workbook
+"""
+
+from batpy import datasets, utility_functions
+from batpy.batpy_workbook import BatpyWorkbook
+from batpy.export_mapping import compile_export_plan
+from batpy.workbook_backends import MemoryBackend
+
+
+DEFINED_NAMES = {
+    ("Sheet 1", "Named_Range"): "D30",
+    ("Sheet 2", "Named range"): "C5",
+}
+
+
+def create_memory_workbook(
+    cells: dict[tuple[str, str], any] = None
+) -> BatpyWorkbook:
+    """Create batpy workbook with in-memory backend
+
+    Parameters
+    ----------
+    cells : dict[tuple[str, str], any], optional
+        Values in the format {("worksheet", "cell") : value}, by default None.
+
+    Returns
+    -------
+    BatpyWorkbook
+        Batpy workbook
+    """
+    return BatpyWorkbook(
+        None, backend=MemoryBackend(cells, defined_names=DEFINED_NAMES)
+    )
+
+
+def test_read_values_bulk():
+    """Test _read_values_bulk"""
+    workbook = create_memory_workbook(
+        {
+            ("Sheet 1", "B16"): 16,
+            ("Sheet 1", "C17"): "C17",
+            ("Sheet 1", "B200"): 200,
+            ("Sheet 2", "A1"): 1.0,
+        }
+    )
+    values = workbook._read_values_bulk(
+        [
+            ("Sheet 1", "B16"),
+            ("Sheet 1", "C17"),
+            ("Sheet 1", "$B$16"),
+            ("Sheet 1", "B200"),
+            ("Sheet 1", "B18"),
+            ("Sheet 2", "A1"),
+            ("Sheet 2", "Named range"),
+        ]
+    )
+    assert values == {
+        ("Sheet 1", "B16"): 16,
+        ("Sheet 1", "C17"): "C17",
+        ("Sheet 1", "$B$16"): 16,
+        ("Sheet 1", "B200"): 200,
+        ("Sheet 1", "B18"): None,
+        ("Sheet 2", "A1"): 1.0,
+        ("Sheet 2", "Named range"): None,
+    }
+    assert workbook.backend.calls == {"read_range": 3, "read_value": 1}
+
+
+def test_read_values_bulk_export_plan():
+    """Test _read_values_bulk for the referenced cells of an export plan"""
+    properties = utility_functions.load_configuration(
+        datasets.get_batpy_dataset("batpy_batpac2brightway")
+    )
+    properties.pop("batpy")
+    batpac_config = utility_functions.combine_configuration(
+        [
+            datasets.get_batpy_dataset("batpy_batpac_battery_design"),
+            datasets.get_batpy_dataset("batpy_batpac_bms"),
+        ]
+    )
+    export_plan = compile_export_plan(properties, batpac_config)
+    source_cells = export_plan.get_source_cells(2)
+
+    workbook = create_memory_workbook(
+        {cell: index + 1.0 for index, cell in enumerate(source_cells)}
+    )
+    values = workbook._read_values_bulk(source_cells)
+    assert values == {
+        cell: workbook._read_value_direct(*cell) for cell in source_cells
+    }
+    assert workbook.backend.calls["read_range"] < len(source_cells) / 4
+    assert dict(export_plan.evaluate(values, 2))
+
+
+def test_write_values_bulk():
+    """Test _write_values_bulk"""
+    workbook = create_memory_workbook({})
+    workbook._write_values_bulk(
+        {
+            ("Sheet 1", "B16"): 16,
+            ("Sheet 1", "B17"): 17,
+            ("Sheet 1", "C16"): "C16",
+            ("Sheet 1", "C17"): "C17",
+            ("Sheet 1", "B19"): 19,
+            ("Sheet 1", "Named_Range"): "named",
+        },
+        {("Sheet 2", "A1"): 1.0, ("Sheet 2", "A2"): 2.0},
+    )
+    assert workbook.backend.get_cells() == {
+        ("Sheet 1", "B16"): 16,
+        ("Sheet 1", "B17"): 17,
+        ("Sheet 1", "C16"): "C16",
+        ("Sheet 1", "C17"): "C17",
+        ("Sheet 1", "B19"): 19,
+        ("Sheet 1", "D30"): "named",
+        ("Sheet 2", "A1"): 1.0,
+        ("Sheet 2", "A2"): 2.0,
+    }
+    assert workbook.backend.calls == {"write_range": 3, "write_value": 1}
+
+    workbook.backend.calls.clear()
+    workbook._write_values_bulk({("Sheet 2", "A1"): 3.0})
+    workbook._write_values_bulk(
+        {}, {("Sheet 2", "A1"): 1.0, ("Sheet 2", "A2"): 2.0}
+    )
+    assert workbook.backend.get_cells()[("Sheet 2", "A1")] == 1.0
+    assert workbook.backend.calls == {"write_range": 2}
+
+    workbook.backend.calls.clear()
+    workbook._write_values_bulk(
+        {}, {("Sheet 2", "A1"): 1.0, ("Sheet 2", "A2"): 2.0}
+    )
+    assert not workbook.backend.calls
+
+
+def test_write_values_bulk_export_plan():
+    """Test _write_values_bulk for the results of an export plan"""
+    properties = utility_functions.load_configuration(
+        datasets.get_batpy_dataset("batpy_batpac2brightway")
+    )
+    properties.pop("batpy")
+    batpac_config = utility_functions.combine_configuration(
+        [
+            datasets.get_batpy_dataset("batpy_batpac_battery_design"),
+            datasets.get_batpy_dataset("batpy_batpac_bms"),
+        ]
+    )
+    export_plan = compile_export_plan(properties, batpac_config)
+    source_cells = export_plan.get_source_cells()
+    source_values = {
+        cell: index + 1.0 for index, cell in enumerate(source_cells)
+    }
+
+    workbook = create_memory_workbook({})
+    values = {}
+    constant_values = {}
+    for entry, value in export_plan.evaluate(source_values):
+        if entry.formula.is_constant:
+            constant_values[(entry.worksheet, entry.cell_range)] = value
+        else:
+            values[(entry.worksheet, entry.cell_range)] = value
+    workbook._write_values_bulk(values, constant_values)
+    assert workbook.backend.get_cells() == values | constant_values
+    assert workbook.backend.calls == {
+        "write_range": len({entry.worksheet for entry in export_plan.entries})
+    }
+    assert workbook.backend.calls["write_range"] < len(export_plan) / 2
+
+
+def test_write_values_bulk_tracked_values():
+    """Test _write_values_bulk with tracked values"""
+    workbook = create_memory_workbook({("Sheet 1", "A1"): 1.0})
+    workbook._write_values_bulk({}, {("Sheet 1", "A1"): None})
+    assert not workbook.backend.get_cells()
+    workbook._write_values_bulk(
+        {("Sheet 1", "A2"): 2}, {("Sheet 1", "A1"): 1, ("Sheet 1", "A2"): 3}
+    )
+    assert workbook.backend.get_cells() == {
+        ("Sheet 1", "A1"): 1,
+        ("Sheet 1", "A2"): 2,
+    }
+    assert workbook.cell_writes == {"written": 3, "skipped": 0}
+    assert workbook._written_values == {("Sheet 1", "A1"): 1}
+
+    workbook.cell_writes.clear()
+    workbook._write_values_bulk(
+        {}, {("Sheet 1", "A1"): 1.0, ("Sheet 1", "A2"): 3}
+    )
+    assert workbook.backend.get_cells() == {
+        ("Sheet 1", "A1"): 1.0,
+        ("Sheet 1", "A2"): 3,
+    }
+    assert workbook.cell_writes == {"written": 2, "skipped": 0}
+
+    workbook.cell_writes.clear()
+    workbook._write_values_bulk(
+        {}, {("Sheet 1", "A1"): 1.0, ("Sheet 1", "A2"): 3}
+    )
+    assert workbook.cell_writes == {"written": 0, "skipped": 2}
@@ -0,0 +1,229 @@
+# -*- coding: UTF-8 -*-
+"""Tests for module dataset_bundle
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import toml
+
+from batpy import data, dataset_bundle, datasets, utility_functions
+
+DATASET_PATHS = sorted(Path(data.__path__[0]).glob("*/*.toml"))
+
+
+def test_compile_dataset_bundle(tmp_path):
+    """Test compile_dataset_bundle and DatasetBundle"""
+    configuration = '["batpy"]\n"BatPaC SemVer" = "0.4.0"\n["Sheet"]\nA = 1\n'
+    unbundled_configuration = "[Sheet]\nDate = 2023-05-02T10:00:00\n"
+    (tmp_path / "0.4.0").mkdir()
+    (tmp_path / "0.4.0" / "a.toml").write_text(configuration)
+    (tmp_path / "0.4.0" / "b.toml").write_text(unbundled_configuration)
+    bundle_path = dataset_bundle.compile_dataset_bundle(
+        tmp_path, tmp_path / "datasets.bundle"
+    )
+
+    bundle = dataset_bundle.DatasetBundle(bundle_path)
+    assert bundle.compatible
+    assert bundle.python_version == sys.version_info[:2]
+    text_hash = dataset_bundle.get_text_hash(configuration)
+    assert text_hash in bundle
+    assert bundle.get(text_hash) == toml.loads(configuration)
+    assert bundle.get(text_hash) is not bundle.get(text_hash)
+    assert (
+        bundle.get(dataset_bundle.get_text_hash(unbundled_configuration))
+        is None
+    )
+
+    (tmp_path / "invalid.bundle").write_bytes(b"invalid")
+    with pytest.raises(ValueError):
+        dataset_bundle.DatasetBundle(tmp_path / "invalid.bundle")
+
+
+@pytest.fixture
+def bundle_path(tmp_path, monkeypatch):
+    """Compile the datasets into a temporary default dataset bundle"""
+    bundle_path = dataset_bundle.compile_dataset_bundle(
+        bundle_path=tmp_path / "datasets.bundle"
+    )
+    monkeypatch.setattr(
+        dataset_bundle, "get_default_bundle_path", lambda: bundle_path
+    )
+    dataset_bundle.get_dataset_bundle.cache_clear()
+    yield bundle_path
+    dataset_bundle.get_dataset_bundle.cache_clear()
+
+
+def test_get_default_bundle_path(tmp_path, monkeypatch):
+    """Test that the default dataset bundle is specific to the interpreter"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert dataset_bundle.get_default_bundle_path() == Path(
+        tmp_path, "batpy", f"datasets.{sys.implementation.cache_tag}.bundle"
+    )
+
+
+def test_get_dataset_bundle_compile(tmp_path, monkeypatch):
+    """Test that the dataset bundle is compiled on first use and if outdated"""
+    bundle_path = tmp_path / "cache" / "datasets.bundle"
+    monkeypatch.setattr(
+        dataset_bundle, "get_default_bundle_path", lambda: bundle_path
+    )
+    compiled_paths = []
+    compile_dataset_bundle = dataset_bundle.compile_dataset_bundle
+    monkeypatch.setattr(
+        dataset_bundle,
+        "compile_dataset_bundle",
+        lambda **kwargs: compiled_paths.append(kwargs["bundle_path"])
+        or compile_dataset_bundle(**kwargs),
+    )
+    dataset_bundle.get_dataset_bundle.cache_clear()
+
+    bundle = dataset_bundle.get_dataset_bundle()
+    assert compiled_paths == [bundle_path]
+    assert bundle.path == bundle_path
+    assert bundle.sources_hash == dataset_bundle.get_sources_hash()
+    assert set(bundle.index) == {
+        dataset_bundle.get_text_hash(path.read_text(encoding="utf-8"))
+        for path in DATASET_PATHS
+    }
+    assert dataset_bundle.get_dataset_bundle() is bundle
+    dataset_bundle.get_dataset_bundle.cache_clear()
+    assert dataset_bundle.get_dataset_bundle().path == bundle_path
+    assert len(compiled_paths) == 1
+
+    monkeypatch.setattr(
+        dataset_bundle, "get_sources_hash", lambda data_path=None: bytes(32)
+    )
+    dataset_bundle.get_dataset_bundle.cache_clear()
+    assert dataset_bundle.get_dataset_bundle().sources_hash == bytes(32)
+    assert len(compiled_paths) == 2
+    assert not list(bundle_path.parent.glob("*.tmp"))
+
+    bundle_path.write_bytes(b"invalid")
+    dataset_bundle.get_dataset_bundle.cache_clear()
+    assert dataset_bundle.get_dataset_bundle().compatible
+    assert len(compiled_paths) == 3
+    dataset_bundle.get_dataset_bundle.cache_clear()
+
+
+def test_get_sources_hash(tmp_path):
+    """Test that changed dataset files change the sources hash"""
+    (tmp_path / "0.4.0").mkdir()
+    dataset_path = tmp_path / "0.4.0" / "a.toml"
+    dataset_path.write_text("A = 1\n")
+    sources_hash = dataset_bundle.get_sources_hash(tmp_path)
+    assert sources_hash == dataset_bundle.get_sources_hash(tmp_path)
+    dataset_path.write_text("A = 12\n")
+    assert sources_hash != dataset_bundle.get_sources_hash(tmp_path)
+
+
+def test_dataset_bundle_version_mismatch(bundle_path):
+    """Test that a dataset bundle of another Python version is compiled"""
+    bundle_bytes = bytearray(bundle_path.read_bytes())
+    header = dataset_bundle._HEADER  # pylint: disable=W0212
+    fields = list(header.unpack_from(bundle_bytes))
+    fields[3] += 1
+    header.pack_into(bundle_bytes, 0, *fields)
+    bundle_path.write_bytes(bundle_bytes)
+
+    bundle = dataset_bundle.DatasetBundle(bundle_path)
+    assert not bundle.compatible
+    assert bundle.get(next(iter(bundle.index))) is None
+    bundle.close()
+
+    configuration_text = DATASET_PATHS[0].read_text(encoding="utf-8")
+    assert utility_functions.load_configuration(
+        configuration_text
+    ) == toml.loads(configuration_text)
+    assert dataset_bundle.get_dataset_bundle().compatible
+    assert dataset_bundle.DatasetBundle(bundle_path).compatible
+
+
+def test_dataset_bundle_invalid_payload(bundle_path):
+    """Test that an invalid bundled configuration is parsed as TOML"""
+    configuration_text = DATASET_PATHS[0].read_text(encoding="utf-8")
+    text_hash = dataset_bundle.get_text_hash(configuration_text)
+    bundle = dataset_bundle.DatasetBundle(bundle_path)
+    offset, length = bundle.index[text_hash]
+    payload_offset = bundle._payload_offset
+    del bundle
+
+    bundle_bytes = bytearray(bundle_path.read_bytes())
+    bundle_bytes[payload_offset + offset] = 0
+    bundle_path.write_bytes(bundle_bytes)
+
+    assert (
+        dataset_bundle.load_bundled_configuration(configuration_text) is None
+    )
+    assert utility_functions.load_configuration(
+        configuration_text
+    ) == toml.loads(configuration_text)
+
+
+def test_load_configuration_dataset_bundle(bundle_path, monkeypatch):
+    """Test load_configuration with and without dataset bundle"""
+    configuration_text = datasets.get_batpy_dataset(
+        "batpy_batpac_battery_design"
+    )
+    configuration = toml.loads(configuration_text)
+    with monkeypatch.context() as context:
+        context.setattr(
+            utility_functions,
+            "_parse_configuration_text",
+            lambda text: pytest.fail("Bundled dataset parsed"),
+        )
+        assert (
+            utility_functions.load_configuration(configuration_text)
+            == configuration
+        )
+
+    monkeypatch.setattr(
+        utility_functions,
+        "load_bundled_configuration",
+        lambda text, text_hash=None: None,
+    )
+    assert (
+        utility_functions.load_configuration(configuration_text)
+        == configuration
+    )
+
+
+def test_load_configuration_bundle_path(bundle_path, monkeypatch):
+    """Test that included datasets are loaded from the bundle only"""
+    unmarshal_calls = []
+    get = dataset_bundle.DatasetBundle.get
+    monkeypatch.setattr(
+        dataset_bundle.DatasetBundle,
+        "get",
+        lambda self, text_hash: unmarshal_calls.append(text_hash)
+        or get(self, text_hash),
+    )
+    monkeypatch.setattr(
+        utility_functions,
+        "_parse_configuration_text",
+        lambda text: pytest.fail("Bundled dataset parsed"),
+    )
+    for dataset_path in DATASET_PATHS:
+        utility_functions.load_configuration(dataset_path)
+    assert set(unmarshal_calls) == set(
+        dataset_bundle.DatasetBundle(bundle_path).index
+    )
+
+
+@pytest.mark.benchmark
+def test_dataset_bundle_cold_load_time(bundle_path):
+    """Compare the cold load time of the dataset bundle and TOML"""
+    configuration_text = datasets.get_batpy_dataset(
+        "batpy_batpac_battery_design"
+    )
+    start_time = time.perf_counter()
+    toml.loads(configuration_text)
+    toml_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    bundle = dataset_bundle.DatasetBundle(bundle_path)
+    assert bundle.get(dataset_bundle.get_text_hash(configuration_text))
+    bundle_time = time.perf_counter() - start_time
+    assert bundle_time < toml_time / 5
@@ -9,6 +9,8 @@ import semantic_version
 import toml
 
 from batpy import data, datasets
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_tool import BatpacTool
 
 # from data.batpy_test_data import example_battery_data  # noqa: F401
 
@@ -148,3 +150,82 @@ def test_copy_integrated_dataset():
         datasets.copy_integrated_dataset(
             "batpy_batpac2brightway", BATPY_BRIGHTWAY_CONFIG, "0.0.0"
         )
+
+
+def test_dataset_registry(monkeypatch):
+    """Test dataset registry"""
+    registry = datasets.DatasetRegistry(["0.1.0", "0.4.0", "excel_workbooks"])
+    assert registry.versions == (
+        semantic_version.Version("0.1.0"),
+        semantic_version.Version("0.4.0"),
+    )
+    assert registry.latest_version == semantic_version.Version("0.4.0")
+    assert registry.get_dataset_version("") == registry.latest_version
+    assert registry.get_dataset_version("0.1.0") == registry.versions[0]
+    with pytest.raises(ValueError):
+        registry.get_dataset_names("0.3.0")
+
+    assert datasets.get_dataset_registry() is datasets.get_dataset_registry()
+    dataset_names = datasets.get_available_batpy_dataset_names()
+    listdir_calls = []
+    monkeypatch.setattr(
+        datasets.os,
+        "listdir",
+        lambda path: listdir_calls.append(path) or [],
+    )
+    assert datasets.get_available_batpy_dataset_names() == dataset_names
+    assert (
+        datasets.get_available_batpy_dataset_names(LATEST_DATASET_VERSION)
+        == dataset_names
+    )
+    assert not listdir_calls
+
+
+def test_get_parsed_batpy_dataset(monkeypatch):
+    """Test get_parsed_batpy_dataset"""
+    parsed_dataset = datasets.get_parsed_batpy_dataset(
+        "batpy_batpac_battery_design"
+    )
+    configuration = toml.loads(
+        datasets.get_batpy_dataset("batpy_batpac_battery_design")
+    )
+    assert parsed_dataset.metadata == configuration.pop("batpy")
+    assert parsed_dataset == configuration
+    assert parsed_dataset is datasets.get_parsed_batpy_dataset(
+        "batpy_batpac_battery_design.toml", LATEST_DATASET_VERSION
+    )
+    assert parsed_dataset is not datasets.get_parsed_batpy_dataset(
+        "batpy_batpac_battery_design", "0.3.0"
+    )
+
+    user_input_cells, batteries_config, batpac_config = (
+        datasets.get_parsed_batpy_dataset(dataset_name)
+        for dataset_name in [
+            "batpy_batpac_user_input_cells",
+            "batpy_batteries_config",
+            "batpy_batpac_config",
+        ]
+    )
+    monkeypatch.setattr(
+        datasets.utility_functions,
+        "load_configuration",
+        lambda configuration: pytest.fail("Dataset parsed again"),
+    )
+    batpac = BatpacTool(None, user_input_cells, backend="memory")
+    battery = BatpacBattery("Battery 1")
+    assert battery.load_battery_file(batteries_config, "Battery 1")
+    batpac.add_battery([battery])
+    assert (
+        batpac.read_value(
+            "Battery Design",
+            next(iter(parsed_dataset["Battery Design"]["Battery 1"])),
+            battery,
+            parsed_dataset,
+        )
+        is None
+    )
+    batpac.load_batpac_file(
+        datasets.get_parsed_batpy_dataset("batpy_batpac_config")
+    )
+    batpac.set_new_property("Chem", "Unknown property", None)
+    assert batpac_config != batpac.properties
@@ -0,0 +1,266 @@
+# -*- coding: UTF-8 -*-
+"""Tests for module export_mapping
+"""
+
+import pytest
+
+from batpy import datasets, utility_functions
+from batpy.formula_engine import evaluate_formula
+from batpy.export_mapping import (
+    ExportPlan,
+    build_mapping_formula,
+    compile_export_plan,
+    get_constant_mappings,
+    get_constant_value,
+    split_mapping_chunks,
+)
+
+BATPY_BRIGHTWAY_CONFIG = "./tests/data/test_batpy_batpac2brightway.toml"
+
+
+def test_split_mapping_chunks():
+    """Test split_mapping_chunks"""
+    assert split_mapping_chunks(["", "1", ""]) == [["", "1", ""]]
+    assert split_mapping_chunks(
+        ["Sheet", "Name", "+", "", "5", "*", "", "2"]
+    ) == [["Sheet", "Name", "+"], ["", "5", "*"], ["", "2"]]
+    assert split_mapping_chunks(["", "1", "", "2"], 2) == [
+        ["", "1"],
+        ["", "2"],
+    ]
+
+
+def test_build_mapping_formula():
+    """Test build_mapping_formula"""
+    chunks = split_mapping_chunks(
+        [
+            "",
+            "(",
+            "",
+            "Battery Design",
+            "Mass",
+            "+",
+            "",
+            "5)",
+            "*",
+            "Battery Design",
+            "Mass",
+            "- 2 *",
+            "Chem",
+            "Mass",
+            "",
+        ]
+    )
+    formula, bindings = build_mapping_formula(chunks)
+    assert formula == "(_ref_0+5)*_ref_0- 2 *_ref_1"
+    assert bindings == {
+        "_ref_0": ("Battery Design", "Mass"),
+        "_ref_1": ("Chem", "Mass"),
+    }
+    assert build_mapping_formula(chunks) == (formula, bindings)
+
+    cell_values = {("Battery Design", "Mass"): 0.1, ("Chem", "Mass"): -3}
+    vars_val = {
+        variable: cell_values[reference]
+        for variable, reference in bindings.items()
+    }
+    assert evaluate_formula(formula, vars_val) == evaluate_formula(
+        "(0.1+5)*0.1- 2 *-3"
+    )
+
+    assert build_mapping_formula([["", "1", ""]]) == ("1", {})
+
+
+@pytest.mark.parametrize(
+    "chunks, expected_constant_value",
+    [
+        ([["", "1", ""]], 1.0),
+        ([["", "(", ""], ["", "5)", "*"], ["", "2"]], 10.0),
+        ([["", "1/1000"]], 0.001),
+        ([["Sheet", "Name", "+"], ["", "5"]], None),
+    ],
+)
+def test_get_constant_value(chunks, expected_constant_value):
+    """Test get_constant_value
+
+    Parameters
+    ----------
+    chunks : _type_
+        Chunks of the mapping formula
+    expected_constant_value : _type_
+        Value of the mapping, None if the mapping is not constant
+    """
+    assert get_constant_value(chunks) == expected_constant_value
+
+
+def test_get_constant_mappings():
+    """Test get_constant_mappings"""
+    properties = utility_functions.load_configuration(BATPY_BRIGHTWAY_CONFIG)
+    properties.pop("batpy")
+    assert not get_constant_mappings(properties)
+
+    properties = utility_functions.load_configuration(
+        datasets.get_batpy_dataset("batpy_batpac2brightway")
+    )
+    properties.pop("batpy")
+    constant_mappings = get_constant_mappings(properties)
+    assert (
+        constant_mappings["Battery Pack"][
+            "Pack battery management system (BMS)"
+        ]
+        == 1.0
+    )
+    for sheet_name, sheet_item in constant_mappings.items():
+        for item_key in sheet_item:
+            assert all(
+                chunk[0] == ""
+                for chunk in split_mapping_chunks(
+                    properties[sheet_name][item_key][1]
+                )
+            )
+
+
+BATTERY_CELL_CONFIG = {
+    "Battery Design": {
+        "Battery 1": {"Mass": "G12", "Energy": "G13"},
+        "Battery 2": {"Mass": "H12", "Energy": "H13"},
+        "Battery 3": {"Mass": "I12"},
+    }
+}
+
+EXPORT_PROPERTIES = {
+    "Module": {
+        "Constant": [["B16"], ["", "1", ""]],
+        "Calculation": [
+            ["B23"],
+            ["Battery Design", "Mass", "+", "", "5", "*", "", "2"],
+        ],
+        "Energy": [["B24"], ["Battery Design", "Energy", "/1000"]],
+    }
+}
+
+
+def test_compile_export_plan():
+    """Test compile_export_plan"""
+    export_plan = compile_export_plan(EXPORT_PROPERTIES, BATTERY_CELL_CONFIG)
+    assert isinstance(export_plan, ExportPlan)
+    assert len(export_plan) == 3
+
+    constant_entry, calculation_entry, energy_entry = export_plan.entries
+    assert (constant_entry.worksheet, constant_entry.cell_range) == (
+        "Module",
+        "B16",
+    )
+    assert constant_entry.formula.is_constant
+    assert not constant_entry.sources
+    assert calculation_entry.formula.source == "_ref_0+5*2"
+    assert calculation_entry.sources[0].cell_ranges == ("G12", "H12", "I12")
+    assert energy_entry.sources[0].cell_ranges == ("G13", "H13")
+
+    rat_export_plan = compile_export_plan(
+        {"Battery": {"Weight": [["C3"], ["Battery", "Weight", "*2"]]}},
+        {"Battery": {"Weight": "C3"}},
+        battery_specific=False,
+    )
+    assert rat_export_plan.entries[0].sources[0].cell_ranges == ("C3",)
+    assert not rat_export_plan.entries[0].sources[0].battery_specific
+    assert rat_export_plan.get_source_cells(3) == [("Battery", "C3")]
+
+    with pytest.raises(KeyError):
+        compile_export_plan(
+            {"Module": {"Invalid": [["B1"], ["Battery Design", "Invalid"]]}},
+            BATTERY_CELL_CONFIG,
+        )
+    with pytest.raises(KeyError):
+        compile_export_plan(
+            {"Module": {"Invalid": [["B1"], ["Invalid", "Mass"]]}},
+            BATTERY_CELL_CONFIG,
+        )
+
+
+def test_export_plan_evaluate():
+    """Test ExportPlan.evaluate"""
+    cell_values = {
+        ("Battery Design", "G12"): 10,
+        ("Battery Design", "G13"): 42000,
+        ("Battery Design", "H12"): 20,
+        ("Battery Design", "H13"): 84000,
+        ("Battery Design", "I12"): 30,
+    }
+    export_plan = compile_export_plan(EXPORT_PROPERTIES, BATTERY_CELL_CONFIG)
+
+    assert export_plan.get_source_cells() == [
+        ("Battery Design", "G12"),
+        ("Battery Design", "G13"),
+    ]
+    results = {
+        entry.cell_range: value
+        for entry, value in export_plan.evaluate(cell_values)
+    }
+    assert results == {"B16": 1.0, "B23": 20.0, "B24": 42.0}
+
+    results = {
+        entry.cell_range: value
+        for entry, value in export_plan.evaluate(cell_values, 1)
+    }
+    assert results == {"B16": 1.0, "B23": 30.0, "B24": 84.0}
+
+    with pytest.raises(KeyError):
+        export_plan.get_source_cells(2)
+    with pytest.raises(KeyError):
+        dict(export_plan.evaluate(cell_values, 2))
+    with pytest.raises(KeyError):
+        dict(export_plan.evaluate(cell_values, 6))
+    with pytest.raises(KeyError):
+        dict(export_plan.evaluate({}))
+
+
+def test_export_plan_single_battery_slot():
+    """Test that a battery specific cell of a single battery is not shared"""
+    export_plan = compile_export_plan(
+        {"Module": {"Mass": [["B23"], ["Battery Design", "Mass"]]}},
+        {"Battery Design": {"Battery 1": {"Mass": "G12"}}},
+    )
+    source = export_plan.entries[0].sources[0]
+    assert source.cell_ranges == ("G12",)
+    assert source.battery_specific
+    assert export_plan.get_source_cells(0) == [("Battery Design", "G12")]
+    with pytest.raises(KeyError):
+        export_plan.get_source_cells(1)
+    with pytest.raises(KeyError):
+        dict(export_plan.evaluate({("Battery Design", "G12"): 1}, 1))
+
+
+@pytest.mark.parametrize(
+    "split_constants, expected_values, expected_constant_values",
+    [
+        (
+            True,
+            {("Module", "B23"): 30.0, ("Module", "B24"): 84.0},
+            {("Module", "B16"): 1.0},
+        ),
+        (
+            False,
+            {
+                ("Module", "B16"): 1.0,
+                ("Module", "B23"): 30.0,
+                ("Module", "B24"): 84.0,
+            },
+            {},
+        ),
+    ],
+)
+def test_export_plan_split_values(
+    split_constants, expected_values, expected_constant_values
+):
+    """Test ExportPlan.split_values"""
+    cell_values = {
+        ("Battery Design", "H12"): 20,
+        ("Battery Design", "H13"): 84000,
+        ("Battery Design", "I12"): 30,
+    }
+    export_plan = compile_export_plan(EXPORT_PROPERTIES, BATTERY_CELL_CONFIG)
+    assert export_plan.split_values(cell_values, 1, split_constants) == (
+        expected_values,
+        expected_constant_values,
+    )
@@ -2,13 +2,20 @@
 """Tests for module formula_engine
 """
 
+import ast
+import operator
+import timeit
+
 import pytest
 
 from batpy.formula_engine import (
+    CompiledFormula,
     FormulaRuntimeError,
     FormulaSyntaxError,
     _byte_offset_to_char_offset,
+    compile_formula,
     evaluate_formula,
+    evaluate_formula_batch,
 )
 
 
@@ -56,6 +63,8 @@ def test_evaluate_formula(
         ("42" * 1025, {}, FormulaSyntaxError),
         ("lambda a:" * 4242, {}, FormulaSyntaxError),
         ("42/0", {}, FormulaRuntimeError),
+        ("a", {"a": "42a"}, FormulaRuntimeError),
+        ("-" * 1000 + "42", {}, FormulaSyntaxError),
     ],
 )
 def test_evaluate_formula_raise_error(
@@ -85,3 +94,215 @@ def test_formula_syntax_error_string():
 def test_byte_offset_to_char_offset():
     """Test _byte_offset_to_char_offset"""
     assert _byte_offset_to_char_offset("\x81", 1) == 0
+
+
+def test_compile_formula():
+    """Test compile_formula"""
+    compiled_formula = compile_formula("a * b / c")
+    assert isinstance(compiled_formula, CompiledFormula)
+    assert compiled_formula.source == "a * b / c"
+    assert compiled_formula.variables == {"a", "b", "c"}
+    assert compiled_formula({"a": 1274, "b": 3, "c": 91}) == 42.0
+    assert compiled_formula({"a": 42, "b": 1, "c": 1, "d": 0}) == 42.0
+    assert repr(compiled_formula) == "CompiledFormula('a * b / c')"
+
+    assert compile_formula("a * b / c") is compiled_formula
+    assert compile_formula("42")() == 42.0
+
+    with pytest.raises(FormulaSyntaxError):
+        compiled_formula({"a": 1274, "b": 3})
+    with pytest.raises(FormulaRuntimeError):
+        compiled_formula({"a": 1274, "b": 3, "c": 0})
+    with pytest.raises(FormulaSyntaxError):
+        compile_formula("1 ** 42")
+
+
+@pytest.mark.parametrize(
+    "formula_to_fold, expected_constant_value",
+    [
+        ("42", 42.0),
+        ("-42", -42.0),
+        ("(5) * 2", 10.0),
+        ("1/1000/1.2*0.2", 1 / 1000 / 1.2 * 0.2),
+        ("a * 1", None),
+        ("1 * a / 1", None),
+        ("a * 2 * 1", None),
+        ("42 / 0", None),
+    ],
+)
+def test_compile_formula_constant_folding(
+    formula_to_fold, expected_constant_value
+):
+    """Test constant folding of compile_formula
+
+    Parameters
+    ----------
+    formula_to_fold : _type_
+        Formulas to compile
+    expected_constant_value : _type_
+        Folded value of the formula, None if the formula is not constant
+    """
+    compiled_formula = compile_formula(formula_to_fold)
+    assert compiled_formula.is_constant == (
+        expected_constant_value is not None
+    )
+    assert compiled_formula.constant_value == expected_constant_value
+    if compiled_formula.variables:
+        assert compiled_formula({"a": 21}) == evaluate_formula(
+            formula_to_fold.replace("a", "21")
+        )
+
+
+def test_compile_formula_cache():
+    """Test compile_formula cache"""
+    compile_formula.cache_clear()
+    for _ in range(42):
+        evaluate_formula("a + 2", {"a": 40})
+    cache_info = compile_formula.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 41
+
+
+@pytest.mark.parametrize(
+    "formula_batch, vars_columns, expected_evaluation",
+    [
+        ("42", None, [42.0]),
+        ("a * b / c", {"a": [1274, 42], "b": [3, 1], "c": 91}, None),
+        ("-a + 84", {"a": [42, 42, 42]}, [42.0, 42.0, 42.0]),
+        ("42", {"a": [1, 2]}, [42.0]),
+        ("a * 2", {"a": [1, 2], "b": [1, 2, 3]}, [2.0, 4.0]),
+    ],
+)
+def test_evaluate_formula_batch(
+    formula_batch, vars_columns, expected_evaluation
+):
+    """Test evaluate_formula_batch
+
+    Parameters
+    ----------
+    formula_batch : _type_
+        Formulas to evaluate over whole columns
+    vars_columns : _type_
+        Variables and their columns of values
+    expected_evaluation : _type_
+        Result of the formula evaluation, if None the result of
+        evaluate_formula for each row is expected
+    """
+    numpy = pytest.importorskip("numpy")
+    result = evaluate_formula_batch(formula_batch, vars_columns)
+    if expected_evaluation is None:
+        rows = numpy.broadcast_arrays(*vars_columns.values())
+        expected_evaluation = [
+            evaluate_formula(formula_batch, dict(zip(vars_columns, row)))
+            for row in zip(*rows)
+        ]
+    assert numpy.array_equal(
+        numpy.atleast_1d(result), numpy.asarray(expected_evaluation)
+    )
+
+
+@pytest.mark.parametrize(
+    "formula_with_error, vars_columns, expected_error",
+    [
+        ("a / b", {"a": [42, 42], "b": [1, 0]}, FormulaRuntimeError),
+        ("a + b", {"a": [1, 2], "b": [1, 2, 3]}, FormulaRuntimeError),
+        ("a + b", {"a": [1, 2]}, FormulaSyntaxError),
+        ("1 ** 42", {}, FormulaSyntaxError),
+    ],
+)
+def test_evaluate_formula_batch_raise_error(
+    formula_with_error, vars_columns, expected_error
+):
+    """Test evaluate_formula_batch, which will result in an error
+
+    Parameters
+    ----------
+    formula_with_error : _type_
+        Formulas to evaluate, which will result in an error
+    vars_columns : _type_
+        Variables and their columns of values
+    expected_error : _type_
+        Expected error type
+    """
+    pytest.importorskip("numpy")
+    with pytest.raises(expected_error):
+        evaluate_formula_batch(formula_with_error, vars_columns)
+
+
+def _reference_eval_node(node: ast.AST, vars_val: dict[str, any]) -> float:
+    """Reference evaluator with per-node isinstance dispatch
+
+    Tree-walking evaluator, which rebuilds its dispatch tables for each node,
+    as evaluate_formula did before formulas were compiled.
+
+    Parameters
+    ----------
+    node : ast.AST
+        Ast node
+    vars_val : dict[str, any]
+        Variables and their values used to evaluate the function
+
+    Returns
+    -------
+    float
+        Result of the evaluated node
+    """
+    supported_binary_operations = {
+        ast.Add: operator.add,
+        ast.Sub: operator.sub,
+        ast.Mult: operator.mul,
+        ast.Div: operator.truediv,
+    }
+    supported_evaluators = {
+        ast.Expression: lambda: _reference_eval_node(node.body, vars_val),
+        ast.Constant: lambda: float(node.value),
+        ast.Name: lambda: float(vars_val[node.id]),
+        ast.BinOp: lambda: supported_binary_operations[type(node.op)](
+            _reference_eval_node(node.left, vars_val),
+            _reference_eval_node(node.right, vars_val),
+        ),
+        ast.UnaryOp: lambda: operator.neg(
+            _reference_eval_node(node.operand, vars_val)
+        ),
+    }
+    for ast_type, evaluator in supported_evaluators.items():
+        if isinstance(node, ast_type):
+            return evaluator()
+    raise TypeError(f"Unsupported node {node}")
+
+
+def test_compiled_formula_reference():
+    """Test that compiled formulas evaluate like the AST walking evaluator"""
+    formula = " + ".join(f"-a{i} * {i} / (b - {i})" for i in range(20))
+    vars_val = {f"a{i}": i for i in range(20)} | {"b": 42}
+    tree = ast.parse(formula, mode="eval")
+    assert compile_formula(formula)(vars_val) == _reference_eval_node(
+        tree, vars_val
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_per_node_overhead():
+    """Benchmark per-node overhead of compiled formulas
+
+    Evaluating a compiled formula must be cheaper per AST node than walking
+    the AST with per-node isinstance dispatch.
+    """
+    formula = " + ".join(f"-a{i} * {i} / (b - {i})" for i in range(20))
+    vars_val = {f"a{i}": i for i in range(20)} | {"b": 42}
+    tree = ast.parse(formula, mode="eval")
+    node_count = sum(1 for _ in ast.walk(tree))
+    compiled_formula = compile_formula(formula)
+
+    number = 200
+    compiled_time = min(
+        timeit.repeat(lambda: compiled_formula(vars_val), number=number)
+    )
+    reference_time = min(
+        timeit.repeat(
+            lambda: _reference_eval_node(tree, vars_val), number=number
+        )
+    )
+    compiled_per_node = compiled_time / (number * node_count)
+    reference_per_node = reference_time / (number * node_count)
+    assert compiled_per_node < reference_per_node
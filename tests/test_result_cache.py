@@ -0,0 +1,236 @@
+# -*- coding: UTF-8 -*-
+"""Tests for module result_cache
+"""
+
+import pytest
+
+from batpy import datasets, utility_functions
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_sharding import calculate_batteries
+from batpy.result_cache import (
+    ResultCache,
+    get_result_key,
+    get_workbook_identity,
+)
+
+from test_batpac_sharding import create_batteries, create_memory_batpac
+
+BATPY_BATPAC_RESULTS = datasets.get_batpy_dataset(
+    "batpy_batpac_calculation_and_validation_results"
+)
+
+
+def test_get_workbook_identity(tmp_path):
+    """Test get_workbook_identity"""
+    workbook_path = tmp_path / "batpac.xlsm"
+    workbook_path.write_bytes(b"BatPaC 5.0")
+    identity = get_workbook_identity(workbook_path, {"Dashboard": {"a": 1}})
+    assert identity == get_workbook_identity(
+        str(workbook_path), {"Dashboard": {"a": 1}}
+    )
+    assert identity != get_workbook_identity(
+        workbook_path, {"Dashboard": {"a": 2}}
+    )
+    assert identity != get_workbook_identity(None, {"Dashboard": {"a": 1}})
+
+    workbook_path.write_bytes(b"BatPaC 5.1 with more bytes")
+    assert identity != get_workbook_identity(
+        workbook_path, {"Dashboard": {"a": 1}}
+    )
+
+
+def test_get_result_key():
+    """Test get_result_key"""
+    key = get_result_key(
+        "workbook",
+        {"Chem": {"a": 1, "b": 2}},
+        {"Dashboard": {"c": 3.0}},
+        {"Dashboard": {"Battery 1": {"d": "D1"}}},
+    )
+    assert key == get_result_key(
+        "workbook",
+        {"Chem": {"b": 2, "a": 1}},
+        {"Dashboard": {"c": 3.0}},
+        {"Dashboard": {"Battery 1": {"d": "D1"}}},
+    )
+    assert key != get_result_key(
+        "workbook",
+        {"Chem": {"a": 1, "b": 2}},
+        {"Dashboard": {"c": 4.0}},
+        {"Dashboard": {"Battery 1": {"d": "D1"}}},
+    )
+    assert key != get_result_key(
+        "other workbook",
+        {"Chem": {"a": 1, "b": 2}},
+        {"Dashboard": {"c": 3.0}},
+        {"Dashboard": {"Battery 1": {"d": "D1"}}},
+    )
+    _, result_cell_config = utility_functions.load_cached_configuration(
+        BATPY_BATPAC_RESULTS
+    )
+    assert get_result_key(
+        "workbook", {}, {}, BATPY_BATPAC_RESULTS
+    ) == get_result_key("workbook", {}, {}, result_cell_config)
+
+
+def test_result_cache(tmp_path):
+    """Test get, set and eviction of the result cache"""
+    path = tmp_path / "results.sqlite"
+    with ResultCache(path, max_size=150) as result_cache:
+        assert result_cache.get("a") is None
+        result_cache.set("a", {"Dashboard": {"Plant Size, GWh": 1.0}})
+        result_cache.set("b", {"Dashboard": {"Plant Size, GWh": 2.0}})
+        assert result_cache.get("a") == {"Dashboard": {"Plant Size, GWh": 1.0}}
+        assert len(result_cache) == 2
+
+        result_cache.set("c", {"Dashboard": {"Plant Size, GWh": 3.0}})
+        assert result_cache.get("b") is None
+        assert result_cache.statistics == {
+            "hits": 1,
+            "misses": 2,
+            "evictions": 1,
+        }
+
+    with ResultCache(path) as result_cache:
+        assert len(result_cache) == 2
+        assert result_cache.get("c") == {"Dashboard": {"Plant Size, GWh": 3.0}}
+        result_cache.clear()
+        assert len(result_cache) == 0
+
+
+def test_result_cache_lossless(tmp_path):
+    """Test that the result cache returns the stored results unchanged"""
+    results = {"Dashboard": {"Cell": (1.0, "a"), "Error": None, "Count": 3}}
+    with ResultCache(tmp_path / "results.sqlite") as result_cache:
+        result_cache.set("a", results)
+        cached_results = result_cache.get("a")
+    assert cached_results == results
+    assert isinstance(cached_results["Dashboard"]["Cell"], tuple)
+
+
+def test_result_cache_size(tmp_path):
+    """Test the total size and access counter of the result cache"""
+    path = tmp_path / "results.sqlite"
+    with ResultCache(path) as result_cache:
+        result_cache.set("a", {"Dashboard": {"a": 1.0}})
+        result_cache.set("a", {"Dashboard": {"a": 2.0}})
+        result_cache.set("b", {"Dashboard": {"b": 1.0}})
+        result_cache.get("a")
+        connection = result_cache._connection
+        assert dict(connection.execute("SELECT * FROM metadata")) == {
+            "access": 4,
+            "size": connection.execute(
+                "SELECT SUM(size) FROM results"
+            ).fetchone()[0],
+        }
+        assert "results_last_access" in {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        result_cache.clear()
+        assert dict(connection.execute("SELECT * FROM metadata"))["size"] == 0
+
+
+def test_calculate_batteries_result_cache(tmp_path):
+    """Test calculate_batteries with a result cache"""
+    batpac = create_memory_batpac()
+    batteries = create_batteries(10)
+    duplicate_battery = BatpacBattery("Duplicate battery")
+    duplicate_battery.set_new_property(
+        "Dashboard", "Number of cells per module", 3.0
+    )
+    batteries.append(duplicate_battery)
+
+    with ResultCache(tmp_path / "results.sqlite") as result_cache:
+        results = calculate_batteries(
+            batpac, batteries, BATPY_BATPAC_RESULTS, result_cache
+        )
+        assert list(results) == batteries
+        assert results[duplicate_battery] == results[batteries[3]]
+        assert results[duplicate_battery] is not results[batteries[3]]
+        assert len(result_cache) == 10
+
+        batpac.backend.calls.clear()
+        cached_results = calculate_batteries(
+            batpac, batteries, BATPY_BATPAC_RESULTS, result_cache
+        )
+        assert cached_results == results
+        assert not batpac.backend.calls
+        assert result_cache.statistics["hits"] == 10
+
+        other_batpac = create_memory_batpac()
+        other_batpac.set_new_property("Chem", "Property", 1.0)
+        with pytest.raises(ValueError):
+            calculate_batteries(
+                [batpac, other_batpac],
+                batteries,
+                BATPY_BATPAC_RESULTS,
+                result_cache,
+            )
+
+        other_batpac = create_memory_batpac()
+        other_batpac.excel_cells = {"Dashboard": {}}
+        with pytest.raises(ValueError):
+            calculate_batteries(
+                [batpac, other_batpac],
+                batteries,
+                BATPY_BATPAC_RESULTS,
+                result_cache,
+            )
+
+
+def test_batpac_tool_result_cache(tmp_path):
+    """Test that the reads of a calculated BatpacTool are cached"""
+    batteries = create_batteries(3)
+    with ResultCache(tmp_path / "results.sqlite") as result_cache:
+        batpac = create_memory_batpac()
+        batpac.result_cache = result_cache
+        batpac.add_battery(batteries)
+        batpac.calculate()
+        assert not batpac.backend.calls
+        results = batpac.read_calculation_and_validation_results(
+            BATPY_BATPAC_RESULTS, print_table=False
+        )
+        user_values = batpac.read_from_user_input(BATPY_BATPAC_RESULTS)
+        calculations = batpac.backend.calls["calculate"]
+        assert calculations
+        assert results["Plant Size, GWh"] == [0.0, 2.0, 4.0]
+        assert user_values["Dashboard"]["Battery 2"]["Plant Size, GWh"] == 2.0
+        assert len(result_cache) == 2
+
+        other_batpac = create_memory_batpac()
+        other_batpac.result_cache = result_cache
+        other_batpac.add_battery(batteries)
+        other_batpac.calculate()
+        assert (
+            other_batpac.read_calculation_and_validation_results(
+                BATPY_BATPAC_RESULTS, print_table=False
+            )
+            == results
+        )
+        assert (
+            other_batpac.read_from_user_input(BATPY_BATPAC_RESULTS)
+            == user_values
+        )
+        assert not other_batpac.backend.calls
+        assert result_cache.statistics["hits"] == 2
+
+        other_batpac.write_value(
+            "Dashboard", "Number of cells per module", 5.0, batteries[0]
+        )
+        assert other_batpac.backend.calls["calculate"] >= calculations
+        other_batpac.read_from_user_input(BATPY_BATPAC_RESULTS)
+        assert result_cache.statistics["hits"] == 2
+        assert len(result_cache) == 2
+
+        batteries[0].set_new_property(
+            "Dashboard", "Number of cells per module", 5.0
+        )
+        calculations = other_batpac.backend.calls["calculate"]
+        other_batpac.calculate()
+        assert other_batpac.read_calculation_and_validation_results(
+            BATPY_BATPAC_RESULTS, print_table=False
+        )["Plant Size, GWh"] == [10.0, 2.0, 4.0]
+        assert other_batpac.backend.calls["calculate"] > calculations
@@ -1,11 +1,18 @@
+# pylint: disable=W0212
 # -*- coding: UTF-8 -*-
 """Tests for module is_version_compatible
 """
 
+import copy
+import pickle
+import time
+from pathlib import Path
+
 import pytest
 import semantic_version
+import toml
 
-from batpy import utility_functions
+from batpy import data, dataset_bundle, utility_functions
 
 CONFIG_TO_COMBINE_1 = "./tests/data/test_batpac2brightway_1.toml"
 CONFIG_TO_COMBINE_2 = "./tests/data/test_batpac2brightway_2.toml"
@@ -76,3 +83,252 @@ def test_combine_configuration():
     assert combined_dict == utility_functions.combine_configuration(
         [CONFIG_TO_COMBINE_1, CONFIG_TO_COMBINE_2]
     )
+
+
+@pytest.mark.parametrize(
+    "cell_range, expected_address",
+    [
+        ("A1", (1, 1)),
+        ("B16", (16, 2)),
+        ("$Z$42", (42, 26)),
+        ("ab16", (16, 28)),
+        ("XFD1048576", (1048576, 16384)),
+        ("B16:B80", None),
+        ("A0", None),
+        ("Battery 1", None),
+        (42, None),
+    ],
+)
+def test_split_cell_address(cell_range, expected_address):
+    """Test split_cell_address and join_cell_address
+
+    Parameters
+    ----------
+    cell_range : _type_
+        Cell range to split
+    expected_address : _type_
+        Row and column number, None if cell_range is not a single cell
+    """
+    assert utility_functions.split_cell_address(cell_range) == expected_address
+    if expected_address is not None:
+        assert (
+            utility_functions.join_cell_address(*expected_address)
+            == cell_range.replace("$", "").upper()
+        )
+
+
+def test_group_cell_blocks():
+    """Test group_cell_blocks"""
+    assert not utility_functions.group_cell_blocks([])
+    assert utility_functions.group_cell_blocks(
+        [(16, 2), (12, 7), (16, 2), (80, 2), (200, 3)], max_row_gap=64
+    ) == [
+        ((12, 2, 80, 7), [(12, 7), (16, 2), (80, 2)]),
+        ((200, 3, 200, 3), [(200, 3)]),
+    ]
+    assert utility_functions.group_cell_blocks(
+        [(1, 1), (2, 13), (1, 14), (3, 2), (1, 16000)], max_column_gap=10
+    ) == [
+        ((1, 1, 3, 2), [(1, 1), (3, 2)]),
+        ((1, 13, 2, 14), [(1, 14), (2, 13)]),
+        ((1, 16000, 1, 16000), [(1, 16000)]),
+    ]
+
+
+def test_group_contiguous_cells():
+    """Test group_contiguous_cells"""
+    assert not utility_functions.group_contiguous_cells([])
+    assert utility_functions.group_contiguous_cells(
+        [(16, 2), (17, 2), (16, 3), (17, 3), (16, 2), (19, 2), (16, 4)]
+    ) == [(16, 2, 17, 3), (19, 2, 19, 2), (16, 4, 16, 4)]
+
+
+@pytest.mark.parametrize(
+    "cell_range, expected_bounds",
+    [
+        ("B16", (16, 2, 16, 2)),
+        ("$B$16:C20", (16, 2, 20, 3)),
+        ("C20:B16", (16, 2, 20, 3)),
+        ("B16:", None),
+        ("Named range", None),
+        (None, None),
+    ],
+)
+def test_split_cell_range(cell_range, expected_bounds):
+    """Test split_cell_range"""
+    assert utility_functions.split_cell_range(cell_range) == expected_bounds
+
+
+def test_load_cached_configuration(monkeypatch, tmp_path):
+    """Test load_cached_configuration"""
+    utility_functions.clear_configuration_cache()
+    load_calls = []
+    load_configuration_text = (
+        utility_functions._load_configuration_text  # pylint: disable=W0212
+    )
+    monkeypatch.setattr(
+        utility_functions,
+        "_load_configuration_text",
+        lambda text, text_hash=None: load_calls.append((text, text_hash))
+        or load_configuration_text(text, text_hash),
+    )
+    monkeypatch.setattr(
+        dataset_bundle,
+        "get_text_hash",
+        lambda text: pytest.fail("Configuration text hashed twice"),
+    )
+    configuration = '["batpy"]\n"BatPaC SemVer" = "0.4.0"\n["Sheet"]\nA = 1\n'
+    configuration_path = tmp_path / "configuration.toml"
+    configuration_path.write_text(configuration, encoding="utf-8")
+
+    metadata, config = utility_functions.load_cached_configuration(
+        configuration
+    )
+    assert metadata == {"BatPaC SemVer": "0.4.0"}
+    assert config == {"Sheet": {"A": 1}}
+    assert (
+        utility_functions.load_cached_configuration(configuration_path)[1]
+        is config
+    )
+    assert (
+        utility_functions.load_cached_configuration(str(configuration_path))[1]
+        is config
+    )
+    assert load_calls == [
+        (configuration, utility_functions.get_text_hash(configuration))
+    ]
+
+    monkeypatch.setattr(utility_functions, "CONFIGURATION_CACHE_SIZE", 1)
+    utility_functions.load_cached_configuration(
+        configuration.replace("A = 1", "A = 2")
+    )
+    assert (
+        utility_functions.load_cached_configuration(configuration)[1]
+        is not config
+    )
+    assert len(load_calls) == 3
+
+
+def test_dump_configuration():
+    """Test dump_configuration"""
+    configuration = {
+        "batpy": {"BatPaC SemVer": "0.4.0"},
+        "Battery 1": {
+            "Chem": {
+                "Name": 'NMC\'s "811"',
+                'Scale "p"': 1.5,
+                "Flag": True,
+            },
+            "Dashboard": {"Missing": None, "Restart (0/1)": 1},
+        },
+        "Empty": {},
+    }
+    dumped_configuration = utility_functions.dump_configuration(
+        configuration, commented_keys=["Restart (0/1)"]
+    )
+    assert "# 'Missing' = None\n" in dumped_configuration
+    assert "# 'Restart (0/1)' = 1\n" in dumped_configuration
+    configuration["Battery 1"]["Dashboard"] = {}
+    assert toml.loads(dumped_configuration) == configuration
+
+
+def test_frozen_configuration():
+    """Test FrozenConfiguration"""
+    configuration = utility_functions.FrozenConfiguration(
+        {"Sheet": {"A": 1, "B": [1, 2]}}, {"BatPaC SemVer": "0.4.0"}
+    )
+    assert configuration == {"Sheet": {"A": 1, "B": (1, 2)}}
+    with pytest.raises(TypeError):
+        configuration["Sheet"]["A"] = 2
+    with pytest.raises(TypeError):
+        configuration.pop("Sheet")
+    with pytest.raises(TypeError):
+        configuration.metadata["BatPaC SemVer"] = "0.0.0"
+
+    mutable_configuration = copy.deepcopy(configuration)
+    assert type(mutable_configuration["Sheet"]) is dict
+    mutable_configuration["Sheet"]["B"].append(3)
+    assert configuration["Sheet"]["B"] == (1, 2)
+    assert pickle.loads(pickle.dumps(configuration)) == configuration
+
+    assert utility_functions.load_cached_configuration(configuration) == (
+        configuration.metadata,
+        configuration,
+    )
+    assert utility_functions.load_configuration(configuration) == {
+        "batpy": {"BatPaC SemVer": "0.4.0"},
+        "Sheet": {"A": 1, "B": [1, 2]},
+    }
+
+
+def test_load_configuration_input_types(monkeypatch, tmp_path):
+    """Test load_configuration with paths, TOML text and dictionaries"""
+    configuration = '["batpy"]\n"BatPaC SemVer" = "0.4.0"\n["Sheet"]\nA = 1\n'
+    configuration_path = tmp_path / "configuration.toml"
+    configuration_path.write_text(configuration, encoding="utf-8")
+    expected_configuration = {
+        "batpy": {"BatPaC SemVer": "0.4.0"},
+        "Sheet": {"A": 1},
+    }
+    assert (
+        utility_functions.load_configuration(configuration_path)
+        == expected_configuration
+    )
+    assert (
+        utility_functions.load_configuration(str(configuration_path))
+        == expected_configuration
+    )
+    assert utility_functions.load_configuration(expected_configuration) == (
+        expected_configuration
+    )
+    with pytest.raises(FileNotFoundError):
+        utility_functions.load_configuration(tmp_path / "missing.toml")
+
+    monkeypatch.setattr(
+        utility_functions.Path,
+        "is_file",
+        lambda path: pytest.fail("TOML text used as path"),
+    )
+    assert (
+        utility_functions.load_configuration(configuration)
+        == expected_configuration
+    )
+    assert utility_functions.load_configuration("A = 1") == {"A": 1}
+
+
+def test_parse_configuration_text(monkeypatch):
+    """Test _parse_configuration_text with fallback to toml"""
+    assert utility_functions._parse_configuration_text("A = 1") == {"A": 1}
+    monkeypatch.setattr(utility_functions, "tomllib", None)
+    assert utility_functions._parse_configuration_text("A = 1") == {"A": 1}
+
+
+def test_parse_configuration_text_datasets():
+    """Test that all included datasets are parsed like with toml"""
+    for dataset_path in Path(data.__path__[0]).glob("*/*.toml"):
+        configuration_text = dataset_path.read_text(encoding="utf-8")
+        assert utility_functions._parse_configuration_text(
+            configuration_text
+        ) == toml.loads(configuration_text)
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(
+    utility_functions.tomllib is None, reason="tomllib not available"
+)
+def test_parse_configuration_text_time():
+    """Compare the parse time of all included datasets with tomllib and toml"""
+    configuration_texts = [
+        dataset_path.read_text(encoding="utf-8")
+        for dataset_path in Path(data.__path__[0]).glob("*/*.toml")
+    ]
+    start_time = time.perf_counter()
+    for configuration_text in configuration_texts:
+        utility_functions._parse_configuration_text(configuration_text)
+    parse_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for configuration_text in configuration_texts:
+        toml.loads(configuration_text)
+    toml_time = time.perf_counter() - start_time
+    assert parse_time < toml_time
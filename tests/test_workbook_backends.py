@@ -0,0 +1,287 @@
+# -*- coding: UTF-8 -*-
+"""Tests for module workbook_backends
+"""
+
+import pytest
+
+from batpy import datasets, utility_functions, workbook_backends
+from batpy.batpac_battery import BatpacBattery
+from batpy.batpac_tool import BatpacTool
+from batpy.batpy_workbook import BatpyWorkbook
+from batpy.brightway import BrightwayConnector
+from batpy.workbook_backends import (
+    MemoryBackend,
+    OpenpyxlBackend,
+    XlwingsBackend,
+    create_workbook_backend,
+)
+
+
+@pytest.mark.parametrize(
+    "backend, expected_backend",
+    [
+        ("xlwings", XlwingsBackend),
+        ("memory", MemoryBackend),
+        ("openpyxl", OpenpyxlBackend),
+    ],
+)
+def test_create_workbook_backend(backend, expected_backend):
+    """Test create_workbook_backend"""
+    assert isinstance(create_workbook_backend(backend), expected_backend)
+
+
+def test_create_workbook_backend_error():
+    """Test create_workbook_backend for unknown backends"""
+    memory_backend = MemoryBackend()
+    assert create_workbook_backend(memory_backend) is memory_backend
+    with pytest.raises(KeyError):
+        create_workbook_backend("unknown")
+    with pytest.raises(KeyError):
+        BatpyWorkbook(None, backend="unknown")
+
+
+class FakeExcelBooks(list):
+    """Stand-in for xlwings.main.Books"""
+
+    def __init__(self, app) -> None:
+        """Initialize fake books of an Excel instance"""
+        super().__init__()
+        self.app = app
+
+    def open(self, path):
+        """Open book"""
+        book = FakeExcelBook(self.app, path)
+        self.append(book)
+        return book
+
+    def add(self):
+        """Add book"""
+        return self.open(None)
+
+
+class FakeExcelApp:
+    """Stand-in for xlwings.App, which records opened books and quits"""
+
+    def __init__(self, visible: bool = True, add_book: bool = True) -> None:
+        """Initialize fake Excel instance"""
+        self.visible = visible
+        self.add_book = add_book
+        self.books = FakeExcelBooks(self)
+        self.quitted = False
+
+    def quit(self):
+        """Quit Excel instance"""
+        self.quitted = True
+
+
+class FakeExcelBook:
+    """Stand-in for xlwings.Book"""
+
+    def __init__(self, app: FakeExcelApp, path) -> None:
+        """Initialize fake book"""
+        self.app = app
+        self.path = path
+
+    def close(self):
+        """Close book"""
+        self.app.books.remove(self)
+
+
+def test_xlwings_backend_book(monkeypatch):
+    """Test that the xlwings backend attaches to open workbooks by default"""
+    app = FakeExcelApp()
+    open_books = {}
+
+    def book(path):
+        """Stand-in for xlwings.Book, which reuses open books"""
+        if path not in open_books:
+            open_books[path] = app.books.open(path)
+        return open_books[path]
+
+    monkeypatch.setattr(workbook_backends.xw, "Book", book)
+    backends = [XlwingsBackend(), XlwingsBackend()]
+    for backend in backends:
+        backend.open("batpac.xlsm", visible=False)
+    assert backends[0].workbook is backends[1].workbook
+    assert not app.visible
+
+    backend = XlwingsBackend()
+    backend.open("other.xlsm")
+    assert backend.close()
+    assert not app.quitted and len(app.books) == 1
+    assert backends[0].close()
+    assert app.quitted
+
+
+def test_xlwings_backend_app():
+    """Test that the xlwings backend does not quit a passed Excel instance"""
+    app = FakeExcelApp(visible=False, add_book=False)
+    backend = XlwingsBackend(app)
+    backend.open("batpac.xlsm")
+    assert backend.workbook.app is app
+    assert [book.path for book in app.books] == ["batpac.xlsm"]
+    assert backend.close()
+    assert not app.books and not app.quitted
+
+
+def test_memory_backend():
+    """Test MemoryBackend"""
+    backend = MemoryBackend(
+        {("Sheet 1", "B2"): 1.0, ("Sheet 1", "C2:D3"): [[2, 3], [4, 5]]},
+        defined_names={("Sheet 1", "Name"): "C2:D3"},
+    )
+    assert not backend.calls
+    assert backend.read_value("Sheet 1", "B2") == 1.0
+    assert backend.read_value("Sheet 1", "$B$2") == 1.0
+    assert backend.read_value("Sheet 1", "B2:D2") == [1.0, 2, 3]
+    assert backend.read_value("Sheet 1", "C2:C3") == [2, 4]
+    assert backend.read_value("Sheet 1", "Name") == [[2, 3], [4, 5]]
+    assert backend.read_range("Sheet 1", "B2") == [[1.0]]
+    assert backend.read_range("Sheet 2", "A1:B1") == [[None, None]]
+    with pytest.raises(KeyError):
+        backend.read_value("Sheet 1", "Unknown name")
+
+    backend.write_value("Sheet 2", "B2", [1, 2, 3])
+    backend.write_value("Sheet 1", "Name", None)
+    backend.write_range("Sheet 2", "A5:A6", [[5], [6]])
+    assert backend.get_cells() == {
+        ("Sheet 1", "B2"): 1.0,
+        ("Sheet 1", "D2"): 3,
+        ("Sheet 1", "C3"): 4,
+        ("Sheet 1", "D3"): 5,
+        ("Sheet 2", "B2"): 1,
+        ("Sheet 2", "C2"): 2,
+        ("Sheet 2", "D2"): 3,
+        ("Sheet 2", "A5"): 5,
+        ("Sheet 2", "A6"): 6,
+    }
+    assert backend.calls == {
+        "read_value": 6,
+        "read_range": 2,
+        "write_value": 2,
+        "write_range": 1,
+    }
+
+
+def test_memory_backend_calculation():
+    """Test calculation and macros of MemoryBackend"""
+
+    def calculation(backend):
+        """Calculate B2 from A2"""
+        backend.write_value(
+            "Sheet 1", "B2", backend.read_value("Sheet 1", "A2") * 2
+        )
+
+    def reset(backend):
+        """Reset macro"""
+        backend.write_value("Sheet 1", "C2", "reset")
+
+    backend = MemoryBackend(
+        {("Sheet 1", "A2"): 1},
+        calculation=calculation,
+        macros={"Module1.Reset": reset},
+    )
+    backend.set_automatic_calculation(False)
+    backend.write_value("Sheet 1", "A2", 3)
+    assert backend.read_value("Sheet 1", "B2") is None
+    backend.set_automatic_calculation(True)
+    assert backend.read_value("Sheet 1", "B2") == 6
+    backend.run_macro("Module1.Reset")
+    backend.run_macro("Module1.Unknown")
+    assert backend.read_value("Sheet 1", "C2") == "reset"
+    assert backend.calls["calculate"] == 2
+    assert backend.calls["run_macro"] == 1
+
+
+def test_openpyxl_backend(tmp_path):
+    """Test OpenpyxlBackend"""
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook_path = tmp_path / "test_workbook.xlsx"
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Sheet 1"
+    worksheet["B2"] = 1.0
+    worksheet["C2"] = "=B2*2"
+    defined_name = openpyxl.workbook.defined_name.DefinedName(
+        "Name", attr_text="'Sheet 1'!$B$2:$C$2"
+    )
+    workbook.defined_names[defined_name.name] = defined_name
+    workbook.save(workbook_path)
+
+    batpy_workbook = BatpyWorkbook(workbook_path, backend="openpyxl")
+    assert batpy_workbook._read_value_direct("Sheet 1", "B2") == 1.0
+    with pytest.raises(KeyError):
+        batpy_workbook._read_value_direct("Sheet 1", "Unknown name")
+    batpy_workbook._write_value_direct("Sheet 1", "Name", [3.0, 4.0])
+    assert batpy_workbook._read_range_direct("Sheet 1", "B2:C2") == [
+        [3.0, 4.0]
+    ]
+    batpy_workbook._write_value_direct("Sheet 1", "C2", "=B2*2")
+    batpy_workbook.save(tmp_path / "test_workbook_saved.xlsx")
+    assert batpy_workbook.close()
+
+    saved_workbook = openpyxl.load_workbook(
+        tmp_path / "test_workbook_saved.xlsx"
+    )
+    assert saved_workbook["Sheet 1"]["B2"].value == 3.0
+    assert saved_workbook["Sheet 1"]["C2"].value == "=B2*2"
+
+
+def test_export_batpac_battery_to_brightway_memory():
+    """Test export_batpac_battery_to_brightway with in-memory workbooks"""
+    batpac_config = utility_functions.combine_configuration(
+        [
+            datasets.get_batpy_dataset("batpy_batpac_battery_design"),
+            datasets.get_batpy_dataset("batpy_batpac_bms"),
+        ]
+    )
+    batpac = BatpacTool(
+        None,
+        datasets.get_batpy_dataset("batpy_batpac_user_input_cells"),
+        backend="memory",
+    )
+    battery = BatpacBattery("Battery 1")
+    batpac.add_battery([battery])
+
+    brightway = BrightwayConnector(None, backend="memory")
+    brightway.load_batpac_to_brightway_configuration(
+        datasets.get_batpy_dataset("batpy_batpac2brightway")
+    )
+    export_plan = brightway.compile_export_plan(batpac_config)
+    for worksheet, cell_range in export_plan.get_source_cells():
+        batpac.backend.write_value(worksheet, cell_range, 2.0)
+    batpac.backend.calls.clear()
+
+    brightway.export_batpac_battery_to_brightway(
+        batpac, battery, batpac_config
+    )
+    exported_cells = brightway.backend.get_cells()
+    assert len(exported_cells) == len(export_plan)
+    assert exported_cells == dict(
+        (
+            (entry.worksheet, entry.cell_range),
+            value,
+        )
+        for entry, value in export_plan.evaluate(
+            {cell: 2.0 for cell in export_plan.get_source_cells()}
+        )
+    )
+    assert batpac.backend.calls["read_range"] < len(export_plan) / 10
+
+    constant_cells = {
+        (entry.worksheet, entry.cell_range)
+        for entry in export_plan.entries
+        if entry.formula.is_constant
+    }
+    assert constant_cells
+    brightway.cell_writes.clear()
+    brightway.export_batpac_battery_to_brightway(batpac, battery, export_plan)
+    assert brightway.cell_writes == {"written": len(export_plan)}
+    for incremental_export in range(2):
+        brightway.cell_writes.clear()
+        brightway.export_batpac_battery_to_brightway(
+            batpac, battery, export_plan, incremental=True
+        )
+        assert brightway.cell_writes["skipped"] == (
+            len(constant_cells) if incremental_export else 0
+        )